@@ -1,5 +1,7 @@
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+
+from app.core.deadline import Deadline
 
 logger = logging.getLogger(__name__)
 
@@ -7,21 +9,31 @@ class BaseAgent:
     """Base class for all agents. Agents should implement `run`."""
 
     name = "base"
+    # Blackboard entries (agent names) this agent reads; used by the DAG scheduler.
+    depends_on: List[str] = []
 
     def __init__(self, retriever=None, model_router=None, memory_store=None):
         self.retriever = retriever
         self.model_router = model_router
         self.memory_store = memory_store
 
-    async def run(self, query: str, session_id: Optional[str], blackboard) -> Dict[str, Any]:
-        """Run the agent. Return a dict with at least 'role' and 'output'."""
+    async def run(self, query: str, session_id: Optional[str], blackboard, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Run the agent. Return a dict with at least 'role' and 'output'.
+        `deadline` is the request's remaining budget, passed on to the router.
+        """
         raise NotImplementedError()
 
-    async def _call_model(self, prompt: str, task_type: str = "general_chat") -> str:
-        """Helper to call the model router if available, else do a simple fallback."""
+    async def _call_model(
+        self, prompt: str, task_type: str = "general_chat", context: Optional[str] = None, deadline: Optional[Deadline] = None
+    ) -> str:
+        """
+        Helper to call the model router if available, else do a simple fallback.
+        `context` is the turn's shared retrieval; when present the router skips its own lookup.
+        """
         if self.model_router:
             try:
-                return await self.model_router.run(prompt, task_type=task_type)
+                return await self.model_router.run(prompt, task_type=task_type, context=context, deadline=deadline)
             except Exception as e:
                 logger.warning(f"{self.name} model_router failed: {e}")
         return f"(local fallback by {self.name}) {prompt[:300]}"
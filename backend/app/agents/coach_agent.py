@@ -1,10 +1,12 @@
 from typing import Any, Dict, Optional
 from app.agents.base_agent import BaseAgent
+from app.core.deadline import Deadline
 
 class CoachAgent(BaseAgent):
     name = "coach"
+    depends_on = ["strategist"]
 
-    async def run(self, query: str, session_id: Optional[str], blackboard) -> Dict[str, Any]:
+    async def run(self, query: str, session_id: Optional[str], blackboard, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         strategist = await blackboard.read("strategist", {})
         plan = strategist.get("plan", "")
         prompt = (
@@ -26,6 +28,7 @@ class CoachAgent(BaseAgent):
             "  'summary': 'Short reflective summary (2 sentences) about consistency and emotional growth.'\n"
             "}"
     )
-        reply = await self._call_model(prompt, task_type="behavioral_coaching")
+        context = await blackboard.read("context")
+        reply = await self._call_model(prompt, task_type="behavioral_coaching", context=context, deadline=deadline)
         await blackboard.update_dict("coach", {"nudges": reply})
         return {"role": "coach", "output": reply}
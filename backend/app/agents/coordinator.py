@@ -8,12 +8,26 @@ from app.agents.strategist_agent import StrategistAgent
 from app.agents.coach_agent import CoachAgent
 from app.agents.purpose_agent import PurposeAgent
 from app.agents.evaluator import EvaluatorAgent
+from app.agents.scheduler import run_dag, select_dependencies
+from app.core.deadline import Deadline
 from app.core.logging_config import log_event
+from app.services.task_classifier import get_task_classifier
 
 logger = logging.getLogger(__name__)
 
+AGENT_DEPENDENCIES: Dict[str, List[str]] = {
+    cls.name: list(cls.depends_on)
+    for cls in (ReflectorAgent, StrategistAgent, CoachAgent, PurposeAgent)
+}
+
 class CoordinatorAgent:
-    """Orchestrates agents: supports parallel and chain execution + meta-eval."""
+    """
+    Orchestrates agents: supports parallel, chain and dependency-graph execution + meta-eval.
+
+    Every run accepts an optional request `deadline`: each agent gets at most its
+    remaining budget, agents not yet started when it expires are skipped, and the
+    evaluation covers whichever agents finished.
+    """
 
     def __init__(self, retriever=None, model_router=None, memory_store=None, timeout: int = 20):
         self.blackboard = Blackboard()
@@ -27,18 +41,43 @@ class CoordinatorAgent:
         self.coach = CoachAgent(retriever, model_router, memory_store)
         self.purpose = PurposeAgent(retriever, model_router, memory_store)
         self.evaluator = EvaluatorAgent()
+        self.classifier = get_task_classifier()
 
         self.routing_table = {
             "emotional_reflection": ["reflector", "purpose"],
             "cognitive_reasoning": ["strategist", "coach", "purpose"],
             "behavioral_coaching": ["coach", "reflector"],
             "rag_query": ["reflector", "strategist", "purpose"],
+            "purpose_alignment": ["purpose", "reflector"],
             "general_chat": ["reflector", "strategist", "coach", "purpose"],
         }
 
-    async def _run_agent(self, agent, query, session_id):
+    async def _share_context(self, query: str) -> Optional[List[float]]:
+        """
+        Retrieve once per turn and publish it on the blackboard for every agent.
+        Returns the query embedding retrieval used, if any, so the turn can be classified without re-embedding.
+        """
+        if not self.retriever:
+            return None
+        try:
+            result = await asyncio.to_thread(self.retriever.search, query)
+            context, embedding = result.text, result.embedding
+        except Exception as e:
+            log_event("RAG_ERROR", f"⚠️ Coordinator retrieval failed: {e}")
+            context, embedding = "", None
+        await self.blackboard.write("context", context or "")
+        return embedding
+
+    async def _run_agent(self, agent, query, session_id, deadline: Optional[Deadline] = None) -> Optional[Dict]:
+        """Run one agent within min(self.timeout, the deadline's remaining budget); None if the budget is already spent."""
+        if deadline and deadline.expired:
+            log_event("DEADLINE", f"⏰ Skipping {agent.name}, request deadline reached (session={session_id})")
+            return None
+        timeout = deadline.cap(self.timeout) if deadline else self.timeout
         try:
-            return await asyncio.wait_for(agent.run(query, session_id, self.blackboard), timeout=self.timeout)
+            return await asyncio.wait_for(
+                agent.run(query, session_id, self.blackboard, deadline=deadline), timeout=timeout
+            )
         except asyncio.TimeoutError:
             log_event("AGENT_TIMEOUT", f"{agent.name} timed out for session={session_id}")
             logger.warning(f"{agent.name} timed out")
@@ -48,23 +87,37 @@ class CoordinatorAgent:
             logger.exception(e)
             return {"role": agent.name, "output": f"{agent.name} failed: {e}"}
 
-    async def run_parallel(self, query: str, task_type: str, session_id: Optional[str]) -> Dict:
-        """Run all agents in routing_table[task_type] concurrently and return evaluator summary."""
-        agent_names = self.routing_table.get(task_type, ["reflector", "strategist"])
+    async def run_parallel(
+        self,
+        query: str,
+        task_type: Optional[str] = None,
+        session_id: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict:
+        """
+        Run all agents in routing_table[task_type] concurrently and return evaluator summary.
+        Without a `task_type` the query is classified once, from the shared retrieval's embedding.
+        """
         name_map = {
             "reflector": self.reflector,
             "strategist": self.strategist,
             "coach": self.coach,
             "purpose": self.purpose,
         }
-        jobs = [self._run_agent(name_map[n], query, session_id) for n in agent_names if n in name_map]
-        results = await asyncio.gather(*jobs)
+        embedding = await self._share_context(query)
+        if not task_type:
+            task_type = await asyncio.to_thread(self.classifier.classify, query, embedding)
+        agent_names = self.routing_table.get(task_type, ["reflector", "strategist"])
+        jobs = [self._run_agent(name_map[n], query, session_id, deadline) for n in agent_names if n in name_map]
+        results = [r for r in await asyncio.gather(*jobs) if r is not None]
         eval_result = await self.evaluator.evaluate(query, results)
         snapshot = await self.blackboard.dump()
         log_event("COORDINATOR_PARALLEL", f"session={session_id} task={task_type} snapshot_keys={list(snapshot.keys())}")
-        return {"results": results, "eval": eval_result, "snapshot": snapshot}
+        return {"task_type": task_type, "results": results, "eval": eval_result, "snapshot": snapshot}
 
-    async def run_chain(self, query: str, chain: List[str], session_id: Optional[str]) -> Dict:
+    async def run_chain(
+        self, query: str, chain: List[str], session_id: Optional[str], deadline: Optional[Deadline] = None
+    ) -> Dict:
         """Run agents sequentially following chain order (strings of agent names)."""
         name_map = {
             "reflector": self.reflector,
@@ -72,14 +125,43 @@ class CoordinatorAgent:
             "coach": self.coach,
             "purpose": self.purpose,
         }
+        await self._share_context(query)
         results = []
         for n in chain:
             agent = name_map.get(n)
             if not agent:
                 continue
-            res = await self._run_agent(agent, query, session_id)
+            res = await self._run_agent(agent, query, session_id, deadline)
+            if res is None:
+                break
             results.append(res)
         eval_result = await self.evaluator.evaluate(query, results)
         snapshot = await self.blackboard.dump()
         log_event("COORDINATOR_CHAIN", f"session={session_id} chain={chain} snapshot_keys={list(snapshot.keys())}")
+        return {"results": results, "eval": eval_result, "snapshot": snapshot}
+
+    async def run_graph(
+        self, query: str, agents: List[str], session_id: Optional[str], deadline: Optional[Deadline] = None
+    ) -> Dict:
+        """
+        Run agents as a dependency graph: each agent starts as soon as the agents it
+        declares in `depends_on` have written to the blackboard (e.g. coach and purpose
+        run concurrently once strategist is done). Agents outside `agents` do not run, but
+        the ordering they imply is kept: with only reflector and coach, coach still waits
+        for reflector, which it depends on through strategist.
+        """
+        name_map = {
+            "reflector": self.reflector,
+            "strategist": self.strategist,
+            "coach": self.coach,
+            "purpose": self.purpose,
+        }
+        selected = [n for n in agents if n in name_map]
+        graph = select_dependencies(AGENT_DEPENDENCIES, selected)
+        await self._share_context(query)
+        outputs = await run_dag(graph, lambda n: self._run_agent(name_map[n], query, session_id, deadline))
+        results = [outputs[n] for n in selected if outputs[n] is not None]
+        eval_result = await self.evaluator.evaluate(query, results)
+        snapshot = await self.blackboard.dump()
+        log_event("COORDINATOR_GRAPH", f"session={session_id} agents={selected} snapshot_keys={list(snapshot.keys())}")
         return {"results": results, "eval": eval_result, "snapshot": snapshot}
\ No newline at end of file
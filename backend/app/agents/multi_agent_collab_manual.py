@@ -3,15 +3,15 @@ import logging
 from app.agents.coordinator import CoordinatorAgent
 from app.services.retriever import ContextRetriever
 from app.services.model_router import ModelRouter
-from app.services.memory.chroma_memory import ChromaConversationMemory
+from app.services.memory.factory import get_conversation_store
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 async def main():
     retriever = ContextRetriever()
-    model_router = ModelRouter()
-    memory_store = ChromaConversationMemory()
+    model_router = ModelRouter(retriever=retriever)
+    memory_store = get_conversation_store()
 
     coord = CoordinatorAgent(retriever=retriever, model_router=model_router, memory_store=memory_store)
 
@@ -1,10 +1,12 @@
 from typing import Any, Dict, Optional
 from app.agents.base_agent import BaseAgent
+from app.core.deadline import Deadline
 
 class PurposeAgent(BaseAgent):
     name = "purpose"
+    depends_on = ["reflector", "strategist"]
 
-    async def run(self, query: str, session_id: Optional[str], blackboard) -> Dict[str, Any]:
+    async def run(self, query: str, session_id: Optional[str], blackboard, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         ref = await blackboard.read("reflector", {})
         strat = await blackboard.read("strategist", {})
         prompt = (
@@ -24,6 +26,7 @@ class PurposeAgent(BaseAgent):
             "  'core_value': 'word or phrase representing the underlying purpose (e.g., growth, discipline, balance)'\n"
             "}"
         )
-        reply = await self._call_model(prompt, task_type="purpose_alignment")
+        context = await blackboard.read("context")
+        reply = await self._call_model(prompt, task_type="purpose_alignment", context=context, deadline=deadline)
         await blackboard.update_dict("purpose", {"alignment": reply})
         return {"role": "purpose", "output": reply}
\ No newline at end of file
@@ -1,10 +1,12 @@
 from typing import Any, Dict, Optional
 from app.agents.base_agent import BaseAgent
+from app.core.deadline import Deadline
 
 class ReflectorAgent(BaseAgent):
     name = "reflector"
+    depends_on = []
 
-    async def run(self, query: str, session_id: Optional[str], blackboard) -> Dict[str, Any]:
+    async def run(self, query: str, session_id: Optional[str], blackboard, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         prompt = (
             "You are Neuraline's Reflection Agent — a warm, empathetic AI designed to help users explore their thoughts and emotions clearly.\n"
             "Your role is to encourage self-awareness through gentle reflective questions and emotional insight.\n\n"
@@ -20,6 +22,7 @@ class ReflectorAgent(BaseAgent):
             "  'insight': 'A short empathetic reflection about what the user might be experiencing.'\n"
             "}"
         )
-        reply = await self._call_model(prompt, task_type="emotional_reflection")
+        context = await blackboard.read("context")
+        reply = await self._call_model(prompt, task_type="emotional_reflection", context=context, deadline=deadline)
         await blackboard.update_dict("reflector", {"insight": reply})
         return {"role": "reflector", "output": reply}
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+
+def select_dependencies(graph: Dict[str, List[str]], nodes: List[str]) -> Dict[str, List[str]]:
+    """
+    Restrict `graph` to `nodes`. A dependency that runs through a node that was not
+    selected becomes a direct edge (e.g. with only reflector and coach selected, coach
+    still waits for reflector, which it depends on through strategist).
+    """
+    return {n: [d for d in nodes if d in ancestors(graph, n)] for n in nodes}
+
+
+def ancestors(graph: Dict[str, List[str]], node: str) -> Set[str]:
+    """All direct and transitive dependencies of `node`."""
+    seen: Set[str] = set()
+    stack = list(graph.get(node, []))
+    while stack:
+        dep = stack.pop()
+        if dep not in seen:
+            seen.add(dep)
+            stack.extend(graph.get(dep, []))
+    return seen
+
+
+def topological_order(graph: Dict[str, List[str]]) -> List[str]:
+    """Kahn's algorithm; preserves the input order among independent nodes. Raises on cycles."""
+    remaining = {n: set(deps) for n, deps in graph.items()}
+    order: List[str] = []
+    while remaining:
+        ready = [n for n, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle between agents: {sorted(remaining)}")
+        for n in ready:
+            order.append(n)
+            del remaining[n]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return order
+
+
+async def run_dag(graph: Dict[str, List[str]], run_node: Callable[[str], Awaitable[Any]]) -> Dict[str, Any]:
+    """
+    Run every node of `graph` ({node: [dependencies]}) as soon as all of its dependencies
+    have finished, so independent branches execute concurrently. A failed dependency does
+    not block its dependents; they run with whatever state it left behind. Every node
+    runs before the first failure is re-raised. Returns {node: result} in topological order.
+    """
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def start(node: str):
+        deps = [tasks[d] for d in graph[node]]
+        if deps:
+            await asyncio.gather(*deps, return_exceptions=True)
+        return await run_node(node)
+
+    order = topological_order(graph)
+    for node in order:
+        tasks[node] = asyncio.create_task(start(node))
+    try:
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+    finally:
+        for t in tasks.values():
+            if not t.done():
+                t.cancel()
+    return {node: tasks[node].result() for node in order}
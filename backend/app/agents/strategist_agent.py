@@ -1,10 +1,12 @@
 from typing import Any, Dict, Optional
 from app.agents.base_agent import BaseAgent
+from app.core.deadline import Deadline
 
 class StrategistAgent(BaseAgent):
     name = "strategist"
+    depends_on = ["reflector"]
 
-    async def run(self, query: str, session_id: Optional[str], blackboard) -> Dict[str, Any]:
+    async def run(self, query: str, session_id: Optional[str], blackboard, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         reflector = await blackboard.read("reflector", {})
         seed = reflector.get("insight", "")
         prompt = (
@@ -27,6 +29,7 @@ class StrategistAgent(BaseAgent):
             "  'summary': 'Brief paragraph explaining how this plan aligns emotional insight with structured action.'\n"
             "}"
         )
-        reply = await self._call_model(prompt, task_type="cognitive_reasoning")
+        context = await blackboard.read("context")
+        reply = await self._call_model(prompt, task_type="cognitive_reasoning", context=context, deadline=deadline)
         await blackboard.update_dict("strategist", {"plan": reply})
         return {"role": "strategist", "output": reply}
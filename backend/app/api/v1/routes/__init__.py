@@ -1,9 +1,10 @@
 from fastapi import APIRouter
-from . import health, auth, mcp, chat
+from . import health, auth, mcp, chat, metrics
 
 api_router = APIRouter()
 
 api_router.include_router(health.router, prefix="/health", tags=["health"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(mcp.router, prefix="/mcp", tags=["mcp"])
-api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
\ No newline at end of file
+api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
+api_router.include_router(metrics.router, tags=["metrics"])
\ No newline at end of file
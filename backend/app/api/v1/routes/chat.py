@@ -2,10 +2,12 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
 
-from app.mcp.mcp_engine import MCPEngine
+from app.api.v1.sse import sse_response
+from app.core.deadline import Deadline
+from app.mcp.mcp_engine import get_mcp_engine
 
 router = APIRouter()
-mcp_engine = MCPEngine()
+mcp_engine = get_mcp_engine()
 
 class ChatRequest(BaseModel):
     message: str
@@ -13,9 +15,34 @@ class ChatRequest(BaseModel):
     mode: Optional[str] = "chain"
     roles: Optional[List[str]] = None
     timeout: Optional[int] = None
+    bypass_cache: bool = False
+    quorum: Optional[str] = None  # mode="quorum" only, e.g. "reflector+1"; defaults to MCP_QUORUM
+
+
+def _check_quorum(quorum: Optional[str], roles: Optional[List[str]]):
+    """Reject a malformed `quorum` spec with 422 before any agent runs."""
+    if not quorum:
+        return
+    try:
+        mcp_engine.parse_quorum(quorum, roles)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _neuraline_voice(snapshot: dict) -> str:
+    # --- Fusion Step ---
+    # Smoothly merge all agent perspectives into a unified Neuraline voice
+    fused_text = mcp_engine._fuse_dialogue(snapshot)
+
+    if not fused_text.strip():
+        fused_text = "I'm here with you. How are you feeling right now?"
+
+    return f"Hey there 👋 — {fused_text.strip()}"
+
 
 @router.post("/chat")
 async def chat(request: ChatRequest):
+    _check_quorum(request.quorum, request.roles)
     try:
 # Run the MCP engine chain (multi-agent reasoning)
         result = await mcp_engine.run(
@@ -24,28 +51,60 @@ async def chat(request: ChatRequest):
         mode=request.mode or "chain",
         roles=request.roles,
         timeout=request.timeout,
+        use_cache=not request.bypass_cache,
+        quorum=request.quorum,
+        deadline=Deadline.from_timeout(request.timeout),
     )
 
     # Retrieve each agent’s snapshot output
         snapshot = result.get("snapshot", {})
-        combined_output = result.get("combined", "")
         best_role = result.get("best_role", "reflector")
 
-    # --- Fusion Step ---
-    # Smoothly merge all agent perspectives into a unified Neuraline voice
-        fused_text = mcp_engine._fuse_dialogue(snapshot)
-
-        if not fused_text.strip():
-            fused_text = "I'm here with you. How are you feeling right now?"
-
-        neuraline_voice = f"Hey there 👋 — {fused_text.strip()}"
+        neuraline_voice = _neuraline_voice(snapshot)
 
         return {
             "sender": "Neuraline",
             "reply": neuraline_voice,
             "best_role": best_role,
             "mode": result.get("mode", "chain"),
+            "deadline_exceeded": result.get("deadline_exceeded", False),
         }
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Server-sent-events variant of /chat: emits `token` and `agent` events while the
+    agents run, then a `final` event carrying the fused Neuraline reply.
+    """
+    _check_quorum(request.quorum, request.roles)
+    deadline = Deadline.from_timeout(request.timeout)
+
+    async def events():
+        async for evt in mcp_engine.run_stream(
+            query=request.message,
+            session_id=request.session_id,
+            mode=request.mode or "chain",
+            roles=request.roles,
+            timeout=request.timeout,
+            use_cache=not request.bypass_cache,
+            deadline=deadline,
+            quorum=request.quorum,
+        ):
+            if evt["event"] != "final":
+                yield evt
+                continue
+            yield {
+                "event": "final",
+                "sender": "Neuraline",
+                "reply": _neuraline_voice(evt.get("snapshot", {})),
+                "best_role": evt.get("best_role", "reflector"),
+                "mode": evt.get("mode", "chain"),
+                "deadline_exceeded": evt.get("deadline_exceeded", False),
+                "pending_roles": evt.get("pending_roles", []),
+            }
+
+    return sse_response(events())
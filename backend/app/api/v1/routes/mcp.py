@@ -3,12 +3,14 @@ from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import logging
 
-from app.mcp.mcp_engine import MCPEngine
+from app.api.v1.sse import sse_response
+from app.core.deadline import Deadline
+from app.mcp.mcp_engine import get_mcp_engine
 
 router = APIRouter(prefix="/api/v1/mcp", tags=["MCP"])
 logger = logging.getLogger(__name__)
 
-mcp_engine = MCPEngine()
+mcp_engine = get_mcp_engine()
 
 
 class MCPRequest(BaseModel):
@@ -17,6 +19,18 @@ class MCPRequest(BaseModel):
     mode: Optional[str] = "chain" 
     roles: Optional[List[str]] = None
     timeout: Optional[int] = None
+    bypass_cache: bool = False
+    quorum: Optional[str] = None  # mode="quorum" only, e.g. "reflector+1"; defaults to MCP_QUORUM
+
+
+def _check_quorum(quorum: Optional[str], roles: Optional[List[str]]):
+    """Reject a malformed `quorum` spec with 422 before any agent runs."""
+    if not quorum:
+        return
+    try:
+        mcp_engine.parse_quorum(quorum, roles)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 
 @router.post("/run")
@@ -25,10 +39,14 @@ async def run_mcp(req: MCPRequest) -> Dict[str, Any]:
     Executes the Model Context Protocol (MCP) orchestration pipeline.
     This endpoint coordinates multiple cognitive agents (reflector, strategist, coach, purpose)
     to produce a structured, human-like multi-perspective response.
+    `timeout` is the end-to-end budget; agents still running when it expires are
+    left out and `deadline_exceeded` is set.
     """
+    _check_quorum(req.quorum, req.roles)
+    deadline = Deadline.from_timeout(req.timeout)
     try:
         if hasattr(mcp_engine, "run_mcp"):
-            result = await mcp_engine.run_mcp(req.dict())
+            result = await mcp_engine.run_mcp(req.dict(), deadline=deadline)
         else:
             result = await mcp_engine.run(
                 query=req.query,
@@ -36,6 +54,9 @@ async def run_mcp(req: MCPRequest) -> Dict[str, Any]:
                 mode=req.mode or "chain",
                 roles=req.roles,
                 timeout=req.timeout,
+                use_cache=not req.bypass_cache,
+                quorum=req.quorum,
+                deadline=deadline,
             )
 
         return {
@@ -46,8 +67,32 @@ async def run_mcp(req: MCPRequest) -> Dict[str, Any]:
             "snapshot": result.get("snapshot"),
             "combined": result.get("combined"),
             "results": result.get("results"),
+            "deadline_exceeded": result.get("deadline_exceeded", False),
+            "pending_roles": result.get("pending_roles", []),
         }
 
     except Exception as e:
         logger.exception(f"MCP execution failed: {e}")
         raise HTTPException(status_code=500, detail=f"MCP internal error: {str(e)}")
+
+
+@router.post("/run/stream")
+async def run_mcp_stream(req: MCPRequest):
+    """
+    Server-sent-events variant of /run: each agent's tokens and completed output are
+    emitted as they arrive, followed by a `final` event with the fused result (in quorum
+    mode as soon as the quorum is met).
+    """
+    _check_quorum(req.quorum, req.roles)
+    return sse_response(
+        mcp_engine.run_stream(
+            query=req.query,
+            session_id=req.session_id,
+            mode=req.mode or "chain",
+            roles=req.roles,
+            timeout=req.timeout,
+            use_cache=not req.bypass_cache,
+            deadline=Deadline.from_timeout(req.timeout),
+            quorum=req.quorum,
+        )
+    )
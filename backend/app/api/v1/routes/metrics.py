@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+
+from app.core.logging_config import telemetry_exporter
+from app.mcp.mcp_engine import get_mcp_engine
+from app.services.embedding_registry import embedding_registry
+from app.services.llm_transport import llm_transport
+from app.services.provider_health import provider_health
+from app.services.response_cache import get_response_cache
+from app.services.memory.factory import get_conversation_store
+from app.services.session_cache import session_cache_stats
+
+router = APIRouter()
+
+@router.get("/metrics", tags=["Metrics"])
+async def metrics():
+    cache = get_response_cache()
+    store = get_conversation_store()
+    return {
+        "telemetry": telemetry_exporter.stats(),
+        "embeddings": embedding_registry.memory_report(),
+        "providers": llm_transport.stats(),
+        "provider_health": provider_health.snapshot(),
+        "response_cache": cache.stats() if cache else {"enabled": False},
+        "memory_store": store.stats() if hasattr(store, "stats") else {"backend": type(store).__name__},
+        "session_caches": session_cache_stats(),
+        "mcp_single_flight": get_mcp_engine().single_flight.stats(),
+    }
+
+
+@router.get("/metrics/providers", tags=["Metrics"])
+async def provider_metrics():
+    """Circuit state, rolling latency percentiles and error rate per provider, plus the retry budget."""
+    return {
+        **provider_health.snapshot(),
+        "transport": llm_transport.stats(),
+    }
@@ -0,0 +1,29 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Dict
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one server-sent event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """Wrap an async iterator of event dicts (each with an 'event' key) as a text/event-stream response."""
+    async def body():
+        try:
+            async for evt in events:
+                yield format_sse(evt.get("event", "message"), evt)
+        except Exception as e:
+            logger.exception(f"SSE stream failed: {e}")
+            yield format_sse("error", {"event": "error", "detail": str(e)})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
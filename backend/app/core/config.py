@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import Optional
 
 class Settings(BaseSettings):
     #project info
@@ -19,14 +20,128 @@ class Settings(BaseSettings):
     langsmith_endpoint: str | None = Field("https://api.smith.langchain.com", env="LANGSMITH_ENDPOINT")
     langsmith_project: str | None = Field("neuraline", env="LANGSMITH_PROJECT")
 
+    #telemetry exporter
+    telemetry_sink: str = Field("langsmith", env="TELEMETRY_SINK")  # langsmith | file | noop
+    telemetry_file_path: str = Field("./data/telemetry/events.jsonl", env="TELEMETRY_FILE_PATH")
+    telemetry_queue_size: int = Field(1000, env="TELEMETRY_QUEUE_SIZE")
+    telemetry_batch_size: int = Field(50, env="TELEMETRY_BATCH_SIZE")
+    telemetry_flush_interval: float = Field(2.0, env="TELEMETRY_FLUSH_INTERVAL")
+
     #Models
     gemini_api_key: str | None = Field(None, env="GEMINI_API_KEY")
     groq_api_key: str | None = Field(None, env="GROQ_API_KEY")
     hf_token: str | None = Field(None, env="HF_TOKEN")
     google_api_key: str | None = Field(None, env="GOOGLE_API_KEY")
+    gemini_model: str = Field("gemini-2.5-flash", env="GEMINI_MODEL")
+    groq_model: str = Field("llama-3.1-8b-instant", env="GROQ_MODEL")
+
+    #LLM transport (pooled keep-alive connections + per-provider concurrency)
+    llm_max_connections: int = Field(50, env="LLM_MAX_CONNECTIONS")
+    llm_max_keepalive_connections: int = Field(20, env="LLM_MAX_KEEPALIVE_CONNECTIONS")
+    llm_keepalive_expiry: float = Field(30.0, env="LLM_KEEPALIVE_EXPIRY")
+    llm_request_timeout: float = Field(60.0, env="LLM_REQUEST_TIMEOUT")
+    gemini_max_concurrency: int = Field(16, env="GEMINI_MAX_CONCURRENCY")
+    groq_max_concurrency: int = Field(16, env="GROQ_MAX_CONCURRENCY")
+
+    #provider health (circuit breakers, latency-aware routing, shared retry budget)
+    provider_health_window_seconds: float = Field(60.0, env="PROVIDER_HEALTH_WINDOW_SECONDS")
+    circuit_failure_threshold: float = Field(0.5, env="CIRCUIT_FAILURE_THRESHOLD")
+    circuit_min_requests: int = Field(5, env="CIRCUIT_MIN_REQUESTS")
+    circuit_consecutive_failures: int = Field(3, env="CIRCUIT_CONSECUTIVE_FAILURES")
+    circuit_open_seconds: float = Field(30.0, env="CIRCUIT_OPEN_SECONDS")
+    # prefer the other provider when the routed one's p90 is this many times slower (0 = off)
+    provider_latency_ratio: float = Field(3.0, env="PROVIDER_LATENCY_RATIO")
+    retry_budget_ratio: float = Field(0.2, env="RETRY_BUDGET_RATIO")
+    retry_budget_min_retries: int = Field(3, env="RETRY_BUDGET_MIN_RETRIES")
+    retry_budget_window_seconds: float = Field(10.0, env="RETRY_BUDGET_WINDOW_SECONDS")
+    # hedging: after the delay (HEDGE_DELAY_SECONDS, or the routed provider's tracked
+    # HEDGE_PERCENTILE latency when 0) the prompt is also sent to the fallback provider
+    hedging_enabled: bool = Field(False, env="HEDGING_ENABLED")
+    hedge_delay_seconds: float = Field(0.0, env="HEDGE_DELAY_SECONDS")
+    hedge_percentile: float = Field(90.0, env="HEDGE_PERCENTILE")
+    hedge_default_delay_seconds: float = Field(3.0, env="HEDGE_DEFAULT_DELAY_SECONDS")
+
+    #embeddings
+    embedding_model_name: str = Field("sentence-transformers/all-MiniLM-L6-v2", env="EMBEDDING_MODEL_NAME")
+    embedding_backend: str = Field("huggingface", env="EMBEDDING_BACKEND")  # huggingface | onnx
+    # onnx/model_quint8_avx2.onnx (or model_qint8_avx512.onnx) selects the int8-quantized export
+    embedding_onnx_file: str = Field("onnx/model.onnx", env="EMBEDDING_ONNX_FILE")
+    embedding_onnx_threads: int = Field(0, env="EMBEDDING_ONNX_THREADS")  # 0 = ONNX Runtime default
+    embedding_max_seq_length: int = Field(256, env="EMBEDDING_MAX_SEQ_LENGTH")
+    embedding_cache_max_entries: int = Field(4096, env="EMBEDDING_CACHE_MAX_ENTRIES")
+    # lowercase cache keys; only safe for uncased models like the default MiniLM
+    embedding_cache_casefold: bool = Field(True, env="EMBEDDING_CACHE_CASEFOLD")
+    # micro-batching: single embed calls wait up to EMBEDDING_BATCH_MAX_WAIT_MS to share a forward pass
+    embedding_batching_enabled: bool = Field(True, env="EMBEDDING_BATCHING_ENABLED")
+    embedding_batch_max_size: int = Field(32, env="EMBEDDING_BATCH_MAX_SIZE")
+    embedding_batch_max_wait_ms: float = Field(5.0, env="EMBEDDING_BATCH_MAX_WAIT_MS")
+    # how long a batched caller waits for its vector before giving up (0 = no limit)
+    embedding_batch_result_timeout_seconds: float = Field(30.0, env="EMBEDDING_BATCH_RESULT_TIMEOUT_SECONDS")
+
+    #semantic response cache (ModelRouter)
+    response_cache_enabled: bool = Field(False, env="RESPONSE_CACHE_ENABLED")
+    response_cache_path: str = Field("./data/cache/response_cache.sqlite3", env="RESPONSE_CACHE_PATH")
+    response_cache_threshold: float = Field(0.95, env="RESPONSE_CACHE_THRESHOLD")
+    response_cache_ttl_seconds: int = Field(86400, env="RESPONSE_CACHE_TTL_SECONDS")
+    response_cache_max_entries: int = Field(5000, env="RESPONSE_CACHE_MAX_ENTRIES")
+
+    #conversation memory
+    conversation_store: str = Field("chroma", env="CONVERSATION_STORE")  # chroma | sqlite
+    conversation_db_path: str = Field("./data/memory/conversations.sqlite3", env="CONVERSATION_DB_PATH")
+    mcp_memory_turns: int = Field(10, env="MCP_MEMORY_TURNS")
+    session_cache_max_sessions: int = Field(1000, env="SESSION_CACHE_MAX_SESSIONS")
+    session_cache_idle_seconds: float = Field(1800.0, env="SESSION_CACHE_IDLE_SECONDS")
+    # summary: keep the last CONVERSATION_SUMMARY_KEEP_TURNS turns verbatim, fold older ones into a summary
+    conversation_memory_mode: str = Field("buffer", env="CONVERSATION_MEMORY_MODE")  # buffer | summary
+    conversation_summary_keep_turns: int = Field(4, env="CONVERSATION_SUMMARY_KEEP_TURNS")
+    # write-behind: messages reach disk up to MEMORY_WRITE_BEHIND_INTERVAL seconds after a turn
+    memory_write_behind_enabled: bool = Field(True, env="MEMORY_WRITE_BEHIND_ENABLED")
+    memory_write_behind_batch_size: int = Field(64, env="MEMORY_WRITE_BEHIND_BATCH_SIZE")
+    memory_write_behind_interval: float = Field(1.0, env="MEMORY_WRITE_BEHIND_INTERVAL")
+
+    #MCP engine (prompt token budgets: app/mcp/prompt_assembler.py)
+    mcp_prompt_token_budget: int = Field(1500, env="MCP_PROMPT_TOKEN_BUDGET")
+    prompt_tokenizer_name: Optional[str] = Field(None, env="PROMPT_TOKENIZER_NAME")  # defaults to the embedding model
+    # the first prompt waits this long for the tokenizer before settling on a chars/4 estimate for the process
+    prompt_tokenizer_load_timeout_seconds: float = Field(10.0, env="PROMPT_TOKENIZER_LOAD_TIMEOUT_SECONDS")
+    # identical concurrent MCP runs share one execution; the key is a comma-separated
+    # subset of: session_id, query, mode, roles, timeout, use_cache, quorum. Leaving
+    # use_cache or timeout out lets a bypass_cache or shorter-timeout request join a run
+    # that does not honour them.
+    mcp_single_flight_enabled: bool = Field(True, env="MCP_SINGLE_FLIGHT_ENABLED")
+    mcp_single_flight_key: str = Field(
+        "session_id,query,mode,roles,timeout,use_cache,quorum", env="MCP_SINGLE_FLIGHT_KEY"
+    )
+    # end-to-end budget of an MCP/chat request when the client sends no `timeout`
+    request_deadline_seconds: float = Field(60.0, env="REQUEST_DEADLINE_SECONDS")
+    # upper bound on a single agent call within that budget
+    mcp_agent_timeout: float = Field(30.0, env="MCP_AGENT_TIMEOUT")
+    # mode="quorum" replies once these roles succeeded: "reflector+1", "reflector,strategist" or "N/M"
+    mcp_quorum: str = Field("reflector+1", env="MCP_QUORUM")
+    # on shutdown, how long quorum agents still running in the background may finish before they are cancelled
+    mcp_background_drain_seconds: float = Field(5.0, env="MCP_BACKGROUND_DRAIN_SECONDS")
 
     #vector DB
     chroma_path: str = Field("./chroma_storage", env="CHROMA_PATH")
+    knowledge_backend: str = Field("chroma", env="KNOWLEDGE_BACKEND")  # chroma | numpy (mmap export)
+
+    #retrieval (hybrid = BM25 + dense, merged with reciprocal-rank fusion)
+    retrieval_mode: str = Field("hybrid", env="RETRIEVAL_MODE")  # hybrid | dense | lexical
+    retrieval_rrf_k: int = Field(60, env="RETRIEVAL_RRF_K")
+    retrieval_candidates: int = Field(10, env="RETRIEVAL_CANDIDATES")
+    # above this many concurrent query embeddings, hybrid retrieval answers lexically
+    retrieval_dense_max_inflight: int = Field(8, env="RETRIEVAL_DENSE_MAX_INFLIGHT")
+
+    #task classification (nearest centroid over embeddings; keyword rules below this cosine score)
+    task_classifier_min_score: float = Field(0.3, env="TASK_CLASSIFIER_MIN_SCORE")
+
+    #knowledge corpus ingestion
+    knowledge_sources_dir: str = Field("./data/sources", env="KNOWLEDGE_SOURCES_DIR")
+    ingest_manifest_path: str = Field("./data/chroma/ingest_manifest.json", env="INGEST_MANIFEST_PATH")
+    ingest_batch_size: int = Field(64, env="INGEST_BATCH_SIZE")
+    corpus_watch_enabled: bool = Field(False, env="CORPUS_WATCH_ENABLED")
+    corpus_watch_debounce_ms: int = Field(1000, env="CORPUS_WATCH_DEBOUNCE_MS")
+    corpus_swap_grace_seconds: float = Field(30.0, env="CORPUS_SWAP_GRACE_SECONDS")
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,39 @@
+import time
+from typing import Optional
+
+from app.core.config import settings
+
+
+class Deadline:
+    """
+    End-to-end time budget for one request, created at the API layer.
+
+    Every stage below it (MCP engine, coordinator, model router, provider clients)
+    asks for `remaining()` instead of applying its own full timeout, so retries and
+    sequential agents cannot stretch a request past its budget. Based on the
+    monotonic clock, so wall-clock adjustments do not move it.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def from_timeout(cls, timeout: Optional[float] = None) -> "Deadline":
+        """A deadline `timeout` seconds from now, or REQUEST_DEADLINE_SECONDS when not given."""
+        return cls(timeout if timeout and timeout > 0 else settings.request_deadline_seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cap(self, timeout: Optional[float]) -> float:
+        """`timeout` shortened to what is left of the budget (the whole remainder if None)."""
+        remaining = self.remaining()
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.2f}s of {self.seconds:.2f}s)"
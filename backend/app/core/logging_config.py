@@ -2,6 +2,7 @@ import logging
 from datetime import datetime
 from langsmith import Client
 from app.core.config import settings
+from app.core.telemetry import TelemetryExporter, LangSmithSink, FileSink, NoopSink
 
 logging.basicConfig(
     level=logging.INFO,
@@ -10,16 +11,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger("neuraline")
 
-try:
-    client = Client(api_key=settings.langsmith_api_key)
-except Exception as e:
-    logger.warning(f"⚠️ Failed to initialize LangSmith client: {e}")
-    client = None
+
+def _build_sink():
+    sink_name = (settings.telemetry_sink or "noop").lower()
+    if sink_name == "file":
+        return FileSink(settings.telemetry_file_path)
+    if sink_name == "langsmith":
+        try:
+            return LangSmithSink(Client(api_key=settings.langsmith_api_key), settings.langsmith_project)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to initialize LangSmith client: {e}")
+    return NoopSink()
+
+
+telemetry_exporter = TelemetryExporter(
+    _build_sink(),
+    queue_size=settings.telemetry_queue_size,
+    batch_size=settings.telemetry_batch_size,
+    flush_interval=settings.telemetry_flush_interval,
+)
 
 
 def log_event(event_type: str, message: str, level: str = "info", run_type: str = "tool"):
     """
-    Logs an event locally and optionally sends it to LangSmith.
+    Logs an event locally and queues it for the telemetry exporter.
+
+    Never blocks on the network: the run is appended to a bounded queue that a
+    background thread flushes in batches to LangSmith, a local file, or nowhere.
 
     Args:
         event_type (str): short string (e.g., 'startup', 'request', 'error', 'model_call')
@@ -32,13 +50,8 @@ def log_event(event_type: str, message: str, level: str = "info", run_type: str
     log_method = getattr(logger, level, logger.info)
     log_method(f"[{event_type.upper()}] {message}")
 
-    if client:
-        try:
-            client.create_run(
-                name=event_type,
-                run_type=run_type,
-                inputs={"message": message, "timestamp": timestamp},
-                project_name=settings.langsmith_project,
-            )
-        except Exception as e:
-            logger.warning(f"Langsmith log failed: {e}")
\ No newline at end of file
+    telemetry_exporter.enqueue(
+        name=event_type,
+        run_type=run_type,
+        inputs={"message": message, "timestamp": timestamp},
+    )
\ No newline at end of file
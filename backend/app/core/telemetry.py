@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger("neuraline")
+
+
+class TelemetrySink:
+    """Destination for batches of telemetry runs. Subclasses implement `export`."""
+
+    name = "base"
+
+    def export(self, batch: List[Dict[str, Any]]):
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+class NoopSink(TelemetrySink):
+    """Discards runs; used to measure exporter overhead without any I/O."""
+
+    name = "noop"
+
+    def export(self, batch: List[Dict[str, Any]]):
+        return None
+
+
+class FileSink(TelemetrySink):
+    """Appends runs as JSON lines to a local file."""
+
+    name = "file"
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+
+    def export(self, batch: List[Dict[str, Any]]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for run in batch:
+                f.write(json.dumps(run, default=str) + "\n")
+
+
+class LangSmithSink(TelemetrySink):
+    """Ships runs to LangSmith, batching through `batch_ingest_runs` when the client supports it."""
+
+    name = "langsmith"
+
+    def __init__(self, client, project_name: Optional[str]):
+        self.client = client
+        self.project_name = project_name
+        self._batch_supported = hasattr(client, "batch_ingest_runs")
+
+    def export(self, batch: List[Dict[str, Any]]):
+        if self._batch_supported:
+            try:
+                self.client.batch_ingest_runs(create=[self._to_run(r) for r in batch])
+                return
+            except (AttributeError, TypeError) as e:
+                logger.warning(f"LangSmith batch ingest unavailable, sending runs one by one: {e}")
+                self._batch_supported = False
+        for r in batch:
+            self.client.create_run(
+                name=r["name"],
+                run_type=r["run_type"],
+                inputs=r["inputs"],
+                project_name=self.project_name,
+            )
+
+    def _to_run(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        run_id = str(uuid.uuid4())
+        start = record["start_time"]
+        return {
+            "id": run_id,
+            "trace_id": run_id,
+            "dotted_order": f"{start.strftime('%Y%m%dT%H%M%S%fZ')}{run_id}",
+            "name": record["name"],
+            "run_type": record["run_type"],
+            "inputs": record["inputs"],
+            "start_time": start,
+            "session_name": self.project_name,
+        }
+
+
+class TelemetryExporter:
+    """
+    Non-blocking exporter for `log_event` runs.
+
+    `enqueue` only appends to a bounded in-memory queue; a background thread drains it
+    in batches of `batch_size` (or every `flush_interval` seconds) and hands them to the
+    sink. When the queue is full the oldest run is dropped.
+    """
+
+    def __init__(
+        self,
+        sink: TelemetrySink,
+        queue_size: int = 1000,
+        batch_size: int = 50,
+        flush_interval: float = 2.0,
+    ):
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: Deque[Dict[str, Any]] = deque(maxlen=max(1, queue_size))
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._counters = {"enqueued": 0, "exported": 0, "dropped": 0, "failed": 0, "batches": 0}
+
+    def enqueue(self, name: str, run_type: str, inputs: Dict[str, Any]):
+        record = {
+            "name": name,
+            "run_type": run_type,
+            "inputs": inputs,
+            "start_time": datetime.utcnow(),
+        }
+        with self._cond:
+            if self._stopped:
+                self._counters["dropped"] += 1
+                return
+            if len(self._queue) == self._queue.maxlen:
+                self._counters["dropped"] += 1
+            self._queue.append(record)
+            self._counters["enqueued"] += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="telemetry-exporter", daemon=True
+                )
+                self._thread.start()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        while self._queue and len(batch) < self.batch_size:
+            batch.append(self._queue.popleft())
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopped and len(self._queue) < self.batch_size:
+                    self._cond.wait(timeout=self.flush_interval)
+                batch = self._take_batch()
+                stopping = self._stopped
+            if batch:
+                self._export(batch)
+            elif stopping:
+                return
+
+    def _export(self, batch: List[Dict[str, Any]]):
+        start = time.perf_counter()
+        try:
+            self.sink.export(batch)
+            with self._cond:
+                self._counters["exported"] += len(batch)
+                self._counters["batches"] += 1
+        except Exception as e:
+            with self._cond:
+                self._counters["failed"] += len(batch)
+            logger.warning(f"Telemetry export to {self.sink.name} failed: {e}")
+        logger.debug(f"Telemetry exported {len(batch)} runs in {time.perf_counter() - start:.4f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "sink": self.sink.name,
+                "queued": len(self._queue),
+                "capacity": self._queue.maxlen,
+                **self._counters,
+            }
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop accepting runs and flush whatever is still queued."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        else:
+            while True:
+                with self._cond:
+                    batch = self._take_batch()
+                if not batch:
+                    break
+                self._export(batch)
+        self.sink.close()
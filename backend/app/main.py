@@ -1,8 +1,15 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.routes import health, auth, mcp, chat
+from app.api.v1.routes import health, auth, mcp, chat, metrics
 from app.core.config import settings
-from app.core.logging_config import log_event
+from app.core.logging_config import log_event, telemetry_exporter
+from app.mcp.mcp_engine import get_mcp_engine
+from app.services.embedding_registry import embedding_registry
+from app.services.llm_transport import llm_transport
+from app.services.corpus_watcher import CorpusWatcher
+from app.services.memory.factory import get_conversation_store
+from app.services.tokenizer import get_token_counter
 
 app = FastAPI(title=settings.project_name, version="1.0.0")
 
@@ -18,10 +25,33 @@ app.include_router(health.router, prefix=f"{settings.api_v1_str}")
 app.include_router(auth.router, prefix=f"{settings.api_v1_str}")
 app.include_router(mcp.router, prefix="/api/v1/mcp", tags=["mcp"])
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["Chat"])
+app.include_router(metrics.router, prefix=f"{settings.api_v1_str}")
+
+corpus_watcher = CorpusWatcher() if settings.corpus_watch_enabled else None
 
 @app.on_event("startup")
 async def startup_event():
     log_event("STARTUP", "🚀 Neuraline backend started successfully")
+    report = embedding_registry.memory_report()
+    log_event(
+        "STARTUP",
+        f"🧮 Embedding models loaded={report['loaded_models']} "
+        f"models={report['models']} rss={report['process_rss_mb']}MB",
+    )
+    get_token_counter().warm_up()
+    if corpus_watcher is not None:
+        corpus_watcher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    log_event("SHUTDOWN", "👋 Neuraline backend shutting down")
+    if corpus_watcher is not None:
+        await corpus_watcher.stop()
+    # background quorum agents still call providers and write to the session store
+    await get_mcp_engine().aclose()
+    await llm_transport.aclose()
+    await asyncio.to_thread(get_conversation_store().close)
+    await asyncio.to_thread(telemetry_exporter.shutdown)
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -1,10 +1,20 @@
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any, Set, Tuple
 
-from app.services.model_router import ModelRouter
-from app.services.retriever import ContextRetriever
-from app.services.memory.chroma_memory import ChromaConversationMemory
+from app.agents.coordinator import AGENT_DEPENDENCIES
+from app.agents.scheduler import ancestors, run_dag, select_dependencies
+from app.mcp.prompt_assembler import get_prompt_assembler
+from app.mcp.quorum import Quorum
+from app.services.model_router import LOCAL_FALLBACK_PREFIX, ModelRouter
+from app.services.provider_health import provider_health
+from app.services.retriever import ContextRetriever, RetrievalResult
+from app.services.single_flight import SingleFlight
+from app.services.task_classifier import get_task_classifier
+from app.services.memory.base import ConversationStore
+from app.services.memory.factory import get_conversation_store
+from app.core.config import settings
+from app.core.deadline import Deadline
 from app.core.logging_config import log_event
 
 logger = logging.getLogger(__name__)
@@ -28,53 +38,95 @@ AGENT_PROFILES: Dict[str, str] = {
     ),
 }
 
+ROLE_TASK_TYPES: Dict[str, str] = {
+    "reflector": "emotional_reflection",
+    "strategist": "cognitive_reasoning",
+    "coach": "behavioral_coaching",
+    "purpose": "purpose_alignment",
+}
+
+# run parameters MCP_SINGLE_FLIGHT_KEY may name
+SINGLE_FLIGHT_KEY_FIELDS = ("session_id", "query", "mode", "roles", "timeout", "use_cache", "quorum")
+
+
+def parse_single_flight_key(spec: str) -> List[str]:
+    """Field names of MCP_SINGLE_FLIGHT_KEY; a typo would silently widen the key, so it is an error."""
+    fields = [f.strip() for f in spec.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in SINGLE_FLIGHT_KEY_FIELDS]
+    if unknown or not fields:
+        raise ValueError(
+            f"Invalid MCP_SINGLE_FLIGHT_KEY '{spec}': unknown fields {unknown}; "
+            f"use a comma-separated subset of {', '.join(SINGLE_FLIGHT_KEY_FIELDS)}"
+        )
+    return fields
+
+
 class MCPEngine:
     """
     Model Context Protocol engine for coordinating multiple agents.
 
     - Shares RAG context and session memory
-    - Supports 'parallel' or 'chain' execution modes
+    - Supports 'parallel', 'chain', dependency-'graph' or 'quorum' execution modes
+      ('quorum' answers once MCP_QUORUM roles succeeded, or like 'parallel' when that is out
+      of reach; the rest finish in the background and land in session memory for the next turn)
     - Provides graceful fallback fusion into Neuraline voice
+    - Bounds each request by a `Deadline`: agents get its remaining budget, and once it
+      expires the agents that finished are returned (`deadline_exceeded` in the result)
     """
 
     def __init__(
         self,
         retriever: Optional[ContextRetriever] = None,
         model_router: Optional[ModelRouter] = None,
-        memory_store: Optional[ChromaConversationMemory] = None,
+        memory_store: Optional[ConversationStore] = None,
     ):
         self.retriever = retriever or ContextRetriever()
-        self.model_router = model_router or ModelRouter()
-        self.memory_store = memory_store or ChromaConversationMemory()
-        self.agent_timeout = 30
+        self.model_router = model_router or ModelRouter(retriever=self.retriever)
+        self.memory_store = memory_store or get_conversation_store()
+        self.prompt_assembler = get_prompt_assembler()
+        self.classifier = get_task_classifier()
+        self.single_flight = SingleFlight("mcp_run")
+        self.single_flight_fields = parse_single_flight_key(settings.mcp_single_flight_key)
+        # requests without a `quorum` fall back to MCP_QUORUM, so a bad value must fail here
+        try:
+            self.parse_quorum(settings.mcp_quorum, list(AGENT_PROFILES))
+        except ValueError as e:
+            raise ValueError(f"Invalid MCP_QUORUM: {e}") from e
+        self.agent_timeout = settings.mcp_agent_timeout
         self.retries = 1
+        # agents still running after a quorum-mode reply; referenced so they are not garbage collected
+        self._background: Set[asyncio.Task] = set()
 
-    async def _get_context(self, query: str) -> str:
+    async def _get_context(self, query: str) -> RetrievalResult:
+        """Run the turn's single retrieval (one embedding, one vector query) shared by every agent."""
         try:
-            ctx = await asyncio.to_thread(self.retriever.retrieve, query)
-            return ctx or ""
+            return await asyncio.to_thread(self.retriever.search, query)
         except Exception as e:
             logger.warning("MCP: retrieval failed: %s", e)
-            return ""
+            return RetrievalResult(query=query)
+
+    async def _classify(self, retrieval: RetrievalResult) -> str:
+        """Classify the turn once, reusing the retrieval's query embedding when there is one."""
+        return await asyncio.to_thread(self.classifier.classify, retrieval.query, retrieval.embedding)
+
+    @staticmethod
+    def _agent_task_type(role: str, task_type: Optional[str]) -> str:
+        """Task type the router sees for `role`: the role's own (ROLE_TASK_TYPES), else the turn's."""
+        return ROLE_TASK_TYPES.get(role) or task_type or "general_chat"
 
     def _build_agent_prompt(
-        self, role: str, context: str, query: str, snapshot: Optional[Dict[str, str]] = None
+        self,
+        role: str,
+        context: str,
+        query: str,
+        snapshot: Optional[Dict[str, str]] = None,
+        memory: str = "",
     ) -> str:
+        """Assemble the agent prompt within the role's token budget (see PromptAssembler)."""
         profile = AGENT_PROFILES.get(role, f"{role} agent")
-        snapshot_text = ""
-        if snapshot:
-            snapshot_text = "\n\nPrevious agent snapshots:\n" + "\n".join(
-                f"[{r}] {t}" for r, t in snapshot.items()
-            )
-        prompt = (
-            f"[{role.upper()} AGENT]\n"
-            f"Role description:\n{profile}\n\n"
-            f"Context:\n{context or 'No context available.'}\n\n"
-            f"User query:\n{query}\n\n"
-            f"{snapshot_text}\n\n"
-            f"Please respond concisely and include helpful next steps or reflective questions where relevant."
+        return self.prompt_assembler.build(
+            role, profile, query, context=context, memory=memory, snapshot=snapshot
         )
-        return prompt
 
     def _fuse_dialogue(self, snapshot: dict) -> str:
         """
@@ -110,29 +162,134 @@ class MCPEngine:
                 f"(fusion fallback: {e})"
             )
 
-    async def _call_agent(self, role: str, prompt: str) -> Dict[str, Any]:
+    def _dependency_snapshot(
+        self, graph: Dict[str, List[str]], role: str, roles: List[str], snapshot: Dict[str, str]
+    ) -> Optional[Dict[str, str]]:
+        """Outputs of the agents `role` depends on (directly or transitively), in role order."""
+        deps = ancestors(graph, role)
+        snap = {r: snapshot[r] for r in roles if r in deps and r in snapshot}
+        return snap or None
+
+    async def _load_memory_text(self, session_id: str) -> str:
+        summary = ""
+        try:
+            persisted = await asyncio.to_thread(
+                self.memory_store.tail, session_id, settings.mcp_memory_turns
+            )
+            if settings.conversation_memory_mode.lower() == "summary":
+                record = await asyncio.to_thread(self.memory_store.load_summary, session_id)
+                summary = (record or {}).get("summary", "")
+        except Exception as e:
+            logger.debug("MCP: failed to load session memory: %s", e)
+            persisted = []
+
+        lines = [f"{m.get('role')}: {m.get('content')}" for m in persisted]
+        if summary:
+            lines.insert(0, f"Summary of earlier conversation: {summary}")
+        return "\n".join(lines)
+
+    async def _call_agent(
+        self,
+        role: str,
+        prompt: str,
+        query: Optional[str] = None,
+        use_cache: bool = True,
+        deadline: Optional[Deadline] = None,
+        task_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Calls the model router with the agent prompt and returns a result dict.
-        Handles retries and provides fallback text on failure.
+        Handles retries (within the shared retry budget) and provides fallback text on failure.
+        `query` (the user's message) keys the router's semantic response cache. `task_type`
+        (the turn's classification) routes roles that have no task type of their own.
+        Each attempt gets min(agent_timeout, the deadline's remaining budget); no attempt
+        or retry starts once the deadline has expired.
         """
         attempt = 0
         last_exc = None
         while attempt <= self.retries:
+            if deadline and deadline.expired:
+                break
             try:
                 response = await asyncio.wait_for(
-                    self.model_router.run(prompt), timeout=self.agent_timeout
+                    self.model_router.run(
+                        prompt,
+                        task_type=self._agent_task_type(role, task_type),
+                        retrieval="never",
+                        use_cache=use_cache,
+                        cache_key=query,
+                        cache_namespace=f"mcp:{role}",
+                        deadline=deadline,
+                    ),
+                    timeout=deadline.cap(self.agent_timeout) if deadline else self.agent_timeout,
                 )
+                if deadline and deadline.expired and response.startswith(LOCAL_FALLBACK_PREFIX):
+                    # the router gave up because the budget ran out, not because the agent answered
+                    break
                 return {"role": role, "success": True, "output": response}
             except Exception as e:
                 last_exc = e
                 attempt += 1
                 logger.warning("MCP: agent %s call failed (attempt %s): %s", role, attempt, e)
+                if attempt > self.retries:
+                    break
+                if deadline and deadline.remaining() <= 0.5 * attempt:
+                    break
+                if not provider_health.retry_budget.try_retry():
+                    logger.warning("MCP: retry budget exhausted, not retrying agent %s", role)
+                    break
                 await asyncio.sleep(0.5 * attempt)
 
+        return self._failed(role, last_exc, deadline)
+
+    @staticmethod
+    def _failed(role: str, error: Optional[BaseException], deadline: Optional[Deadline]) -> Dict[str, Any]:
+        if deadline and deadline.expired:
+            log_event("DEADLINE", f"⏰ {role} did not finish before the request deadline")
+            return {
+                "role": role,
+                "success": False,
+                "deadline_exceeded": True,
+                "error": "request deadline exceeded",
+                "output": "",
+            }
         fallback_msg = (
             f"(local fallback by {role}) The {role} agent could not produce a response right now."
         )
-        return {"role": role, "success": False, "error": str(last_exc), "output": fallback_msg}
+        return {"role": role, "success": False, "error": str(error), "output": fallback_msg}
+
+    @staticmethod
+    def _deadline_exceeded(results: Dict[str, Dict[str, Any]]) -> bool:
+        return any(res.get("deadline_exceeded") for res in results.values())
+
+    @staticmethod
+    def _answered(res: Dict[str, Any]) -> bool:
+        """Whether an agent really answered: the router's local fallback text does not count."""
+        return bool(res.get("success")) and not str(res.get("output", "")).startswith(LOCAL_FALLBACK_PREFIX)
+
+    @staticmethod
+    def _record(results: Dict[str, Dict[str, Any]], snapshot: Dict[str, str], res: Dict[str, Any]):
+        """Store an agent result; agents cut off by the deadline stay out of the fused snapshot."""
+        results[res["role"]] = res
+        if not res.get("deadline_exceeded"):
+            snapshot[res["role"]] = res.get("output", "")
+
+    def parse_quorum(self, spec: Optional[str], roles: Optional[List[str]] = None) -> Quorum:
+        """Quorum for a run of `roles` (`spec`, else MCP_QUORUM); ValueError if the spec is malformed."""
+        roles = roles or ["reflector", "strategist", "coach", "purpose"]
+        return Quorum.parse(spec or settings.mcp_quorum, roles, known_roles=AGENT_PROFILES)
+
+    def _single_flight_key(self, **params) -> Tuple:
+        """Coalescing key built from the run parameters named in MCP_SINGLE_FLIGHT_KEY."""
+        key = []
+        for name in self.single_flight_fields:
+            value = params.get(name)
+            if name == "query" and isinstance(value, str):
+                value = " ".join(value.split())
+            elif isinstance(value, list):
+                value = tuple(value)
+            key.append((name, value))
+        return tuple(key)
 
     async def run(
         self,
@@ -141,26 +298,55 @@ class MCPEngine:
         mode: str = "chain",
         roles: Optional[List[str]] = None,
         timeout: Optional[int] = None,
+        use_cache: bool = True,
+        deadline: Optional[Deadline] = None,
+        quorum: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Run MCP orchestration with reflection → strategy → coaching → purpose fusion.
+        `use_cache=False` bypasses the semantic response cache for this request.
+        `deadline` bounds the whole run (default: `timeout` seconds, else
+        REQUEST_DEADLINE_SECONDS); when it expires the finished agents are returned.
+        `quorum` overrides MCP_QUORUM for mode="quorum" (see app/mcp/quorum.py).
+
+        Identical runs already in flight (same MCP_SINGLE_FLIGHT_KEY fields, e.g. a
+        double submit or a client retry) are joined rather than started again.
         """
         roles = roles or ["reflector", "strategist", "coach", "purpose"]
-        if timeout:
-            self.agent_timeout = timeout
+        deadline = deadline or Deadline.from_timeout(timeout)
 
-        context = await self._get_context(query)
-        log_event("MCP", f"MCP run start session={session_id} mode={mode} roles={roles}")
+        async def execute():
+            return await self._run(query, session_id, mode, roles, deadline, use_cache, quorum)
 
-        try:
-            persisted = await asyncio.to_thread(self.memory_store.load_session_history, session_id)
-        except Exception as e:
-            logger.debug("MCP: failed to load session memory: %s", e)
-            persisted = []
+        if not settings.mcp_single_flight_enabled:
+            return await execute()
+        key = self._single_flight_key(
+            query=query,
+            session_id=session_id,
+            mode=mode,
+            roles=roles,
+            timeout=timeout,
+            use_cache=use_cache,
+            quorum=quorum,
+        )
+        return await self.single_flight.do(key, execute)
+
+    async def _run(
+        self,
+        query: str,
+        session_id: str,
+        mode: str,
+        roles: List[str],
+        deadline: Deadline,
+        use_cache: bool,
+        quorum: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        retrieval = await self._get_context(query)
+        context = retrieval.text
+        task_type = await self._classify(retrieval)
+        log_event("MCP", f"MCP run start session={session_id} mode={mode} task={task_type} roles={roles}")
 
-        memory_text = ""
-        if persisted:
-            memory_text = "\n".join(f"{m.get('role')}: {m.get('content')}" for m in persisted[-10:])
+        memory_text = await self._load_memory_text(session_id)
 
         results: Dict[str, Dict[str, Any]] = {}
         snapshot: Dict[str, str] = {}
@@ -168,12 +354,11 @@ class MCPEngine:
         if mode == "parallel":
             tasks = []
             for role in roles:
-                prompt = self._build_agent_prompt(role, context or memory_text, query, snapshot=None)
-                tasks.append(self._call_agent(role, prompt))
+                prompt = self._build_agent_prompt(role, context, query, snapshot=None, memory=memory_text)
+                tasks.append(self._call_agent(role, prompt, query, use_cache, deadline, task_type))
             agent_outputs = await asyncio.gather(*tasks)
             for res in agent_outputs:
-                results[res["role"]] = res
-                snapshot[res["role"]] = res.get("output", "")
+                self._record(results, snapshot, res)
 
             best_role = next((r for r in roles if results.get(r, {}).get("success")), roles[0])
             combined = self._fuse_dialogue(snapshot)
@@ -181,18 +366,89 @@ class MCPEngine:
 
             return {
                 "mode": "parallel",
+                "task_type": task_type,
                 "best_role": best_role,
                 "snapshot": snapshot,
                 "combined": combined,
                 "results": results,
+                "deadline_exceeded": self._deadline_exceeded(results),
+            }
+
+        elif mode == "quorum":
+            required = self.parse_quorum(quorum, roles)
+            tasks = {
+                asyncio.create_task(
+                    self._call_agent(
+                        role,
+                        self._build_agent_prompt(role, context, query, snapshot=None, memory=memory_text),
+                        query,
+                        use_cache,
+                        deadline,
+                        task_type,
+                    )
+                ): role
+                for role in roles
+            }
+            succeeded, pending = await self._wait_for_quorum(
+                session_id, required, tasks, lambda res: self._record(results, snapshot, res)
+            )
+            late_roles = [r for r in roles if r in {tasks[t] for t in pending}]
+            for task in pending:
+                self._finish_in_background(session_id, task)
+
+            ordered = [r for r in roles if r in snapshot]
+            snapshot = {r: snapshot[r] for r in ordered}
+            best_role = next((r for r in roles if r in succeeded), roles[0])
+            combined = self._fuse_dialogue(snapshot)
+            log_event(
+                "MCP_QUORUM",
+                f"session={session_id} quorum={required} met={required.met(succeeded)} "
+                f"answered={ordered} background={late_roles}",
+            )
+
+            return {
+                "mode": "quorum",
+                "task_type": task_type,
+                "best_role": best_role,
+                "snapshot": snapshot,
+                "combined": combined,
+                "results": results,
+                "pending_roles": late_roles,
+                "deadline_exceeded": self._deadline_exceeded(results),
+            }
+
+        elif mode == "graph":
+            graph = select_dependencies(AGENT_DEPENDENCIES, roles)
+
+            async def run_role(role: str) -> Dict[str, Any]:
+                snap = self._dependency_snapshot(graph, role, roles, snapshot)
+                prompt = self._build_agent_prompt(role, context, query, snapshot=snap, memory=memory_text)
+                res = await self._call_agent(role, prompt, query, use_cache, deadline, task_type)
+                self._record(results, snapshot, res)
+                return res
+
+            await run_dag(graph, run_role)
+            snapshot = {r: snapshot[r] for r in roles if r in snapshot}
+
+            best_role = next((r for r in roles if results.get(r, {}).get("success")), roles[0])
+            combined = self._fuse_dialogue(snapshot)
+            log_event("MCP_GRAPH", f"session={session_id} best_role={best_role}")
+
+            return {
+                "mode": "graph",
+                "task_type": task_type,
+                "best_role": best_role,
+                "snapshot": snapshot,
+                "combined": combined,
+                "results": results,
+                "deadline_exceeded": self._deadline_exceeded(results),
             }
 
         else: 
             for role in roles:
-                prompt = self._build_agent_prompt(role, context or memory_text, query, snapshot=snapshot)
-                res = await self._call_agent(role, prompt)
-                results[role] = res
-                snapshot[role] = res.get("output", "")
+                prompt = self._build_agent_prompt(role, context, query, snapshot=snapshot, memory=memory_text)
+                res = await self._call_agent(role, prompt, query, use_cache, deadline, task_type)
+                self._record(results, snapshot, res)
 
             best_role = next((r for r in roles if results.get(r, {}).get("success")), roles[0])
             combined = self._fuse_dialogue(snapshot)
@@ -200,13 +456,269 @@ class MCPEngine:
 
             return {
                 "mode": "chain",
+                "task_type": task_type,
                 "best_role": best_role,
                 "snapshot": snapshot,
                 "combined": combined,
                 "results": results,
+                "deadline_exceeded": self._deadline_exceeded(results),
             }
 
-    async def run_mcp(self, request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _wait_for_quorum(
+        self,
+        session_id: str,
+        required: Quorum,
+        tasks: Dict[asyncio.Task, str],
+        on_result: Callable[[Dict[str, Any]], None],
+    ) -> Tuple[Set[str], Set[asyncio.Task]]:
+        """
+        Wait on the agent `tasks` (task -> role) until `required` is met, passing each result
+        to `on_result`; returns (roles that answered, tasks still running). Once the quorum
+        is out of reach every role is awaited, like parallel mode (each agent call is bounded
+        by the deadline). The tasks are cancelled if the wait itself is.
+        """
+        pending = set(tasks)
+        succeeded: Set[str] = set()
+        out_of_reach = False
+        try:
+            while pending and not required.met(succeeded):
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    res = task.result()
+                    on_result(res)
+                    if self._answered(res):
+                        succeeded.add(res["role"])
+                if not out_of_reach and not required.reachable(succeeded, {tasks[t] for t in pending}):
+                    out_of_reach = True
+                    log_event(
+                        "MCP_QUORUM",
+                        f"session={session_id} quorum={required} out of reach, waiting for the remaining roles",
+                        level="warning",
+                    )
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+        return succeeded, pending
+
+    def _finish_in_background(self, session_id: str, agent_task: asyncio.Task):
+        """Let an agent the quorum did not wait for finish, then save its answer to session memory."""
+
+        async def persist():
+            res = await agent_task
+            if not res.get("success"):
+                return
+            try:
+                await asyncio.to_thread(
+                    self.memory_store.save_message, session_id, f"{res['role']}_agent", res.get("output", "")
+                )
+                log_event("MCP_QUORUM", f"session={session_id} saved late {res['role']} result to memory")
+            except Exception as e:
+                logger.warning("MCP: failed to save late %s result: %s", res["role"], e)
+
+        task = asyncio.create_task(persist())
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("MCP: background quorum agent failed: %r", task.exception())
+
+    async def aclose(self, timeout: Optional[float] = None):
+        """
+        Shutdown hook: give the quorum agents still running in the background up to
+        `timeout` seconds (MCP_BACKGROUND_DRAIN_SECONDS) to finish and save their answers,
+        then cancel the rest. Call it before the providers' HTTP pool and the session
+        store are closed.
+        """
+        tasks = list(self._background)
+        if not tasks:
+            return
+        timeout = settings.mcp_background_drain_seconds if timeout is None else timeout
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        log_event(
+            "SHUTDOWN",
+            f"🧹 MCP background agents: {len(tasks) - len(pending)} finished, {len(pending)} cancelled",
+        )
+
+    async def _stream_agent(
+        self,
+        role: str,
+        prompt: str,
+        emit: Callable[[Dict[str, Any]], Awaitable[None]],
+        query: Optional[str] = None,
+        use_cache: bool = True,
+        deadline: Optional[Deadline] = None,
+        task_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Stream one agent's tokens as events through `emit`. If streaming fails before any token was
+        emitted, fall back to the regular `_call_agent` path (with its retries) so the agent
+        still produces a result. A failure after tokens went out, a stream timeout or an
+        expired deadline ends the agent as failed with the partial output instead, so the
+        client never receives a second copy of the text or waits for the agent twice.
+        """
+        if deadline and deadline.expired:
+            return self._failed(role, None, deadline)
+        chunks: List[str] = []
+
+        async def consume():
+            async for delta in self.model_router.stream(
+                prompt,
+                task_type=self._agent_task_type(role, task_type),
+                retrieval="never",
+                use_cache=use_cache,
+                cache_key=query,
+                cache_namespace=f"mcp:{role}",
+                deadline=deadline,
+            ):
+                chunks.append(delta)
+                await emit({"event": "token", "role": role, "delta": delta})
+
+        try:
+            timeout = deadline.cap(self.agent_timeout) if deadline else self.agent_timeout
+            await asyncio.wait_for(consume(), timeout=timeout)
+            return {"role": role, "success": True, "output": "".join(chunks)}
+        except Exception as e:
+            if deadline and deadline.expired:
+                return self._failed(role, e, deadline)
+            if chunks or isinstance(e, asyncio.TimeoutError):
+                logger.warning("MCP: agent %s stream failed after %s chunks: %s", role, len(chunks), e)
+                return {
+                    "role": role,
+                    "success": False,
+                    "partial": True,
+                    "error": str(e) or e.__class__.__name__,
+                    "output": "".join(chunks),
+                }
+            logger.warning("MCP: agent %s stream failed, retrying without streaming: %s", role, e)
+            return await self._call_agent(role, prompt, query, use_cache, deadline, task_type)
+
+    async def run_stream(
+        self,
+        query: str,
+        session_id: str,
+        mode: str = "chain",
+        roles: Optional[List[str]] = None,
+        timeout: Optional[int] = None,
+        use_cache: bool = True,
+        deadline: Optional[Deadline] = None,
+        quorum: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of `run`. Yields events as soon as they are available:
+        - {"event": "token", "role", "delta"} incremental provider output
+        - {"event": "agent", "role", "success", "output"} when an agent completes
+          (`partial: true` if its stream broke off; `output` is then what was already streamed)
+        - {"event": "agent_detached", "role"} quorum mode only: the reply stopped waiting for
+          this role, so drop any of its tokens already received
+        - {"event": "final", ...} the same payload `run` returns
+
+        In quorum mode the agents stream in parallel and `final` follows as soon as the
+        quorum is met; roles still running are detached, listed in `pending_roles`, emit
+        nothing further and land in session memory when they finish.
+        """
+        roles = roles or ["reflector", "strategist", "coach", "purpose"]
+        mode = mode if mode in ("parallel", "graph", "quorum") else "chain"
+        required = self.parse_quorum(quorum, roles) if mode == "quorum" else None
+        deadline = deadline or Deadline.from_timeout(timeout)
+
+        retrieval = await self._get_context(query)
+        context = retrieval.text
+        task_type = await self._classify(retrieval)
+        log_event("MCP", f"MCP stream start session={session_id} mode={mode} task={task_type} roles={roles}")
+        memory_text = await self._load_memory_text(session_id)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        snapshot: Dict[str, str] = {}
+        events: asyncio.Queue = asyncio.Queue()
+        done = object()
+        succeeded: Set[str] = set()
+        # quorum mode: roles the reply did not wait for; they emit nothing once detached
+        late_roles: Set[str] = set()
+
+        def emitter(role: str) -> Callable[[Dict[str, Any]], Awaitable[None]]:
+            async def emit(event: Dict[str, Any]):
+                if role not in late_roles:
+                    await events.put(event)
+            return emit
+
+        async def run_role(role: str, snap: Optional[Dict[str, str]]) -> Dict[str, Any]:
+            prompt = self._build_agent_prompt(role, context, query, snapshot=snap, memory=memory_text)
+            emit = emitter(role)
+            res = await self._stream_agent(role, prompt, emit, query, use_cache, deadline, task_type)
+            if role not in late_roles:
+                self._record(results, snapshot, res)
+                await emit({"event": "agent", **res})
+            return res
+
+        async def drive():
+            try:
+                if mode == "parallel":
+                    await asyncio.gather(*(run_role(role, None) for role in roles))
+                elif mode == "quorum":
+                    tasks = {asyncio.create_task(run_role(role, None)): role for role in roles}
+                    answered, pending = await self._wait_for_quorum(session_id, required, tasks, lambda res: None)
+                    succeeded.update(answered)
+                    late_roles.update(tasks[t] for t in pending)
+                    for role in roles:
+                        if role in late_roles:
+                            # tokens it queued before this point may already have reached the client
+                            await events.put({"event": "agent_detached", "role": role})
+                    for task in pending:
+                        self._finish_in_background(session_id, task)
+                elif mode == "graph":
+                    graph = select_dependencies(AGENT_DEPENDENCIES, roles)
+                    await run_dag(
+                        graph,
+                        lambda role: run_role(role, self._dependency_snapshot(graph, role, roles, snapshot)),
+                    )
+                else:
+                    for role in roles:
+                        await run_role(role, dict(snapshot))
+            finally:
+                await events.put(done)
+
+        driver = asyncio.create_task(drive())
+        try:
+            while True:
+                event = await events.get()
+                if event is done:
+                    break
+                yield event
+            await driver
+        finally:
+            if not driver.done():
+                driver.cancel()
+
+        snapshot = {r: snapshot[r] for r in roles if r in snapshot}
+        if mode == "quorum":
+            best_role = next((r for r in roles if r in succeeded), roles[0])
+        else:
+            best_role = next((r for r in roles if results.get(r, {}).get("success")), roles[0])
+        combined = self._fuse_dialogue(snapshot)
+        log_event("MCP_STREAM", f"session={session_id} mode={mode} best_role={best_role}")
+
+        final = {
+            "event": "final",
+            "mode": mode,
+            "task_type": task_type,
+            "best_role": best_role,
+            "snapshot": snapshot,
+            "combined": combined,
+            "results": dict(results),
+            "deadline_exceeded": self._deadline_exceeded(results),
+        }
+        if mode == "quorum":
+            final["pending_roles"] = [r for r in roles if r in late_roles]
+        yield final
+
+    async def run_mcp(self, request: Dict[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Wrapper for unified MCP execution — accepts dict, forwards to run().
         """
@@ -215,5 +727,27 @@ class MCPEngine:
         mode = request.get("mode", "chain")
         roles = request.get("roles", None)
         timeout = request.get("timeout", None)
+        use_cache = not request.get("bypass_cache", False)
+        quorum = request.get("quorum", None)
+
+        return await self.run(
+            query=query,
+            session_id=session_id,
+            mode=mode,
+            roles=roles,
+            timeout=timeout,
+            use_cache=use_cache,
+            deadline=deadline,
+            quorum=quorum,
+        )
+
+
+_shared_engine: Optional[MCPEngine] = None
+
 
-        return await self.run(query=query, session_id=session_id, mode=mode, roles=roles, timeout=timeout)
\ No newline at end of file
+def get_mcp_engine() -> MCPEngine:
+    """Return the process-wide MCPEngine shared by the API routes and orchestrator."""
+    global _shared_engine
+    if _shared_engine is None:
+        _shared_engine = MCPEngine()
+    return _shared_engine
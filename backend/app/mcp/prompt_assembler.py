@@ -0,0 +1,154 @@
+import logging
+from typing import Dict, List, Optional
+
+from app.agents.coordinator import AGENT_DEPENDENCIES
+from app.agents.scheduler import ancestors
+from app.core.config import settings
+from app.core.logging_config import log_event
+from app.services.tokenizer import TokenCounter, get_token_counter
+
+logger = logging.getLogger(__name__)
+
+# Extra input budget per upstream agent, as a fraction of MCP_PROMPT_TOKEN_BUDGET.
+UPSTREAM_BUDGET_STEP = 0.25
+
+# Input budget per role, as a multiple of MCP_PROMPT_TOKEN_BUDGET: every agent it
+# (transitively) depends on in AGENT_DEPENDENCIES adds a snapshot to its prompt, so
+# reflector 1.0, strategist 1.25, coach and purpose 1.5.
+ROLE_BUDGET_SCALE: Dict[str, float] = {
+    role: 1.0 + UPSTREAM_BUDGET_STEP * len(ancestors(AGENT_DEPENDENCIES, role))
+    for role in AGENT_DEPENDENCIES
+}
+
+# How the variable part of the budget is shared between sections; a section that
+# needs less than its share hands the rest to the others.
+SECTION_WEIGHTS: Dict[str, int] = {"snapshot": 3, "context": 2, "memory": 1}
+
+TRIM_MARKER = " …[trimmed]"
+INSTRUCTIONS = "Please respond concisely and include helpful next steps or reflective questions where relevant."
+
+
+def allocate(demands: Dict[str, int], weights: Dict[str, int], budget: int) -> Dict[str, int]:
+    """
+    Split `budget` between sections by weight. A section whose demand fits its
+    share gets exactly its demand and the surplus is re-split among the rest, so
+    the result is deterministic and never exceeds either demand or budget.
+    """
+    alloc = {name: 0 for name in demands}
+    remaining = max(0, budget)
+    pending = [name for name, demand in demands.items() if demand > 0]
+    while pending:
+        total_weight = sum(weights.get(name, 1) for name in pending)
+        fits = [n for n in pending if demands[n] * total_weight <= remaining * weights.get(n, 1)]
+        if not fits:
+            for n in pending:
+                alloc[n] = remaining * weights.get(n, 1) // total_weight
+            break
+        for n in fits:
+            alloc[n] = demands[n]
+            remaining -= demands[n]
+            pending.remove(n)
+    return alloc
+
+
+class PromptAssembler:
+    """
+    Builds MCP agent prompts within a per-role token budget.
+
+    The role header, query and instructions are always kept. What is left of the
+    budget is shared between the dependency snapshots, retrieved context and
+    session memory (see `SECTION_WEIGHTS`), and each is trimmed deterministically:
+    context keeps its head (documents arrive in relevance order), memory keeps its
+    tail (the most recent turns), and the snapshot budget is split evenly across
+    agents, each keeping the start of its answer.
+    """
+
+    def __init__(self, counter: Optional[TokenCounter] = None, base_budget: Optional[int] = None):
+        self.counter = counter or get_token_counter()
+        self.base_budget = base_budget or settings.mcp_prompt_token_budget
+
+    def budget_for(self, role: str) -> int:
+        return int(self.base_budget * ROLE_BUDGET_SCALE.get(role, 1.0))
+
+    def _trim(self, text: str, max_tokens: int, keep: str = "head") -> str:
+        if self.counter.count(text) <= max_tokens:
+            return text
+        marker_tokens = self.counter.count(TRIM_MARKER)
+        if max_tokens <= marker_tokens:
+            return ""
+        if keep == "tail":
+            return TRIM_MARKER.strip() + " " + self.counter.keep_tail(text, max_tokens - marker_tokens)
+        return self.counter.keep_head(text, max_tokens - marker_tokens) + TRIM_MARKER
+
+    def _fit_snapshot(self, snapshot: Dict[str, str], budget: int) -> Dict[str, str]:
+        demands = {role: self.counter.count(f"[{role}] {text}") for role, text in snapshot.items()}
+        alloc = allocate(demands, {role: 1 for role in snapshot}, budget)
+        fitted = {}
+        for role, text in snapshot.items():
+            label_tokens = self.counter.count(f"[{role}] ")
+            trimmed = self._trim(text, alloc[role] - label_tokens)
+            if trimmed:
+                fitted[role] = trimmed
+        return fitted
+
+    def build(
+        self,
+        role: str,
+        profile: str,
+        query: str,
+        context: str = "",
+        memory: str = "",
+        snapshot: Optional[Dict[str, str]] = None,
+    ) -> str:
+        budget = self.budget_for(role)
+        head = f"[{role.upper()} AGENT]\nRole description:\n{profile}\n\n"
+        query_block = f"User query:\n{query}\n\n"
+        fixed = self.counter.count(head) + self.counter.count(query_block) + self.counter.count(INSTRUCTIONS)
+
+        snapshot = snapshot or {}
+        snapshot_text = "\n".join(f"[{r}] {t}" for r, t in snapshot.items())
+        demands = {
+            "snapshot": self.counter.count(snapshot_text),
+            "context": self.counter.count(context),
+            "memory": self.counter.count(memory),
+        }
+        # section headers are small; reserve them up front so the total stays within budget
+        reserved = self.counter.count("Context:\n\n\nConversation memory:\n\n\nPrevious agent snapshots:\n\n\n")
+        alloc = allocate(demands, SECTION_WEIGHTS, budget - fixed - reserved)
+
+        fitted_context = self._trim(context, alloc["context"], keep="head")
+        fitted_memory = self._trim(memory, alloc["memory"], keep="tail")
+        fitted_snapshot = self._fit_snapshot(snapshot, alloc["snapshot"]) if snapshot else {}
+
+        parts: List[str] = [head, f"Context:\n{fitted_context or 'No context available.'}\n\n"]
+        if fitted_memory:
+            parts.append(f"Conversation memory:\n{fitted_memory}\n\n")
+        parts.append(query_block)
+        if fitted_snapshot:
+            parts.append(
+                "Previous agent snapshots:\n" + "\n".join(f"[{r}] {t}" for r, t in fitted_snapshot.items()) + "\n\n"
+            )
+        parts.append(INSTRUCTIONS)
+        prompt = "".join(parts)
+
+        used = {
+            "context": self.counter.count(fitted_context),
+            "memory": self.counter.count(fitted_memory),
+            "snapshot": sum(self.counter.count(t) for t in fitted_snapshot.values()),
+        }
+        sections = " ".join(f"{name}={used[name]}/{demands[name]}" for name in ("context", "memory", "snapshot"))
+        log_event(
+            "PROMPT_BUDGET",
+            f"📏 {role} prompt tokens={self.counter.count(prompt)}/{budget} fixed={fixed} {sections}",
+        )
+        return prompt
+
+
+_assembler: Optional[PromptAssembler] = None
+
+
+def get_prompt_assembler() -> PromptAssembler:
+    global _assembler
+    if _assembler is None:
+        _assembler = PromptAssembler()
+    return _assembler
@@ -0,0 +1,53 @@
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Set
+
+
+@dataclass
+class Quorum:
+    """
+    When a quorum-mode MCP run has heard enough: every `required` role succeeded plus
+    `extra` more successful roles of any kind.
+
+    Specs (MCP_QUORUM or the request's `quorum`):
+    - "reflector+1"  reflector and any one other role
+    - "reflector,strategist"  both of these roles
+    - "2" or "2/4"  any two roles (M is informational; the request's roles decide it)
+    Required roles not in the run are dropped, and the total is capped at the number of roles;
+    names that are neither in the run nor in `known_roles` are rejected as typos, and so are
+    negative counts.
+    """
+    required: Set[str] = field(default_factory=set)
+    extra: int = 0
+
+    @classmethod
+    def parse(cls, spec: str, roles: List[str], known_roles: Optional[Iterable[str]] = None) -> "Quorum":
+        spec = (spec or "").replace(" ", "")
+        names, _, count = spec.partition("+")
+        if not count and names.split("/")[0].isdigit():
+            names, count = "", names.split("/")[0]
+        try:
+            extra = int(count) if count else 0
+        except ValueError:
+            raise ValueError(f"Invalid quorum spec '{spec}'; use e.g. 'reflector+1' or '2/4'")
+        if extra < 0:
+            raise ValueError(f"Invalid quorum spec '{spec}': the role count cannot be negative")
+        named = {name for name in names.split(",") if name}
+        unknown = named - set(roles) - set(known_roles or ())
+        if unknown:
+            raise ValueError(f"Invalid quorum spec '{spec}': unknown roles {sorted(unknown)}")
+        required = named & set(roles)
+        extra = max(0, min(extra, len(roles) - len(required)))
+        if not required and extra == 0:
+            extra = 1
+        return cls(required=required, extra=extra)
+
+    def met(self, succeeded: Iterable[str]) -> bool:
+        succeeded = set(succeeded)
+        return self.required <= succeeded and len(succeeded - self.required) >= self.extra
+
+    def reachable(self, succeeded: Iterable[str], pending: Iterable[str]) -> bool:
+        """Whether the roles still running could complete the quorum."""
+        return self.met(set(succeeded) | set(pending))
+
+    def __str__(self) -> str:
+        return "+".join(filter(None, [",".join(sorted(self.required)), str(self.extra) if self.extra else ""]))
@@ -2,11 +2,11 @@ import asyncio
 import logging
 from typing import Dict, Any
 
-from app.mcp.mcp_engine import MCPEngine
+from app.mcp.mcp_engine import get_mcp_engine
 
 logger = logging.getLogger(__name__)
 
-mcp_engine = MCPEngine()
+mcp_engine = get_mcp_engine()
 
 class MCPOrchestrator:
     """
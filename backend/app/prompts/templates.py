@@ -128,4 +128,24 @@ designed for open and thoughtful conversation.
 - If uncertain, ask gentle clarifying questions instead of assuming.
 - Keep answers grounded, psychologically aware, and encouraging self-reflection.
 """
-)
\ No newline at end of file
+)
+
+summary_prompt = PromptTemplate(
+    input_variables=["summary", "new_lines"],
+    template="""
+You maintain the running memory of a conversation between a user and Neuraline.
+
+<<CURRENT SUMMARY>>
+{summary}
+
+<<NEW TURNS>>
+{new_lines}
+
+<<INSTRUCTIONS>>
+
+- Return the updated summary only, written in third person and under 200 words.
+- Fold the new turns into the current summary; do not drop facts it already holds.
+- Keep the user's goals, feelings, commitments, and any names, dates, or numbers they shared.
+- Leave out greetings, filler, and Neuraline's wording.
+"""
+)
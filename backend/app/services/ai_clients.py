@@ -1,60 +1,130 @@
 import logging
-import asyncio
-from typing import Any, Dict
-from langchain_google_genai import ChatGoogleGenerativeAI
-from groq import Groq
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from typing import Any, AsyncIterator, Dict, List, Optional
 from app.core.config import settings
+from app.services.embedding_registry import embedding_registry, get_embedding_model
+from app.services.llm_transport import llm_transport
 
 logger = logging.getLogger(__name__)
 
 class GeminiClient:
-    """Wrapper for Google's Gemini model."""
+    """Native async client for Google's Gemini REST API over the shared pooled transport."""
+    provider = "gemini"
+    base_url = "https://generativelanguage.googleapis.com/v1beta/models"
+
     def __init__(self):
-        self.client = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            google_api_key=settings.gemini_api_key
-        )
+        self.model = settings.gemini_model
+        self.limiter = llm_transport.limiter(self.provider, settings.gemini_max_concurrency)
+        self.headers = {"x-goog-api-key": settings.gemini_api_key or ""}
+
+    def _payload(self, prompt: str) -> Dict[str, Any]:
+        return {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+
+    @staticmethod
+    def _text(data: Dict[str, Any]) -> str:
+        candidates = data.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
 
-    async def generate(self, prompt: str) -> str:
+    async def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """`timeout` (e.g. the request deadline's remaining budget) caps LLM_REQUEST_TIMEOUT."""
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, self.client.invoke, prompt)
-            return response.content if hasattr(response, "content") else str(response)
+            data = await llm_transport.post_json(
+                self.limiter,
+                f"{self.base_url}/{self.model}:generateContent",
+                self._payload(prompt),
+                headers=self.headers,
+                timeout=timeout,
+            )
+            return self._text(data)
         except Exception as e:
             logger.error(f"Gemini error: {e}")
             raise
 
+    async def generate_stream(self, prompt: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Yield response text incrementally as Gemini produces it."""
+        try:
+            async for data in llm_transport.stream_events(
+                self.limiter,
+                f"{self.base_url}/{self.model}:streamGenerateContent?alt=sse",
+                self._payload(prompt),
+                headers=self.headers,
+                timeout=timeout,
+            ):
+                text = self._text(data)
+                if text:
+                    yield text
+        except Exception as e:
+            logger.error(f"Gemini stream error: {e}")
+            raise
+
 class GroqClient:
-    """Fallback LLM using Groq."""
+    """Fallback LLM using Groq's OpenAI-compatible API over the shared pooled transport."""
+    provider = "groq"
+    url = "https://api.groq.com/openai/v1/chat/completions"
+
     def __init__(self):
-        self.client = Groq(api_key=settings.groq_api_key)
+        self.model = settings.groq_model
+        self.limiter = llm_transport.limiter(self.provider, settings.groq_max_concurrency)
+        self.headers = {"Authorization": f"Bearer {settings.groq_api_key or ''}"}
+
+    def _payload(self, prompt: str, stream: bool = False) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": stream,
+        }
 
-    async def generate(self, prompt: str) -> str:
+    async def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
         try:
-            loop = asyncio.get_event_loop()
-            completion = await loop.run_in_executor(
-                None,
-                lambda: self.client.chat.completions.create(
-                    messages=[{"role": "user", "content": prompt}],
-                    model="llama-3.1-8b-instant",
-                ),
+            data = await llm_transport.post_json(
+                self.limiter, self.url, self._payload(prompt), headers=self.headers, timeout=timeout
             )
-            return completion.choices[0].message.content
+            return data["choices"][0]["message"]["content"]
         except Exception as e:
             logger.error(f"Groq error: {e}")
             raise
 
+    async def generate_stream(self, prompt: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Yield response tokens incrementally from Groq's streaming completions."""
+        try:
+            async for data in llm_transport.stream_events(
+                self.limiter, self.url, self._payload(prompt, stream=True), headers=self.headers, timeout=timeout
+            ):
+                choices = data.get("choices") or []
+                delta = choices[0].get("delta", {}).get("content") if choices else None
+                if delta:
+                    yield delta
+        except Exception as e:
+            logger.error(f"Groq stream error: {e}")
+            raise
+
 class EmbeddingClient:
-    """HuggingFace embeddings client."""
-    def __init__(self):
-        self.embedder = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+    """HuggingFace embeddings client backed by the shared embedding model registry."""
+
+    @property
+    def embedder(self):
+        # resolved per call so building a client never blocks on loading the model
+        return get_embedding_model()
 
     def embed(self, text: str):
         try:
             return self.embedder.embed_query(text)
         except Exception as e:
             logger.error(f"Embedding error: {e}")
+            raise
+
+    def embed_batch(self, texts: List[str], use_cache: bool = True) -> List[List[float]]:
+        """
+        Embed many texts in one batched forward pass. Pass `use_cache=False` for bulk
+        work such as ingestion so it does not evict cached user queries.
+        """
+        if not texts:
+            return []
+        try:
+            embedder = self.embedder if use_cache else embedding_registry.get()
+            return embedder.embed_documents(texts)
+        except Exception as e:
+            logger.error(f"Batch embedding error: {e}")
             raise
\ No newline at end of file
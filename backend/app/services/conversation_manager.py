@@ -1,8 +1,9 @@
 import asyncio
 import logging
-from typing import Dict
 
 from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import HumanMessage, AIMessage
+from app.core.config import settings
 from app.services.retriever import ContextRetriever
 from app.services.ai_clients import GeminiClient, GroqClient
 from app.services.model_router import ModelRouter
@@ -14,9 +15,12 @@ from app.prompts.templates import (
     general_prompt,
 )
 from app.core.logging_config import log_event
-from app.services.memory.chroma_memory import ChromaConversationMemory
+from app.services.memory.factory import get_conversation_store
+from app.services.memory.summary_memory import ConversationSummarizer, RollingSummaryMemory
 from app.services.safety.content_filter import ContentFilter
 from app.services.safety.response_validator import ResponseValidator
+from app.services.session_cache import SessionCache
+from app.services.task_classifier import get_task_classifier
 
 logger = logging.getLogger(__name__)
 
@@ -27,58 +31,77 @@ class ConversationManager:
     def __init__(self):
         self.gemini = GeminiClient()
         self.groq = GroqClient()
-        self.model_router = ModelRouter()
         self.retriever = ContextRetriever()
-        self.memory_store = ChromaConversationMemory()
+        self.model_router = ModelRouter(retriever=self.retriever)
+        self.classifier = get_task_classifier()
+        self.memory_store = get_conversation_store()
         self.filter = ContentFilter()
         self.validator = ResponseValidator()
-        self._memories: Dict[str, ConversationBufferMemory] = {}
-
-    def _get_memory(self, session_id: str):
-        """Get or create conversation memory for a given session."""
-        from langchain.memory import ConversationBufferMemory
-        from langchain_core.messages import HumanMessage, AIMessage
+        self.memory_mode = settings.conversation_memory_mode.lower()
+        self.summarizer = (
+            ConversationSummarizer(self.model_router, self.memory_store)
+            if self.memory_mode == "summary"
+            else None
+        )
+        self._memories = SessionCache(
+            self._load_memory,
+            max_sessions=settings.session_cache_max_sessions,
+            idle_seconds=settings.session_cache_idle_seconds,
+            name="conversation_memory",
+        )
 
+    def _load_memory(self, session_id: str):
+        """Rehydrate a session's memory from the persistent store (session cache miss)."""
+        if self.summarizer is not None:
+            return self._load_summary_memory(session_id)
         mem = ConversationBufferMemory(
             memory_key="chat_history",
             return_messages=False,
         )
+        try:
+            persisted = self.memory_store.load_session_history(session_id)
+            if persisted:
+                messages = []
+                for msg in persisted:
+                    role = msg.get("role")
+                    content = msg.get("content", "")
+                    if role == "user":
+                        messages.append(HumanMessage(content=content))
+                    elif role == "assistant":
+                        messages.append(AIMessage(content=content))
+                mem.chat_memory.messages = messages
+                logger.info(f"[MEMORY_LOAD] Loaded memory for session={session_id}")
+        except Exception as e:
+            logger.warning(f"[MEMORY_LOAD_ERROR] Failed to load memory for session={session_id}: {e}")
+        return mem
+
+    def _load_summary_memory(self, session_id: str) -> RollingSummaryMemory:
+        """
+        Rehydrate the stored rolling summary plus every turn it does not cover yet (see
+        `RollingSummaryMemory.load_history`). Turns beyond the verbatim window (a fold that
+        failed, or a session evicted before its fold ran) land in the overflow and are
+        folded after the next turn.
+        """
+        keep_turns = settings.conversation_summary_keep_turns
+        mem = RollingSummaryMemory(keep_turns=keep_turns)
+        try:
+            record = self.memory_store.load_summary(session_id)
+            if record:
+                mem.summary = record["summary"]
+                mem.folded_turns = record["folded_turns"]
+            mem.load_history(self.memory_store.load_session_history(session_id))
+            logger.info(f"[MEMORY_LOAD] Loaded summary memory for session={session_id}")
+        except Exception as e:
+            logger.warning(f"[MEMORY_LOAD_ERROR] Failed to load summary memory for session={session_id}: {e}")
+        return mem
 
-        if session_id not in self._memories:
-            try:
-                persisted = self.memory_store.load_session_history(session_id)
-                if persisted:
-                    messages = []
-                    for msg in persisted:
-                        role = msg.get("role")
-                        content = msg.get("content", "")
-                        if role == "user":
-                            messages.append(HumanMessage(content=content))
-                        elif role == "assistant":
-                            messages.append(AIMessage(content=content))
-                    mem.chat_memory.messages = messages
-                    logger.info(f"[MEMORY_LOAD] Loaded memory for session={session_id}")
-            except Exception as e:
-                logger.warning(f"[MEMORY_LOAD_ERROR] Failed to load memory for session={session_id}: {e}")
-
-            self._memories[session_id] = mem
-
-        return self._memories[session_id]
-
-    def _classify_task(self, prompt: str) -> str:
-        """Simple heuristic task classifier."""
-        p = prompt.lower()
-        if any(w in p for w in ["reflect", "feeling", "emotion", "journal"]):
-            return "emotional_reflection"
-        if any(w in p for w in ["plan", "goal", "steps", "strategy", "how to achieve"]):
-            return "cognitive_reasoning"
-        if any(w in p for w in ["summarize", "analyze", "context", "rag", "retrieve", "neuraline"]):
-            return "rag_query"
-        if any(w in p for w in ["habit", "track", "consistency", "routine"]):
-            return "behavioral_coaching"
-        if any(w in p for w in ["purpose", "mission", "values", "north star"]):
-            return "purpose_alignment"
-        return "general_chat"
+    def _get_memory(self, session_id: str):
+        """Get conversation memory for a session from the bounded hot-session cache."""
+        return self._memories.get(session_id)
+
+    def session_stats(self):
+        """Hit rate and resident-session count of the hot-session cache."""
+        return self._memories.stats()
 
     def _select_template(self, task_type: str):
         """Map task type to the correct prompt template."""
@@ -101,7 +124,8 @@ class ConversationManager:
     ) -> str:
         """Main conversational entrypoint."""
         user_input = self.filter.clean(user_input)
-        task_type = self._classify_task(user_input)
+        # one embedding per turn: it classifies the message and is reused for retrieval
+        task_type, embedding = await asyncio.to_thread(self.classifier.classify_with_embedding, user_input)
         log_event("CONVERSATION", f"Incoming message classified as {task_type}")
 
         context = ""
@@ -113,12 +137,13 @@ class ConversationManager:
         ):
             try:
                 log_event("RAG_RETRIEVE", f"🔍 Retrieving context for session={session_id}")
-                context = await asyncio.to_thread(self.retriever.retrieve, user_input)
+                result = await asyncio.to_thread(self.retriever.search, user_input, 3, embedding)
+                context = result.text
                 log_event("RAG_CONTEXT", f"Retrieved {len(context)} chars for session={session_id}")
             except Exception as e:
                 log_event("RAG_ERROR", f"⚠️ Retrieval failed: {e}")
 
-        memory = self._get_memory(session_id)
+        memory = await asyncio.to_thread(self._get_memory, session_id)
         memory_text = getattr(memory, "buffer", "")
 
         template = self._select_template(task_type)
@@ -135,7 +160,13 @@ class ConversationManager:
 
         try:
             response = (
-                await self.model_router.run(final_prompt, task_type=task_type)
+                await self.model_router.run(
+                    final_prompt,
+                    task_type=task_type,
+                    retrieval="never",
+                    cache_key=user_input,
+                    cache_namespace="chat",
+                )
                 if use_router
                 else await self.gemini.generate(final_prompt)
             )
@@ -151,6 +182,9 @@ class ConversationManager:
             except Exception as e:
                 log_event("MEMORY_SAVE_ERROR", f"⚠️ Failed to persist memory: {e}")
 
+            if self.summarizer is not None:
+                self.summarizer.schedule(session_id, memory)
+
             return response
         except Exception as e:
             log_event("CONVERSATION_ERROR", f"❌ Conversation error: {e}")
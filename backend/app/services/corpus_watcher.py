@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import Optional
+
+from watchfiles import awatch
+
+from app.core.config import settings
+from app.core.logging_config import log_event
+from app.services.ingestion import CorpusIngestor
+from app.services.vector_store import ChromaDBClient, get_knowledge_store, serving_store, swap_knowledge_store
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusWatcher:
+    """
+    Watches the knowledge sources directory and hot-reloads the index.
+
+    Each batch of file changes is re-indexed off the event loop into a shadow
+    collection (see `CorpusIngestor.build_shadow`); once it is complete, every
+    `ContextRetriever` is switched to it with `swap_knowledge_store`. Queries never
+    see a half-built index and never wait on ingestion. The previous collection is
+    dropped after a grace period so in-flight queries can finish against it.
+
+    With several workers each runs its own watcher. Ingestion is serialised by the
+    manifest lock: the first worker to take it builds and publishes the new collection,
+    and the others then find no source changes but a newer published collection, which
+    they adopt. Only the worker that built a collection retires the one it replaced.
+    The grace period must therefore cover the other workers' catch-up (a debounce plus
+    the build time).
+    """
+
+    def __init__(self, sources_dir: Optional[str] = None, ingestor: Optional[CorpusIngestor] = None):
+        self.sources_dir = sources_dir or settings.knowledge_sources_dir
+        self.ingestor = ingestor or CorpusIngestor(sources_dir=self.sources_dir)
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._retiring = set()
+
+    def start(self):
+        if self._task is None:
+            self._stop.clear()
+            self._task = asyncio.create_task(self._watch())
+            log_event("CORPUS_WATCH", f"👀 Watching {self.sources_dir} for knowledge changes")
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for task in list(self._retiring):
+            task.cancel()
+
+    async def _watch(self):
+        # pick up edits made while the process was down before waiting for new ones
+        await self.reindex()
+        async for changes in awatch(
+            self.sources_dir, debounce=settings.corpus_watch_debounce_ms, stop_event=self._stop
+        ):
+            logger.info(f"Knowledge sources changed: {sorted(path for _, path in changes)}")
+            await self.reindex()
+
+    async def reindex(self) -> bool:
+        """Rebuild into a shadow index and swap it in. Returns True if a swap happened."""
+        async with self._lock:
+            active = get_knowledge_store()
+            try:
+                built = await asyncio.to_thread(self.ingestor.build_shadow, active)
+            except Exception as e:
+                log_event("CORPUS_RELOAD_ERROR", f"⚠️ Shadow re-index failed, keeping {active.collection_name}: {e}", level="warning")
+                return False
+            if built is None:
+                return await self._adopt_published(active)
+
+            shadow, summary = built
+            shadow = await asyncio.to_thread(serving_store, shadow)
+            previous = swap_knowledge_store(shadow)
+            changed = {k: len(v) for k, v in summary.items()}
+            log_event("CORPUS_RELOAD", f"🔁 Swapped knowledge index to {shadow.collection_name} {changed}")
+            if previous is not None and previous.collection_name != shadow.collection_name:
+                task = asyncio.create_task(self._retire(previous))
+                self._retiring.add(task)
+                task.add_done_callback(self._retiring.discard)
+            return True
+
+    async def _adopt_published(self, active: ChromaDBClient) -> bool:
+        """Switch to the collection another process published, if it is not the one being served."""
+        published = await asyncio.to_thread(self.ingestor.published_collection)
+        if not published or published == active.collection_name:
+            return False
+        store = await asyncio.to_thread(lambda: serving_store(ChromaDBClient(published)))
+        swap_knowledge_store(store)
+        # the process that built `published` retires the previous collection
+        log_event("CORPUS_RELOAD", f"🔁 Adopted knowledge index {published} published by another process")
+        return True
+
+    async def _retire(self, store: ChromaDBClient):
+        await asyncio.sleep(settings.corpus_swap_grace_seconds)
+        await asyncio.to_thread(store.drop)
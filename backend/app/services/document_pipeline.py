@@ -1,21 +1,33 @@
 import logging
+from typing import List
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from app.services.ai_clients import EmbeddingClient
-from app.services.vector_store import ChromaDBClient
+from app.services.vector_store import ChromaDBClient, get_knowledge_store
 
 logger = logging.getLogger(__name__)
 
 class DocumentPipeline:
     """Processes and stores documents for RAG context awareness."""
 
-    def __init__(self):
+    def __init__(self, db: ChromaDBClient = None):
         self.splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
         self.embedder = EmbeddingClient()
-        self.db = ChromaDBClient()
+        self.db = db or get_knowledge_store()
 
-    def process_and_store(self, text: str, source: str):
-        chunks = self.splitter.split_text(text)
-        for i, chunk in enumerate(chunks):
-            emb = self.embedder.embed(chunk)
-            self.db.add_document(f"{source}_{i}", chunk, emb)
-        logger.info(f"✅ Document from {source} processed and stored.")
\ No newline at end of file
+    def chunk(self, text: str) -> List[str]:
+        return self.splitter.split_text(text)
+
+    def process_and_store(self, text: str, source: str, db: ChromaDBClient = None) -> int:
+        """Chunk, batch-embed and bulk-insert a document (into `db` or the pipeline's store)."""
+        chunks = self.chunk(text)
+        if not chunks:
+            return 0
+        embeddings = self.embedder.embed_batch(chunks, use_cache=False)
+        (db or self.db).add_documents(
+            ids=[f"{source}_{i}" for i in range(len(chunks))],
+            texts=chunks,
+            embeddings=embeddings,
+            metadatas=[{"source": source, "chunk": i} for i in range(len(chunks))],
+        )
+        logger.info(f"✅ Document from {source} processed and stored.")
+        return len(chunks)
@@ -0,0 +1,158 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class EmbeddingBatcher(Embeddings):
+    """
+    Dynamic micro-batching for single-text embedding calls.
+
+    `embed_query` puts the text on a queue and waits on a Future. One worker thread
+    takes the first waiting text, keeps collecting for up to `max_wait_ms` or until
+    `max_batch` texts are queued, runs a single `embed_documents` pass and resolves
+    each caller's Future with its own vector. Concurrent requests then share one
+    forward pass instead of each running a batch of one. Like the embedding cache,
+    this relies on `embed_query` and `embed_documents` agreeing (symmetric models).
+
+    `embed_documents` calls are already batched and go straight to the model.
+
+    A caller waits at most `result_timeout_s` for its vector. A batch whose model call
+    fails or returns the wrong number of vectors fails every caller in it, and a worker
+    that dies fails whatever is still queued; the next call starts a new worker.
+    """
+
+    def __init__(
+        self,
+        model: Embeddings,
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0,
+        result_timeout_s: Optional[float] = 30.0,
+    ):
+        self.model = model
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self.result_timeout = result_timeout_s if result_timeout_s and result_timeout_s > 0 else None
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self._batches = 0
+        self._texts = 0
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+
+    def embed_query(self, text: str) -> List[float]:
+        future: Future = Future()
+        self._queue.put((text, future))
+        self._ensure_started()
+        try:
+            return future.result(timeout=self.result_timeout)
+        except FutureTimeoutError:
+            # the worker skips cancelled futures, so a late batch does not embed this text
+            future.cancel()
+            raise TimeoutError(f"Batched embedding did not answer within {self.result_timeout}s")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.model.embed_documents(texts)
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        batch: List[Tuple[str, Future]] = []
+        try:
+            while True:
+                batch = [item for item in self._collect() if item[1].set_running_or_notify_cancel()]
+                if not batch:
+                    continue
+                texts = [text for text, _ in batch]
+                try:
+                    vectors = self.model.embed_documents(texts)
+                    if len(vectors) != len(batch):
+                        raise RuntimeError(f"model returned {len(vectors)} vectors for {len(batch)} texts")
+                except Exception as e:
+                    logger.error(f"Batched embedding of {len(texts)} texts failed: {e}")
+                    self._fail(batch, e)
+                    batch = []
+                    continue
+                for (_, future), vector in zip(batch, vectors):
+                    _settle(future, result=vector)
+                self._record(len(batch))
+                batch = []
+        except BaseException as e:
+            logger.error(f"Embedding batcher worker stopped: {e!r}")
+            with self._lock:
+                self._thread = None
+            error = RuntimeError(f"embedding batcher worker stopped: {e!r}")
+            self._fail(batch, error)
+            self._drain(error)
+            raise
+
+    def _fail(self, batch: List[Tuple[str, Future]], error: BaseException):
+        for _, future in batch:
+            _settle(future, error=error)
+
+    def _drain(self, error: BaseException):
+        """Fail every caller still queued; their texts would otherwise wait for a worker that is gone."""
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if future.set_running_or_notify_cancel():
+                _settle(future, error=error)
+
+    def _record(self, size: int):
+        bucket = next((b for b in BATCH_SIZE_BUCKETS if size <= b), BATCH_SIZE_BUCKETS[-1])
+        with self._lock:
+            self._histogram[bucket] += 1
+            self._batches += 1
+            self._texts += size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "batches": self._batches,
+                "texts": self._texts,
+                "mean_batch_size": round(self._texts / self._batches, 2) if self._batches else 0.0,
+                "queued": self._queue.qsize(),
+                # bucket b counts batches whose size was <= b and larger than the previous bucket
+                "batch_size_histogram": {f"<={b}": n for b, n in self._histogram.items()},
+            }
+
+
+def _settle(future: Future, result: Any = None, error: Optional[BaseException] = None):
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
@@ -0,0 +1,124 @@
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embedding_registry import _process_rss_mb, load_embedding_backend
+
+# ONNX exports checked by default: fp32 and the int8 (dynamically quantized) variant
+DEFAULT_ONNX_FILES = ["onnx/model.onnx", "onnx/model_quint8_avx2.onnx"]
+# max allowed 1 - cosine against the torch backend; quantization costs some precision
+FP32_TOLERANCE = 1e-3
+INT8_TOLERANCE = 0.02
+
+
+def tolerance_for(onnx_file: str) -> float:
+    return INT8_TOLERANCE if "int8" in onnx_file else FP32_TOLERANCE
+
+
+def load_sample_texts(sources_dir: str, limit: int) -> List[str]:
+    """Paragraphs of the knowledge corpus, a realistic mix of short and long inputs."""
+    texts = []
+    for name in sorted(os.listdir(sources_dir)):
+        if name.endswith(".txt"):
+            with open(os.path.join(sources_dir, name), encoding="utf-8") as f:
+                texts.extend(p.strip() for p in f.read().split("\n\n") if p.strip())
+    return texts[:limit]
+
+
+def measure(backend: str, model_name: str, texts: List[str], rounds: int, onnx_file: Optional[str] = None) -> Dict:
+    rss_before = _process_rss_mb()
+    start = time.perf_counter()
+    model = load_embedding_backend(model_name, backend=backend, onnx_file=onnx_file)
+    load_seconds = time.perf_counter() - start
+
+    model.embed_documents(texts[:8])  # warm-up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        vectors = model.embed_documents(texts)
+    batch_seconds = time.perf_counter() - start
+
+    query_ms = []
+    for text in texts[:50]:
+        start = time.perf_counter()
+        model.embed_query(text)
+        query_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "load_seconds": round(load_seconds, 3),
+        "rss_delta_mb": round(_process_rss_mb() - rss_before, 1),
+        "embeddings_per_sec": round(len(texts) * rounds / batch_seconds, 1),
+        "query_p50_ms": round(statistics.median(query_ms), 3),
+        "vectors": np.asarray(vectors, dtype=np.float32),
+    }
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    ref = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    cand = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosine = (ref * cand).sum(axis=1)
+    return {
+        "min_cosine": round(float(cosine.min()), 6),
+        "mean_cosine": round(float(cosine.mean()), 6),
+        "max_abs_diff": round(float(np.abs(reference - candidate).max()), 6),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the ONNX Runtime and HuggingFace embedding backends.")
+    parser.add_argument("--model", default=settings.embedding_model_name)
+    parser.add_argument("--sources", default=settings.knowledge_sources_dir)
+    parser.add_argument("--texts", type=int, default=128)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument(
+        "--onnx-files",
+        default=",".join(DEFAULT_ONNX_FILES),
+        help="Comma-separated ONNX exports to check against the torch backend",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=None,
+        help=f"Max allowed 1 - cosine between backends (default {FP32_TOLERANCE} fp32, {INT8_TOLERANCE} int8)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    texts = load_sample_texts(args.sources, args.texts)
+    if not texts:
+        raise SystemExit(f"No sample texts found in {args.sources}")
+
+    # ONNX first: its RSS delta is then what a torch-free worker pays
+    exports = {}
+    for onnx_file in [f.strip() for f in args.onnx_files.split(",") if f.strip()]:
+        exports[onnx_file] = measure("onnx", args.model, texts, args.rounds, onnx_file=onnx_file)
+    hf = measure("huggingface", args.model, texts, args.rounds)
+    reference = hf.pop("vectors")
+
+    passed = True
+    for onnx_file, result in exports.items():
+        check = parity(reference, result.pop("vectors"))
+        check["tolerance"] = tolerance_for(onnx_file) if args.tolerance is None else args.tolerance
+        check["passed"] = 1 - check["min_cosine"] <= check["tolerance"]
+        result["parity"] = check
+        passed = passed and check["passed"]
+
+    print(json.dumps({
+        "model": args.model,
+        "onnx_threads": settings.embedding_onnx_threads,
+        "texts": len(texts),
+        "onnx": exports,
+        "huggingface": hf,
+    }, indent=2))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Size-bounded LRU cache in front of an embedding model.
+
+    Keys are normalized text (whitespace collapsed and, with `casefold`, lowercased,
+    which is lossless for uncased models such as all-MiniLM-L6-v2). Queries and
+    documents share one key space. That is correct for symmetric sentence-transformers,
+    whose `embed_query` and `embed_documents` produce the same vector, and it lets a
+    message embedded for retrieval be stored in memory without a second forward pass.
+    """
+
+    def __init__(self, model: Embeddings, max_entries: int = 4096, casefold: bool = True):
+        self.model = model
+        self.max_entries = max(1, max_entries)
+        self.casefold = casefold
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _key(self, text: str) -> str:
+        key = _WHITESPACE_RE.sub(" ", text).strip()
+        return key.lower() if self.casefold else key
+
+    def _get(self, key: str):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return list(vector)
+
+    def _put(self, key: str, vector: List[float]):
+        with self._lock:
+            self._entries[key] = list(vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self._get(key)
+        if vector is None:
+            vector = self.model.embed_query(text)
+            self._put(key, vector)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Look every text up, then embed all the misses (deduplicated) in one batch."""
+        keys = [self._key(t) for t in texts]
+        vectors: List[Any] = [self._get(k) for k in keys]
+        missing: Dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None and key not in missing:
+                missing[key] = text
+        if missing:
+            embedded = dict(zip(missing, self.model.embed_documents(list(missing.values()))))
+            for key, vector in embedded.items():
+                self._put(key, vector)
+            vectors = [v if v is not None else list(embedded[k]) for k, v in zip(keys, vectors)]
+        return vectors
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
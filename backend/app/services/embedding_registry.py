@@ -0,0 +1,167 @@
+import logging
+import resource
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_cache import CachedEmbeddings
+
+logger = logging.getLogger(__name__)
+
+
+def _process_rss_mb() -> float:
+    """Current resident set size of this process in MB (peak RSS if /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_embedding_backend(name: str, backend: Optional[str] = None, onnx_file: Optional[str] = None):
+    """
+    Build an embedding model with the selected backend (EMBEDDING_BACKEND):
+    "huggingface" (sentence-transformers on torch) or "onnx" (ONNX Runtime, no torch;
+    `onnx_file` overrides EMBEDDING_ONNX_FILE).
+    """
+    backend = (backend or settings.embedding_backend).lower()
+    if backend == "onnx":
+        from app.services.onnx_embeddings import OnnxEmbeddings
+        return OnnxEmbeddings(name, onnx_file=onnx_file)
+    if backend == "huggingface":
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=name)
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+class EmbeddingModelRegistry:
+    """
+    Process-wide registry of embedding models.
+
+    Every component that needs embeddings (EmbeddingClient, ChromaConversationMemory,
+    DocumentPipeline, ContextRetriever) draws from here, so each model is loaded once
+    per worker no matter how many service objects are built.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._load_info: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._warming = set()
+        self._cached: Dict[str, CachedEmbeddings] = {}
+
+    def get(self, model_name: Optional[str] = None):
+        name = model_name or settings.embedding_model_name
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                model = self._load(name)
+                self._models[name] = model
+        return model
+
+    def _load(self, name: str):
+        rss_before = _process_rss_mb()
+        start = time.perf_counter()
+        model = load_embedding_backend(name)
+        elapsed = time.perf_counter() - start
+        self._load_info[name] = {
+            "backend": settings.embedding_backend,
+            "load_seconds": round(elapsed, 3),
+            "rss_delta_mb": round(_process_rss_mb() - rss_before, 1),
+        }
+        logger.info(f"[EMBEDDINGS] Loaded {name} ({settings.embedding_backend}) in {elapsed:.2f}s")
+        return model
+
+    def get_cached(self, model_name: Optional[str] = None) -> CachedEmbeddings:
+        """
+        The model behind the process-wide LRU embedding cache (one cache per model),
+        with the micro-batcher beneath it unless EMBEDDING_BATCHING_ENABLED is off.
+        """
+        name = model_name or settings.embedding_model_name
+        cached = self._cached.get(name)
+        if cached is None:
+            model = self.get(name)
+            with self._lock:
+                cached = self._cached.get(name)
+                if cached is None:
+                    if settings.embedding_batching_enabled:
+                        # cache misses from concurrent requests share one forward pass
+                        model = EmbeddingBatcher(
+                            model,
+                            max_batch=settings.embedding_batch_max_size,
+                            max_wait_ms=settings.embedding_batch_max_wait_ms,
+                            result_timeout_s=settings.embedding_batch_result_timeout_seconds,
+                        )
+                    cached = CachedEmbeddings(
+                        model,
+                        max_entries=settings.embedding_cache_max_entries,
+                        casefold=settings.embedding_cache_casefold,
+                    )
+                    self._cached[name] = cached
+        return cached
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {name: cached.stats() for name, cached in list(self._cached.items())}
+
+    def batching_stats(self) -> Dict[str, Any]:
+        return {
+            name: cached.model.stats()
+            for name, cached in list(self._cached.items())
+            if isinstance(cached.model, EmbeddingBatcher)
+        }
+
+    def is_loaded(self, model_name: Optional[str] = None) -> bool:
+        return (model_name or settings.embedding_model_name) in self._models
+
+    def warm_up(self, model_name: Optional[str] = None):
+        """Start loading a model on a background thread (no-op if loaded or already loading)."""
+        name = model_name or settings.embedding_model_name
+        if name in self._models or name in self._warming:
+            return
+        self._warming.add(name)
+
+        def _load():
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"[EMBEDDINGS] Warm-up of {name} failed: {e}")
+            finally:
+                self._warming.discard(name)
+
+        threading.Thread(target=_load, name="embedding-warmup", daemon=True).start()
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Summarize loaded models (parameter bytes, load time) and current process RSS."""
+        models = {}
+        for name, model in self._models.items():
+            info = dict(self._load_info.get(name, {}))
+            try:
+                params = model.client.parameters()
+                info["param_mb"] = round(
+                    sum(p.numel() * p.element_size() for p in params) / (1024 * 1024), 1
+                )
+            except Exception:
+                pass
+            models[name] = info
+        return {
+            "loaded_models": len(models),
+            "models": models,
+            "query_cache": self.cache_stats(),
+            "batching": self.batching_stats(),
+            "process_rss_mb": round(_process_rss_mb(), 1),
+        }
+
+
+embedding_registry = EmbeddingModelRegistry()
+
+
+def get_embedding_model(model_name: Optional[str] = None):
+    """Return the shared embedding model behind its LRU cache, loading it on first use."""
+    return embedding_registry.get_cached(model_name)
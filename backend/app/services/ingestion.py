@@ -0,0 +1,202 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: no cross-process lock, so run a single worker
+    fcntl = None
+
+from app.core.config import settings
+from app.services.document_pipeline import DocumentPipeline
+from app.services.vector_store import DEFAULT_COLLECTION, ChromaDBClient
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CorpusIngestor:
+    """
+    Incremental ingestion of the knowledge corpus (`data/sources/*.txt`) into Chroma.
+
+    A manifest records each file's content hash and chunk count. On every run only
+    new or changed files are re-chunked and re-embedded (one batched `embed_documents`
+    per file, bulk `collection.upsert`), and chunks of deleted files are removed, so the
+    cost of re-indexing is proportional to what changed. Indexes derived from the
+    collection (BM25, the NumPy export) are rebuilt on every run, right after the
+    manifest is saved, so the NumPy export records the manifest it was built from.
+
+    Runs hold an exclusive file lock next to the manifest (`<manifest>.lock`), so the
+    CLI and the corpus watchers of several workers never ingest concurrently. The
+    manifest's "collection" is the generation they agree on.
+    """
+
+    def __init__(
+        self,
+        sources_dir: Optional[str] = None,
+        manifest_path: Optional[str] = None,
+        pipeline: Optional[DocumentPipeline] = None,
+    ):
+        self.sources_dir = sources_dir or settings.knowledge_sources_dir
+        self.manifest_path = manifest_path or settings.ingest_manifest_path
+        self.pipeline = pipeline or DocumentPipeline()
+
+    @contextmanager
+    def manifest_lock(self):
+        """Exclusive cross-process lock around reading, building and publishing the manifest."""
+        if fcntl is None:
+            yield
+            return
+        directory = os.path.dirname(self.manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.manifest_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def published_collection(self) -> Optional[str]:
+        """Collection named by the manifest, i.e. the index the last completed run published."""
+        return self.load_manifest().get("collection")
+
+    def load_manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {"files": {}}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_manifest(self, manifest: Dict):
+        directory = os.path.dirname(self.manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def scan_sources(self) -> Dict[str, str]:
+        """Map source file name -> content hash for every .txt file in the sources dir."""
+        if not os.path.isdir(self.sources_dir):
+            logger.warning(f"Sources directory {self.sources_dir} does not exist")
+            return {}
+        return {
+            name: file_sha256(os.path.join(self.sources_dir, name))
+            for name in sorted(os.listdir(self.sources_dir))
+            if name.endswith(".txt")
+        }
+
+    def ingest(self, force: bool = False) -> Dict[str, List[str]]:
+        """Bring the active collection in line with the sources dir, in place. Returns what changed."""
+        with self.manifest_lock():
+            manifest = self.load_manifest()
+            summary = self._apply(manifest, self.scan_sources(), self.pipeline.db, force=force)
+            self.save_manifest(manifest)
+            self.pipeline.db.rebuild_indexes()
+        return summary
+
+    def build_shadow(self, active: ChromaDBClient) -> Optional[Tuple[ChromaDBClient, Dict[str, List[str]]]]:
+        """
+        Build a complete new index in a fresh collection without touching `active`:
+        unchanged files' chunks are copied across with their stored embeddings and only
+        changed files are re-embedded. Returns (shadow store, summary), or None when the
+        sources match the manifest. The manifest is only rewritten once the shadow is complete.
+
+        The manifest may already describe a newer collection than `active` (another worker
+        built it); callers compare `published_collection()` with their own to catch up.
+        """
+        with self.manifest_lock():
+            manifest = self.load_manifest()
+            current = self.scan_sources()
+            indexed = manifest.get("files", {})
+            if {n: f.get("sha256") for n, f in indexed.items()} == current:
+                return None
+
+            published = manifest.get("collection")
+            if published and published != active.collection_name:
+                # copy unchanged chunks from the newest index, not this process's older one
+                active = ChromaDBClient(published)
+            shadow = ChromaDBClient(f"{DEFAULT_COLLECTION}_{time.time_ns()}")
+            try:
+                summary = self._apply(manifest, current, shadow, copy_from=active)
+            except Exception:
+                shadow.drop()
+                raise
+            self.save_manifest(manifest)
+            shadow.rebuild_indexes()
+        return shadow, summary
+
+    def _apply(
+        self,
+        manifest: Dict,
+        current: Dict[str, str],
+        db: ChromaDBClient,
+        force: bool = False,
+        copy_from: Optional[ChromaDBClient] = None,
+    ) -> Dict[str, List[str]]:
+        """
+        Sync `db` with `current` ({file: hash}) and update `manifest` in memory. When
+        `copy_from` is given, `db` is a fresh collection and unchanged files are copied
+        from it instead of being left in place.
+        """
+        indexed: Dict[str, Dict] = manifest.get("files", {})
+        summary: Dict[str, List[str]] = {"added": [], "updated": [], "removed": [], "unchanged": []}
+
+        for name in sorted(set(indexed) - set(current)):
+            if copy_from is None:
+                db.delete_source(name)
+            del indexed[name]
+            summary["removed"].append(name)
+
+        for name, digest in current.items():
+            previous = indexed.get(name)
+            if previous and previous.get("sha256") == digest and not force:
+                if copy_from is None or db.copy_source_from(copy_from, name) == previous.get("chunks"):
+                    summary["unchanged"].append(name)
+                    continue
+                # the active index lost this file's chunks; re-embed it into the shadow
+                db.delete_source(name)
+            elif previous and copy_from is None:
+                db.delete_source(name)
+            with open(os.path.join(self.sources_dir, name), encoding="utf-8") as f:
+                text = f.read()
+            chunks = self.pipeline.process_and_store(text, name, db=db)
+            indexed[name] = {"sha256": digest, "chunks": chunks}
+            summary["updated" if previous else "added"].append(name)
+
+        manifest["files"] = indexed
+        manifest["collection"] = db.collection_name
+        logger.info(
+            f"Ingestion into {db.collection_name} complete: "
+            + ", ".join(f"{k}={len(v)}" for k, v in summary.items())
+        )
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally ingest the Neuraline knowledge corpus.")
+    parser.add_argument("--sources", default=None, help="Directory of .txt sources (default: KNOWLEDGE_SOURCES_DIR)")
+    parser.add_argument("--manifest", default=None, help="Manifest path (default: INGEST_MANIFEST_PATH)")
+    parser.add_argument("--force", action="store_true", help="Re-embed every file even if unchanged")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    summary = CorpusIngestor(sources_dir=args.sources, manifest_path=args.manifest).ingest(force=args.force)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderLimiter:
+    """Per-provider concurrency semaphore that records how long callers queue for a slot."""
+
+    def __init__(self, provider: str, max_concurrency: int, window: int = 500):
+        self.provider = provider
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._waits: Deque[float] = deque(maxlen=window)
+        self.in_flight = 0
+        self.waiting = 0
+        self.total = 0
+        self.total_wait = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        wait = time.perf_counter() - start
+        self._waits.append(wait)
+        self.total += 1
+        self.total_wait += wait
+        self.in_flight += 1
+        try:
+            yield wait
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+
+        def pct(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 2)
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "requests": self.total,
+            "queue_wait_ms": {
+                "avg": round(self.total_wait / self.total * 1000, 2) if self.total else 0.0,
+                "p50": pct(0.50),
+                "p95": pct(0.95),
+                "max": round(waits[-1] * 1000, 2) if waits else 0.0,
+            },
+        }
+
+
+class LLMTransport:
+    """
+    Shared async HTTP transport for LLM providers.
+
+    One pooled keep-alive `httpx.AsyncClient` serves every provider, and each provider
+    gets its own concurrency limiter, so throughput is bounded by connections and
+    per-provider limits instead of the default thread pool.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limiters: Dict[str, ProviderLimiter] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_keepalive_connections,
+                    keepalive_expiry=settings.llm_keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(settings.llm_request_timeout),
+            )
+        return self._client
+
+    def limiter(self, provider: str, max_concurrency: int) -> ProviderLimiter:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            limiter = ProviderLimiter(provider, max_concurrency)
+            self._limiters[provider] = limiter
+        return limiter
+
+    @staticmethod
+    def _timeout(timeout: Optional[float]):
+        """A caller's budget (e.g. the deadline's remainder) caps LLM_REQUEST_TIMEOUT, never raises it."""
+        if timeout is None:
+            return httpx.USE_CLIENT_DEFAULT
+        return max(0.0, min(timeout, settings.llm_request_timeout))
+
+    async def post_json(
+        self,
+        limiter: ProviderLimiter,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        async with limiter.slot():
+            response = await self.client.post(
+                url, json=payload, headers=headers, timeout=self._timeout(timeout)
+            )
+            response.raise_for_status()
+            return response.json()
+
+    async def stream_events(
+        self,
+        limiter: ProviderLimiter,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """POST and yield each JSON `data:` payload of a server-sent-events response."""
+        async with limiter.slot():
+            async with self.client.stream(
+                "POST", url, json=payload, headers=headers, timeout=self._timeout(timeout)
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if not data or data == "[DONE]":
+                        continue
+                    yield json.loads(data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
+
+llm_transport = LLMTransport()
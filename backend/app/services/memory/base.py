@@ -0,0 +1,66 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class ConversationMessage:
+    """One stored chat message. `seq` is assigned by the store on append."""
+    session_id: str
+    role: str
+    content: str
+    created_at: float = field(default_factory=time.time)
+    seq: Optional[int] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"role": self.role, "content": self.content, "seq": self.seq, "created_at": self.created_at}
+
+
+class ConversationStore:
+    """
+    Append-only, per-session ordered message log.
+
+    Backends assign each message a monotonic per-session sequence number on append,
+    so history order never depends on the storage engine, and `tail` returns the last
+    N messages without reading the whole session.
+    """
+
+    def append_many(self, messages: List[ConversationMessage]):
+        """Persist messages (possibly from several sessions) in one write, assigning `seq`."""
+        raise NotImplementedError()
+
+    def tail(self, session_id: str, n: int) -> List[Dict[str, Any]]:
+        """The last `n` messages of a session, oldest first."""
+        raise NotImplementedError()
+
+    def load_session_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """Every message of a session, oldest first."""
+        raise NotImplementedError()
+
+    def clear_session(self, session_id: str):
+        raise NotImplementedError()
+
+    def save_summary(self, session_id: str, summary: str, folded_turns: int):
+        """Persist the rolling summary of a session's older turns (see RollingSummaryMemory)."""
+        raise NotImplementedError()
+
+    def load_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """`{"summary", "folded_turns", "updated_at"}` for a session, or None if it has none."""
+        raise NotImplementedError()
+
+    def flush(self):
+        """Make buffered writes durable. No-op for stores that write synchronously."""
+
+    def close(self):
+        self.flush()
+
+    def save_message(self, session_id: str, role: str, content: str):
+        """Append a single message (user or assistant) to the session."""
+        self.append_many([ConversationMessage(session_id=session_id, role=role, content=content)])
+
+    def load_memory(self, session_id: str) -> str:
+        """Compatibility wrapper to return memory as a formatted text string."""
+        messages = self.load_session_history(session_id)
+        if not messages:
+            return ""
+        return "\n".join(f"{m['role'].capitalize()}: {m['content']}" for m in messages)
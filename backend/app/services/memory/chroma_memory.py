@@ -1,53 +1,155 @@
 from langchain_community.vectorstores import Chroma
-from langchain_core.documents import Document
-from langchain.embeddings import HuggingFaceEmbeddings
 import os
-from typing import List, Dict
+import sqlite3
+import threading
+from typing import Any, List, Dict, Optional
 
+from app.services.embedding_registry import get_embedding_model
+from app.services.memory.base import ConversationMessage, ConversationStore
+from app.services.memory.sqlite_store import SQLiteConversationStore
+
+
+class ChromaConversationMemory(ConversationStore):
+    """
+    Chroma-backed conversation store. Messages carry `seq` and `created_at` metadata
+    and deterministic `<session_id>_<seq>` ids.
+
+    Sequence numbers are reserved from a per-session counter in a SQLite file next to
+    the collection (`sequences.sqlite3`, one `BEGIN IMMEDIATE` per batch), so several
+    worker processes writing the same session never hand out the same id. Only the
+    reservation is serialised; embedding and writing the batch happen outside it. A
+    message keeps its reserved seq when a write fails, so retrying the batch upserts
+    the same ids instead of leaving a gap.
+
+    Rolling summaries are fetched by session id and never searched, so they are kept
+    in a SQLite file next to the collection (`summaries.sqlite3`) rather than embedded.
+    """
 
-class ChromaConversationMemory:
     def __init__(self, persist_dir: str = "./data/chroma_memory"):
         os.makedirs(persist_dir, exist_ok=True)
         self.persist_dir = persist_dir
-        self.embedding = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        self.embedding = get_embedding_model()
         self.client = Chroma(
             collection_name="conversation_memory",
             embedding_function=self.embedding,
             persist_directory=persist_dir
         )
-
-    def save_message(self, session_id: str, role: str, content: str):
-        """Save a message (user or assistant) into Chroma memory."""
-        doc = Document(
-            page_content=content,
-            metadata={"session_id": session_id, "role": role}
+        self.summaries = SQLiteConversationStore(os.path.join(persist_dir, "summaries.sqlite3"))
+        self._seq_lock = threading.Lock()
+        self._seq_conn = sqlite3.connect(
+            os.path.join(persist_dir, "sequences.sqlite3"), check_same_thread=False, isolation_level=None, timeout=30
         )
+        self._seq_conn.execute("PRAGMA journal_mode=WAL")
+        self._seq_conn.execute(
+            "CREATE TABLE IF NOT EXISTS message_seq (session_id TEXT PRIMARY KEY, last_seq INTEGER NOT NULL)"
+        )
+
+    def _stored_max_seq(self, session_id: str) -> int:
+        """Highest seq already in the collection (sessions written before the counter existed)."""
+        results = self.client.get(where={"session_id": session_id}, include=["metadatas"])
+        return max((m.get("seq", 0) for m in (results or {}).get("metadatas") or []), default=0)
+
+    def _last_seq(self, session_id: str) -> Optional[int]:
+        with self._seq_lock:
+            row = self._seq_conn.execute(
+                "SELECT last_seq FROM message_seq WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _reserve_seqs(self, counts: Dict[str, int]) -> Dict[str, int]:
+        """Reserve `counts[session]` consecutive seqs per session; returns the first of each range."""
+        with self._seq_lock:
+            cur = self._seq_conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                first: Dict[str, int] = {}
+                for session_id, count in counts.items():
+                    row = cur.execute(
+                        "SELECT last_seq FROM message_seq WHERE session_id = ?", (session_id,)
+                    ).fetchone()
+                    last = row[0] if row else self._stored_max_seq(session_id)
+                    first[session_id] = last + 1
+                    cur.execute(
+                        "INSERT OR REPLACE INTO message_seq (session_id, last_seq) VALUES (?, ?)",
+                        (session_id, last + count),
+                    )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+        return first
+
+    def append_many(self, messages: List[ConversationMessage]):
+        """Embed and add all messages with a single `add_texts` call and one persist."""
+        if not messages:
+            return
+        unassigned = [m for m in messages if m.seq is None]
+        counts: Dict[str, int] = {}
+        for m in unassigned:
+            counts[m.session_id] = counts.get(m.session_id, 0) + 1
+        if counts:
+            next_seq = self._reserve_seqs(counts)
+            for m in unassigned:
+                m.seq = next_seq[m.session_id]
+                next_seq[m.session_id] += 1
         self.client.add_texts(
-            texts=[doc.page_content],
-            metadatas=[doc.metadata],
-            ids=[f"{session_id}_{role}_{hash(content)}"]
+            texts=[m.content for m in messages],
+            metadatas=[
+                {"session_id": m.session_id, "role": m.role, "seq": m.seq, "created_at": m.created_at}
+                for m in messages
+            ],
+            ids=[f"{m.session_id}_{m.seq}" for m in messages],
         )
         self.client.persist()
 
-    def load_session_history(self, session_id: str) -> List[Dict[str, str]]:
-        """Retrieve the full conversation history for a given session."""
-        results = self.client.get(where={"session_id": session_id})
+    @staticmethod
+    def _to_messages(results, session_id: str) -> List[Dict[str, Any]]:
         if not results or not results.get("documents"):
             return []
-        return [
-            {"role": meta["role"], "content": doc}
+        messages = [
+            {
+                "role": meta["role"],
+                "content": doc,
+                "seq": meta.get("seq", 0),
+                "created_at": meta.get("created_at"),
+            }
             for doc, meta in zip(results["documents"], results["metadatas"])
             if meta.get("session_id") == session_id
         ]
+        messages.sort(key=lambda m: m["seq"])
+        return messages
 
-    def load_memory(self, session_id: str) -> str:
-        """Compatibility wrapper to return memory as a formatted text string."""
-        messages = self.load_session_history(session_id)
-        if not messages:
-            return ""
-        return "\n".join(f"{m['role'].capitalize()}: {m['content']}" for m in messages)
+    def tail(self, session_id: str, n: int) -> List[Dict[str, Any]]:
+        if n <= 0:
+            return []
+        last = self._last_seq(session_id)
+        if not last:
+            # no counter yet: only legacy messages (or none at all)
+            return self.load_session_history(session_id)[-n:]
+        results = self.client.get(
+            where={"$and": [{"session_id": session_id}, {"seq": {"$gt": last - n}}]}
+        )
+        messages = self._to_messages(results, session_id)
+        if len(messages) < min(n, last):
+            # seqs reserved by a batch that was never written (or is still in flight elsewhere)
+            return self.load_session_history(session_id)[-n:]
+        return messages
+
+    def load_session_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """Retrieve the full conversation history for a given session, in sequence order."""
+        results = self.client.get(where={"session_id": session_id})
+        return self._to_messages(results, session_id)
 
     def clear_session(self, session_id: str):
         """Delete all stored messages for a given session."""
         self.client.delete(where={"session_id": session_id})
         self.client.persist()
+        self.summaries.clear_session(session_id)
+        with self._seq_lock:
+            self._seq_conn.execute("DELETE FROM message_seq WHERE session_id = ?", (session_id,))
+
+    def save_summary(self, session_id: str, summary: str, folded_turns: int):
+        self.summaries.save_summary(session_id, summary, folded_turns)
+
+    def load_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self.summaries.load_summary(session_id)
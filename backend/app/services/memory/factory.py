@@ -0,0 +1,42 @@
+import threading
+from typing import Optional
+
+from app.core.config import settings
+from app.services.memory.base import ConversationStore
+
+_store: Optional[ConversationStore] = None
+_lock = threading.Lock()
+
+
+def build_conversation_store(backend: Optional[str] = None) -> ConversationStore:
+    backend = (backend or settings.conversation_store).lower()
+    if backend == "sqlite":
+        from app.services.memory.sqlite_store import SQLiteConversationStore
+        store = SQLiteConversationStore(settings.conversation_db_path)
+    elif backend == "chroma":
+        from app.services.memory.chroma_memory import ChromaConversationMemory
+        store = ChromaConversationMemory()
+    else:
+        raise ValueError(f"Unknown conversation store backend: {backend}")
+
+    if settings.memory_write_behind_enabled:
+        from app.services.memory.write_behind import WriteBehindConversationStore
+        store = WriteBehindConversationStore(
+            store,
+            max_batch=settings.memory_write_behind_batch_size,
+            flush_interval=settings.memory_write_behind_interval,
+        )
+    return store
+
+
+def get_conversation_store() -> ConversationStore:
+    """
+    Process-wide conversation store selected by CONVERSATION_STORE (chroma | sqlite),
+    wrapped in a write-behind buffer unless MEMORY_WRITE_BEHIND_ENABLED is off.
+    """
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = build_conversation_store()
+    return _store
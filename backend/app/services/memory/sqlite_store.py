@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.memory.base import ConversationMessage, ConversationStore
+
+
+class SQLiteConversationStore(ConversationStore):
+    """
+    SQLite (WAL) conversation store.
+
+    Messages are keyed by (session_id, seq), so `tail` is an index range scan of
+    exactly N rows and latency stays flat as sessions grow. Sequence numbers are
+    allocated inside a `BEGIN IMMEDIATE` transaction, which keeps them monotonic
+    even with several worker processes sharing the file.
+    """
+
+    def __init__(self, path: str = "./data/memory/conversations.sqlite3"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                session_id TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                folded_turns INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+
+    def append_many(self, messages: List[ConversationMessage]):
+        if not messages:
+            return
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                next_seq: Dict[str, int] = {}
+                rows = []
+                for m in messages:
+                    if m.session_id not in next_seq:
+                        row = cur.execute(
+                            "SELECT MAX(seq) FROM messages WHERE session_id = ?", (m.session_id,)
+                        ).fetchone()
+                        next_seq[m.session_id] = (row[0] or 0) + 1
+                    m.seq = next_seq[m.session_id]
+                    next_seq[m.session_id] += 1
+                    rows.append((m.session_id, m.seq, m.role, m.content, m.created_at))
+                cur.executemany(
+                    "INSERT INTO messages (session_id, seq, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def _rows(self, sql: str, params) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {"role": role, "content": content, "seq": seq, "created_at": created_at}
+            for seq, role, content, created_at in rows
+        ]
+
+    def tail(self, session_id: str, n: int) -> List[Dict[str, Any]]:
+        if n <= 0:
+            return []
+        rows = self._rows(
+            "SELECT seq, role, content, created_at FROM messages "
+            "WHERE session_id = ? ORDER BY seq DESC LIMIT ?",
+            (session_id, n),
+        )
+        rows.reverse()
+        return rows
+
+    def load_session_history(self, session_id: str) -> List[Dict[str, Any]]:
+        return self._rows(
+            "SELECT seq, role, content, created_at FROM messages WHERE session_id = ? ORDER BY seq",
+            (session_id,),
+        )
+
+    def clear_session(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM summaries WHERE session_id = ?", (session_id,))
+
+    def save_summary(self, session_id: str, summary: str, folded_turns: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (session_id, summary, folded_turns, updated_at) VALUES (?, ?, ?, ?)",
+                (session_id, summary, folded_turns, time.time()),
+            )
+
+    def load_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, folded_turns, updated_at FROM summaries WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"summary": row[0], "folded_turns": row[1], "updated_at": row[2]}
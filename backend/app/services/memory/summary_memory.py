@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.logging_config import log_event
+from app.prompts.templates import summary_prompt
+from app.services.memory.base import ConversationStore
+from app.services.model_router import LOCAL_FALLBACK_PREFIX
+
+logger = logging.getLogger(__name__)
+
+
+def format_turns(turns: List[Tuple[str, str]]) -> str:
+    return "\n".join(f"Human: {user}\nAI: {ai}" for user, ai in turns)
+
+
+class RollingSummaryMemory:
+    """
+    Session memory with a bounded prompt footprint.
+
+    The last `keep_turns` turns are kept verbatim; older turns wait in the overflow
+    until a `ConversationSummarizer` folds them into `summary`. `buffer` and
+    `save_context` match `ConversationBufferMemory`, so callers can use either.
+    """
+
+    def __init__(
+        self,
+        keep_turns: int = 4,
+        summary: str = "",
+        folded_turns: int = 0,
+        turns: Optional[List[Tuple[str, str]]] = None,
+    ):
+        self.keep_turns = max(1, keep_turns)
+        self.summary = summary
+        self.folded_turns = folded_turns
+        self.turns: List[Tuple[str, str]] = list(turns or [])
+        self._lock = threading.Lock()
+
+    @property
+    def buffer(self) -> str:
+        with self._lock:
+            summary, turns = self.summary, list(self.turns)
+        parts = []
+        if summary:
+            parts.append(f"Summary of earlier conversation:\n{summary}")
+        if turns:
+            parts.append(format_turns(turns))
+        return "\n\n".join(parts)
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, Any]):
+        with self._lock:
+            self.turns.append((inputs.get("input", ""), outputs.get("output", "")))
+
+    def load_history(self, history: List[Dict[str, Any]]):
+        """
+        Append the stored messages (oldest first) the summary does not cover yet. Turns are
+        complete user/assistant pairs, as `folded_turns` counts them: other roles and a user
+        message whose reply was never saved neither form a turn nor shift the offset.
+        """
+        pending_user = None
+        skipped = 0
+        with self._lock:
+            for msg in history:
+                if msg.get("role") == "user":
+                    pending_user = msg.get("content", "")
+                elif msg.get("role") == "assistant" and pending_user is not None:
+                    if skipped < self.folded_turns:
+                        skipped += 1
+                    else:
+                        self.turns.append((pending_user, msg.get("content", "")))
+                    pending_user = None
+
+    def overflow(self) -> List[Tuple[str, str]]:
+        """Turns older than the verbatim window that still need folding into the summary."""
+        with self._lock:
+            return self.turns[: max(0, len(self.turns) - self.keep_turns)]
+
+    def apply_fold(self, summary: str, count: int):
+        """Replace the summary and drop the `count` oldest turns it now covers."""
+        with self._lock:
+            del self.turns[:count]
+            self.summary = summary
+            self.folded_turns += count
+
+
+class ConversationSummarizer:
+    """
+    Folds overflowing turns into a session's rolling summary off the request path.
+
+    `schedule` starts a background task after a turn has been answered; it asks the
+    model router for an updated summary and persists it with `save_summary`. Folds
+    for one session are serialized, and a failed fold simply leaves the overflow
+    verbatim until the next turn retries it.
+    """
+
+    def __init__(self, model_router, store: ConversationStore):
+        self.model_router = model_router
+        self.store = store
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._tasks = set()
+
+    def schedule(self, session_id: str, memory: RollingSummaryMemory):
+        if not memory.overflow():
+            return
+        task = asyncio.create_task(self.fold(session_id, memory))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def fold(self, session_id: str, memory: RollingSummaryMemory) -> bool:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        async with lock:
+            turns = memory.overflow()
+            if not turns:
+                return False
+            prompt = summary_prompt.format(
+                summary=memory.summary or "No summary yet.",
+                new_lines=format_turns(turns),
+            )
+            try:
+                summary = await self.model_router.run(
+                    prompt, task_type="summarization", retrieval="never", use_cache=False
+                )
+                summary = (summary or "").strip()
+                if not summary or summary.startswith(LOCAL_FALLBACK_PREFIX):
+                    raise RuntimeError("no model produced a summary")
+                memory.apply_fold(summary, len(turns))
+                await asyncio.to_thread(self.store.save_summary, session_id, summary, memory.folded_turns)
+            except Exception as e:
+                log_event("MEMORY_SUMMARY_ERROR", f"⚠️ Summary fold failed for session={session_id}: {e}", level="warning")
+                return False
+        log_event("MEMORY_SUMMARY", f"🧾 Folded {len(turns)} turns into summary for session={session_id}")
+        return True
+
@@ -0,0 +1,185 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.memory.base import ConversationMessage, ConversationStore
+
+logger = logging.getLogger(__name__)
+
+# upper bound of the retry delay after consecutive failed batches
+MAX_RETRY_BACKOFF_SECONDS = 30.0
+# lower bound of the idle wait, so FLUSH_INTERVAL=0 does not busy-loop
+MIN_FLUSH_INTERVAL_SECONDS = 0.01
+
+
+class WriteBehindConversationStore(ConversationStore):
+    """
+    Write-behind buffer in front of another ConversationStore.
+
+    `save_message` / `append_many` only append to an in-memory buffer shared by all
+    sessions; a background thread hands the buffer to the wrapped store in batches
+    (one batched embedding and one add/commit per batch) whenever `max_batch`
+    messages are waiting or `flush_interval` seconds have passed, and on `flush()`.
+    Reads merge still-buffered messages so a session always sees its own writes.
+
+    Durability window: a message is only on disk once its batch has been written,
+    i.e. up to `flush_interval` seconds (or one batch write) after the turn returns.
+    A crash inside that window loses those messages; a clean shutdown flushes them.
+
+    A failed batch is put back and retried after `flush_interval`, doubling with each
+    further failure up to MAX_RETRY_BACKOFF_SECONDS; the first success resets it.
+    """
+
+    def __init__(self, store: ConversationStore, max_batch: int = 64, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.store = store
+        self.max_batch = max(1, max_batch)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[ConversationMessage] = []
+        self._inflight: List[ConversationMessage] = []
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._counters = {"buffered": 0, "written": 0, "batches": 0, "failed_batches": 0, "dropped": 0}
+
+    def append_many(self, messages: List[ConversationMessage]):
+        if not messages:
+            return
+        with self._cond:
+            self._pending.extend(messages)
+            self._counters["buffered"] += len(messages)
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                del self._pending[:overflow]
+                self._counters["dropped"] += overflow
+                logger.warning(f"Write-behind buffer full, dropped {overflow} oldest messages")
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._run, name="memory-write-behind", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                delay = self._retry_at - time.monotonic()
+                if not self._stopped and delay > 0:
+                    # backing off after a failed batch; a full buffer must not wake us early
+                    self._cond.wait(timeout=delay)
+                    continue
+                if not self._stopped and len(self._pending) < self.max_batch:
+                    self._cond.wait(timeout=max(self.flush_interval, MIN_FLUSH_INTERVAL_SECONDS))
+                if self._stopped and not self._pending:
+                    return
+            if self._flush_once() == 0 and self._stopped:
+                # stopping with a store that keeps failing: close() makes the final attempt
+                return
+
+    def _flush_once(self) -> int:
+        with self._io_lock:
+            with self._cond:
+                batch = self._pending[: self.max_batch]
+                del self._pending[: len(batch)]
+                self._inflight = batch
+            if not batch:
+                return 0
+            try:
+                self.store.append_many(batch)
+                with self._cond:
+                    self._counters["written"] += len(batch)
+                    self._counters["batches"] += 1
+                    self._backoff = 0.0
+                    self._retry_at = 0.0
+                return len(batch)
+            except Exception as e:
+                with self._cond:
+                    self._pending[:0] = batch
+                    self._counters["failed_batches"] += 1
+                    self._backoff = min(
+                        max(self.flush_interval, MIN_FLUSH_INTERVAL_SECONDS, self._backoff * 2),
+                        MAX_RETRY_BACKOFF_SECONDS,
+                    )
+                    self._retry_at = time.monotonic() + self._backoff
+                logger.warning(
+                    f"Write-behind flush of {len(batch)} messages failed, retrying in {self._backoff:.1f}s: {e}"
+                )
+                return 0
+            finally:
+                with self._cond:
+                    self._inflight = []
+
+    def flush(self):
+        """Synchronously write everything buffered so far."""
+        while True:
+            with self._cond:
+                if not self._pending:
+                    return
+            if self._flush_once() == 0:
+                with self._cond:
+                    if self._pending:
+                        logger.error(f"Write-behind flush gave up with {len(self._pending)} messages unwritten")
+                return
+
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        self.flush()
+
+    @staticmethod
+    def _key(m: Dict[str, Any]) -> Tuple:
+        return (m.get("role"), m.get("content"), m.get("created_at"))
+
+    def _merge(self, session_id: str, persisted: List[Dict[str, Any]], buffered: List[ConversationMessage]):
+        seen = {self._key(m) for m in persisted}
+        extra = [
+            m.as_dict()
+            for m in buffered
+            if m.session_id == session_id and self._key(m.as_dict()) not in seen
+        ]
+        return persisted + extra
+
+    def _buffered(self) -> List[ConversationMessage]:
+        # snapshot before reading the store: anything written meanwhile is de-duplicated
+        with self._cond:
+            return list(self._inflight) + list(self._pending)
+
+    def tail(self, session_id: str, n: int) -> List[Dict[str, Any]]:
+        if n <= 0:
+            return []
+        buffered = self._buffered()
+        merged = self._merge(session_id, self.store.tail(session_id, n), buffered)
+        return merged[-n:]
+
+    def load_session_history(self, session_id: str) -> List[Dict[str, Any]]:
+        buffered = self._buffered()
+        return self._merge(session_id, self.store.load_session_history(session_id), buffered)
+
+    def clear_session(self, session_id: str):
+        with self._cond:
+            self._pending = [m for m in self._pending if m.session_id != session_id]
+        with self._io_lock:
+            self.store.clear_session(session_id)
+
+    def save_summary(self, session_id: str, summary: str, folded_turns: int):
+        # summaries are already written off the request path, so they bypass the buffer
+        self.store.save_summary(session_id, summary, folded_turns)
+
+    def load_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.load_summary(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {"pending": len(self._pending), "retry_backoff_s": self._backoff, **self._counters}
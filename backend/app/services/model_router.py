@@ -1,11 +1,29 @@
 import logging
 import asyncio
-from app.services.ai_clients import GeminiClient, GroqClient
+import hashlib
+import time
+from typing import AsyncIterator, List, Optional, Tuple
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.services.ai_clients import GeminiClient, GroqClient, EmbeddingClient
+from app.services.provider_health import OPEN, provider_health
+from app.services.response_cache import get_response_cache
 from app.services.retriever import ContextRetriever
+from app.services.task_classifier import get_task_classifier
 from app.core.logging_config import log_event
 
 logger = logging.getLogger(__name__)
 
+RAG_TASK_TYPES = ("rag_query", "emotional_reflection", "cognitive_reasoning")
+RETRIEVAL_POLICIES = ("auto", "always", "never")
+LOCAL_FALLBACK_PREFIX = "(local fallback)"
+# successful calls in the health window before latency-aware routing trusts a provider's p90
+LATENCY_MIN_SAMPLES = 10
+
+class _HedgeExhausted(Exception):
+    """Both the primary and the hedge request failed; nothing is left to fall back to."""
+
+
 class ModelRouter:
     """
     Neuraline's Intelligent Model Router
@@ -13,73 +31,359 @@ class ModelRouter:
     integrating retrieval-augmented context and fallback recovery.
     """
 
-    def __init__(self):
+    def __init__(self, retriever: ContextRetriever = None):
         self.gemini = GeminiClient()
         self.groq = GroqClient()
-        self.retriever = ContextRetriever()
+        self.retriever = retriever or ContextRetriever()
+        self.classifier = get_task_classifier()
+        self.cache = get_response_cache()
+        self.embedder = EmbeddingClient() if self.cache else None
 
-    async def run(self, query: str, task_type: str = None, **kwargs):
+    async def run(
+        self,
+        query: str,
+        task_type: str = None,
+        context: Optional[str] = None,
+        retrieval: str = "auto",
+        use_cache: bool = True,
+        cache_key: Optional[str] = None,
+        cache_namespace: str = "router",
+        hedge: Optional[bool] = None,
+        deadline: Optional[Deadline] = None,
+        **kwargs,
+    ):
         """
         Core orchestration method.
         - Classifies task type if not given.
-        - Retrieves RAG context when appropriate.
+        - Retrieves RAG context when appropriate, reusing `context` if the caller
+          already retrieved it for this turn.
         - Routes intelligently between Gemini and Groq.
         - Includes graceful fallback and robust error handling.
+
+        `retrieval` is the retrieval policy: "auto" adds context for RAG task types,
+        "always" adds it for any task, "never" adds none (use it when the prompt
+        already embeds the turn's context).
+
+        When the semantic response cache is enabled, a close repeat of `cache_key`
+        (defaults to `query`) is answered from the cache, but only within the same
+        `cache_namespace` (the caller, e.g. "chat" or "mcp:reflector"), task type and
+        surrounding prompt (everything except `cache_key`: context, memory, snapshots),
+        so an answer built from one session's memory is never served to another.
+        Pass `use_cache=False` to bypass it for a request.
+
+        `hedge` (default HEDGING_ENABLED) sends the prompt to the fallback provider as
+        well if the routed one has not answered within the hedge delay; the first
+        response wins and the other call is cancelled.
+
+        With a `deadline`, each provider call gets only the request's remaining budget
+        and no fallback is started once it has run out.
+        """
+        prompt, task_type = await self._prepare(query, task_type, context, retrieval)
+
+        cache_embedding = None
+        bucket = self._cache_bucket(cache_namespace, task_type, prompt, cache_key or query)
+        if self.cache and use_cache:
+            cache_embedding, cached = await self._cache_lookup(bucket, cache_key or query)
+            if cached is not None:
+                return cached
+
+        hedge = settings.hedging_enabled if hedge is None else hedge
+        response, ok = await self._generate(prompt, task_type, hedge=hedge, deadline=deadline)
+        if ok and cache_embedding is not None:
+            await self._cache_store(bucket, cache_key or query, cache_embedding, response)
+        return response
+
+    async def _generate(
+        self, prompt: str, task_type: str, hedge: bool = False, deadline: Optional[Deadline] = None
+    ) -> Tuple[str, bool]:
+        """
+        Try the candidate providers in order; returns (response, produced_by_a_model).
+        Providers whose circuit is open are skipped without waiting on them, and falling
+        back after a failure spends from the shared retry budget.
+        """
+        provider_health.retry_budget.record_request()
+        attempted = False
+        last_error = None
+        candidates = self._candidates(task_type)
+        for index, model in enumerate(candidates):
+            name = model.__class__.__name__
+            if deadline and deadline.expired:
+                log_event("DEADLINE", f"⏰ Request deadline reached before calling {name}", level="warning")
+                break
+            # spend the budget before allow_request(), which may claim a half-open breaker's
+            # only probe slot: a claimed probe must be followed by a call
+            if attempted and not provider_health.retry_budget.try_retry():
+                log_event("RETRY_BUDGET", f"🪙 Retry budget exhausted, not falling back to {name}", level="warning")
+                break
+            if not provider_health.get(model.provider).allow_request():
+                log_event("CIRCUIT_SKIP", f"⏭️ {name} circuit open, routing around it")
+                continue
+            if attempted:
+                log_event("MODEL_FALLBACK", f"🔄 Switching to fallback: {name}")
+            else:
+                log_event("MODEL_CALL", f"🎯 Routing to {name} for {task_type}")
+            attempted = True
+            try:
+                if hedge and index + 1 < len(candidates):
+                    return await self._hedged_call(model, candidates[index + 1], prompt, deadline), True
+                return await self._call_provider(model, prompt, deadline), True
+            except _HedgeExhausted as e:
+                last_error = e
+                break
+            except Exception as e:
+                last_error = e
+                log_event("MODEL_ERROR", f"⚠️ {name} failed: {e}")
+
+        log_event("MODEL_FAILSAFE", f"❌ No provider produced a response: {last_error}")
+        return f"{LOCAL_FALLBACK_PREFIX} Unable to process with model. Prompt was: {prompt}", False
+
+    def _hedge_delay(self, model) -> float:
+        """HEDGE_DELAY_SECONDS if set, else the provider's tracked latency percentile."""
+        if settings.hedge_delay_seconds > 0:
+            return settings.hedge_delay_seconds
+        tracked = provider_health.get(model.provider).latency_percentile(
+            settings.hedge_percentile, min_samples=LATENCY_MIN_SAMPLES
+        )
+        return tracked if tracked is not None else settings.hedge_default_delay_seconds
+
+    async def _hedged_call(self, primary, secondary, prompt: str, deadline: Optional[Deadline] = None) -> str:
+        """
+        Call `primary`; if it has not answered within the hedge delay, also call
+        `secondary` and return whichever succeeds first, cancelling the other. A primary
+        failure before the hedge fires is raised so the normal fallback path handles it.
+        Hedges are skipped when the secondary's circuit is open or the retry budget is spent.
+        """
+        settled = asyncio.Event()
+        primary_task = asyncio.create_task(self._call_provider(primary, prompt, deadline, hedge_settled=settled))
+        tasks = {primary_task: primary}
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self._hedge_delay(primary))
+            if done:
+                return primary_task.result()
+            # an open breaker is checked without side effects so no budget is spent on a hedge
+            # that cannot fire; the budget goes before allow_request(), which may claim a
+            # half-open breaker's only probe slot that must not be held by a hedge never sent
+            secondary_health = provider_health.get(secondary.provider)
+            hedge_allowed = (
+                secondary_health.state != OPEN
+                and provider_health.retry_budget.try_retry()
+                and secondary_health.allow_request()
+            )
+            if not hedge_allowed:
+                return await primary_task
+
+            provider_health.record_hedge_fired(primary.provider)
+            log_event("MODEL_HEDGE", f"🪃 {primary.provider} slow, hedging with {secondary.provider}")
+            tasks[asyncio.create_task(self._call_provider(secondary, prompt, deadline, hedge_settled=settled))] = secondary
+
+            pending = set(tasks)
+            last_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = tasks[task]
+                        provider_health.record_hedge_winner(winner.provider, hedged=winner is secondary)
+                        settled.set()
+                        return task.result()
+                    last_error = task.exception()
+                    log_event("MODEL_ERROR", f"⚠️ {tasks[task].__class__.__name__} failed while hedging: {last_error}")
+            raise _HedgeExhausted(f"both hedged providers failed: {last_error}")
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _call_provider(
+        self,
+        model,
+        prompt: str,
+        deadline: Optional[Deadline] = None,
+        hedge_settled: Optional[asyncio.Event] = None,
+    ) -> str:
+        """
+        One provider call, recorded in that provider's rolling health. With a deadline the
+        call is bounded by its remaining budget; running out of it is not held against the provider.
+        Being cancelled (e.g. by a caller's timeout) counts as a failure, unless the deadline
+        ran out or `hedge_settled` is set, i.e. the other side of a hedge already answered; a
+        hedge loser's elapsed time is kept as a latency-only sample instead.
+        """
+        health = provider_health.get(model.provider)
+        start = time.perf_counter()
+        try:
+            if deadline is None:
+                response = await model.generate(prompt)
+            else:
+                timeout = deadline.remaining()
+                response = await asyncio.wait_for(model.generate(prompt, timeout=timeout), timeout)
+        except asyncio.CancelledError:
+            if hedge_settled is not None and hedge_settled.is_set():
+                # lost the hedge: the elapsed time is a lower bound on this call's latency
+                health.record_cutoff(time.perf_counter() - start)
+            elif deadline is None or not deadline.expired:
+                health.record(time.perf_counter() - start, ok=False)
+            raise
+        except Exception:
+            if deadline is None or not deadline.expired:
+                health.record(time.perf_counter() - start, ok=False)
+            raise
+        health.record(time.perf_counter() - start, ok=True)
+        return response
+
+    @staticmethod
+    def _cache_bucket(namespace: str, task_type: str, prompt: str, key: str) -> str:
+        """
+        Cache partition for a call: caller namespace, task type and a hash of the prompt
+        around `key`. Only the key itself is matched semantically inside a bucket.
+        """
+        surroundings = prompt.replace(key, "", 1) if key else prompt
+        digest = hashlib.sha256(surroundings.encode("utf-8")).hexdigest()[:16]
+        return f"{namespace}:{task_type}:{digest}"
+
+    async def _cache_lookup(self, bucket: str, key: str):
+        """Return (key embedding, cached response or None); never raises."""
+        try:
+            embedding = await asyncio.to_thread(self.embedder.embed, key)
+            cached = await asyncio.to_thread(self.cache.lookup, bucket, embedding)
+        except Exception as e:
+            log_event("CACHE_ERROR", f"⚠️ Response cache lookup failed: {e}")
+            return None, None
+        log_event("CACHE_HIT" if cached is not None else "CACHE_MISS", f"💾 bucket={bucket}")
+        return embedding, cached
+
+    async def _cache_store(self, bucket: str, key: str, embedding, response: str):
+        try:
+            await asyncio.to_thread(self.cache.store, bucket, key, embedding, response)
+        except Exception as e:
+            log_event("CACHE_ERROR", f"⚠️ Response cache store failed: {e}")
+
+    async def stream(
+        self,
+        query: str,
+        task_type: str = None,
+        context: Optional[str] = None,
+        retrieval: str = "auto",
+        use_cache: bool = True,
+        cache_key: Optional[str] = None,
+        cache_namespace: str = "router",
+        deadline: Optional[Deadline] = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """
+        Streaming counterpart of `run`: yields text chunks as the chosen provider emits them.
+        Falls back to the other provider only if nothing has been yielded yet; a failure
+        after the first chunk is raised so the caller can decide how to recover.
+        A `deadline` bounds each provider's HTTP timeout by the request's remaining budget.
+        Being cancelled counts against the provider like in `_call_provider`; a stream the
+        consumer closes early only hands back the provider's half-open probe slot.
         """
-        prompt = query 
+        prompt, task_type = await self._prepare(query, task_type, context, retrieval)
 
+        cache_embedding = None
+        bucket = self._cache_bucket(cache_namespace, task_type, prompt, cache_key or query)
+        if self.cache and use_cache:
+            cache_embedding, cached = await self._cache_lookup(bucket, cache_key or query)
+            if cached is not None:
+                yield cached
+                return
+
+        provider_health.retry_budget.record_request()
+        attempted = False
+        for model in self._candidates(task_type):
+            name = model.__class__.__name__
+            health = provider_health.get(model.provider)
+            if deadline and deadline.expired:
+                log_event("DEADLINE", f"⏰ Request deadline reached before streaming from {name}", level="warning")
+                break
+            if attempted and not provider_health.retry_budget.try_retry():
+                log_event("RETRY_BUDGET", f"🪙 Retry budget exhausted, not falling back to {name}", level="warning")
+                break
+            if not health.allow_request():
+                log_event("CIRCUIT_SKIP", f"⏭️ {name} circuit open, routing around it")
+                continue
+            log_event("MODEL_CALL", f"🎯 Streaming from {name} for {task_type}")
+            attempted = True
+            emitted = False
+            recorded = False
+            chunks = []
+            start = time.perf_counter()
+            try:
+                timeout = deadline.remaining() if deadline else None
+                if hasattr(model, "generate_stream"):
+                    async for chunk in model.generate_stream(prompt, timeout=timeout):
+                        emitted = True
+                        chunks.append(chunk)
+                        yield chunk
+                else:
+                    chunks.append(await model.generate(prompt, timeout=timeout))
+                    yield chunks[-1]
+                health.record(time.perf_counter() - start, ok=True)
+                recorded = True
+                if cache_embedding is not None:
+                    await self._cache_store(bucket, cache_key or query, cache_embedding, "".join(chunks))
+                return
+            except asyncio.CancelledError:
+                if deadline is None or not deadline.expired:
+                    health.record(time.perf_counter() - start, ok=False)
+                    recorded = True
+                raise
+            except Exception as e:
+                if deadline is None or not deadline.expired:
+                    health.record(time.perf_counter() - start, ok=False)
+                    recorded = True
+                if emitted:
+                    raise
+                log_event("MODEL_ERROR", f"⚠️ {name} stream failed: {e}")
+            finally:
+                if not recorded:
+                    # closed mid-stream (GeneratorExit) or out of deadline: no outcome to
+                    # report, but a claimed half-open probe slot must not stay held
+                    health.release_probe()
+
+        log_event("MODEL_FAILSAFE", "❌ All streaming providers failed")
+        yield f"{LOCAL_FALLBACK_PREFIX} Unable to process with model. Prompt was: {prompt}"
+
+    async def _prepare(
+        self, query: str, task_type: Optional[str], context: Optional[str], retrieval: str
+    ) -> Tuple[str, str]:
+        """Classify the task if needed and apply the retrieval policy; returns (prompt, task_type)."""
+        prompt = query
+
+        embedding = None
         if not task_type:
-            task_type = self._classify_task(prompt)
+            # callers normally pass the turn's task type; this is the fallback for bare prompts
+            task_type, embedding = await asyncio.to_thread(self.classifier.classify_with_embedding, prompt)
         log_event("MODEL_CALL", f"🧠 Task classified as: {task_type}")
 
-        context = ""
-        if task_type in ["rag_query", "emotional_reflection", "cognitive_reasoning"]:
+        if not self._should_retrieve(task_type, retrieval):
+            context = None
+        elif context is None:
             try:
                 log_event("RAG_RETRIEVE", f"🔍 Retrieving context for: {task_type}")
                 loop = asyncio.get_event_loop()
-                context = await loop.run_in_executor(None, self.retriever.retrieve, prompt)
+                result = await loop.run_in_executor(None, self.retriever.search, prompt, 3, embedding)
+                context = result.text
                 if context:
                     log_event("RAG_CONTEXT", f"📚 Retrieved context length: {len(context)} chars")
-                    prompt = f"Context:\n{context}\n\nUser Query:\n{prompt}"
             except Exception as e:
                 log_event("RAG_ERROR", f"⚠️ Context retrieval failed: {e}")
-                prompt = query  
+                context = None
 
-        chosen_model = self._select_model(task_type)
-        log_event("MODEL_CALL", f"🎯 Routing to {chosen_model.__class__.__name__} for {task_type}")
+        if context:
+            prompt = f"Context:\n{context}\n\nUser Query:\n{query}"
+        return prompt, task_type
 
-        try:
-            response = await chosen_model.generate(prompt)
-            return response
-        except Exception as e:
-            log_event("MODEL_ERROR", f"⚠️ Primary model failed: {e}")
-            fallback = self._get_fallback(chosen_model)
-            log_event("MODEL_FALLBACK", f"🔄 Switching to fallback: {fallback.__class__.__name__}")
-            try:
-                return await fallback.generate(prompt)
-            except Exception as e2:
-                log_event("MODEL_FAILSAFE", f"❌ Fallback also failed: {e2}")
-                return f"(local fallback) Unable to process with model. Prompt was: {prompt}"#
+    def _should_retrieve(self, task_type: str, retrieval: str) -> bool:
+        if retrieval not in RETRIEVAL_POLICIES:
+            logger.warning(f"Unknown retrieval policy '{retrieval}', using 'auto'")
+            retrieval = "auto"
+        if retrieval == "never":
+            return False
+        return retrieval == "always" or task_type in RAG_TASK_TYPES
 
     def _classify_task(self, prompt: str) -> str:
-        """
-        Lightweight heuristic classifier for Neuraline's task taxonomy.
-        Will later evolve into a classification LLM.
-        """
-        p = prompt.lower()
-
-        if any(word in p for word in ["reflect", "feeling", "emotion", "why do i feel", "journal"]):
-            return "emotional_reflection"
-        elif any(word in p for word in ["plan", "goal", "steps", "how to achieve", "strategy"]):
-            return "cognitive_reasoning"
-        elif any(word in p for word in ["summarize", "analyze", "context", "rag", "retrieve", "neuraline", "explain", "describe"]):
-            return "rag_query"
-        elif any(word in p for word in ["habit", "track", "consistency", "routine"]):
-            return "behavioral_coaching"
-        elif any(word in p for word in ["purpose", "mission", "values", "north star"]):
-            return "purpose_alignment"
-        else:
-            return "general_chat"
+        """Shared embedding classifier (keyword rules while the model is not loaded)."""
+        return self.classifier.classify(prompt)
 
     def _select_model(self, task_type: str):
         """
@@ -93,10 +397,36 @@ class ModelRouter:
             "rag_query": self.gemini,
             "behavioral_coaching": self.groq,
             "purpose_alignment": self.gemini,
-            "general_chat": self.groq
+            "general_chat": self.groq,
+            "summarization": self.groq,
         }
         return model_map.get(task_type, self.gemini)
 
+    def _candidates(self, task_type: str) -> List:
+        """
+        Providers in the order to try them: the routed provider, then its fallback.
+        The fallback goes first when the routed provider's circuit is open, or when its
+        rolling p90 latency is PROVIDER_LATENCY_RATIO times the fallback's.
+        """
+        primary = self._select_model(task_type)
+        secondary = self._get_fallback(primary)
+        primary_health = provider_health.get(primary.provider)
+        secondary_health = provider_health.get(secondary.provider)
+
+        if primary_health.state == OPEN and secondary_health.state != OPEN:
+            return [secondary, primary]
+        ratio = settings.provider_latency_ratio
+        if ratio > 0:
+            primary_p90 = primary_health.latency_percentile(90, min_samples=LATENCY_MIN_SAMPLES)
+            secondary_p90 = secondary_health.latency_percentile(90, min_samples=LATENCY_MIN_SAMPLES)
+            if primary_p90 and secondary_p90 and primary_p90 > ratio * secondary_p90:
+                log_event(
+                    "MODEL_REROUTE",
+                    f"🐢 {primary.provider} p90={primary_p90:.2f}s vs {secondary.provider} p90={secondary_p90:.2f}s, preferring {secondary.provider}",
+                )
+                return [secondary, primary]
+        return [primary, secondary]
+
     def _get_fallback(self, model):
         """Return fallback model in case of failure."""
         return self.groq if model == self.gemini else self.gemini
\ No newline at end of file
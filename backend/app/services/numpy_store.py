@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.lexical_index import BM25Index
+from app.services.vector_store import ChromaDBClient
+
+logger = logging.getLogger(__name__)
+
+
+class NumpyVectorStore:
+    """
+    Read-optimised, ChromaDBClient-compatible view of a knowledge collection.
+
+    The collection's embeddings are exported once to `<collection>.vectors.npy`
+    (float32, row-major) with the ids, documents and metadatas in
+    `<collection>.chunks.json`. The matrix is opened with `mmap_mode="r"`, so every
+    worker maps the same file pages from the OS page cache instead of holding its
+    own copy. A top-k query is one matrix-vector product plus `argpartition`.
+    Distances are squared L2, like Chroma's default space, so rankings match.
+
+    Writes (`add_documents`, `delete_source`, ...) go to the underlying Chroma
+    collection; `rebuild_indexes` re-exports the matrix afterwards. The export also
+    records the collection's row count and the ingest manifest's file hashes, and is
+    re-exported on load if either changed (e.g. a CLI ingest with KNOWLEDGE_BACKEND=chroma).
+    """
+
+    def __init__(self, source: ChromaDBClient):
+        self.source = source
+        self.collection_name = source.collection_name
+        self.persist_directory = source.persist_directory
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.matrix: Optional[np.ndarray] = None
+        self.sq_norms: Optional[np.ndarray] = None
+        if not self._load():
+            self.export()
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.persist_directory, f"{self.collection_name}.vectors.npy")
+
+    @property
+    def chunks_path(self) -> str:
+        return os.path.join(self.persist_directory, f"{self.collection_name}.chunks.json")
+
+    def _fingerprint(self) -> Dict[str, Any]:
+        """What the export must match: the collection's size and, if the manifest describes it, its files."""
+        files_hash = None
+        try:
+            with open(settings.ingest_manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("collection", self.collection_name) == self.collection_name:
+                files = json.dumps(manifest.get("files", {}), sort_keys=True)
+                files_hash = hashlib.sha256(files.encode("utf-8")).hexdigest()
+        except (OSError, ValueError):
+            pass
+        return {"count": self.source.collection.count(), "manifest": files_hash}
+
+    def _load(self, fingerprint: Optional[Dict[str, Any]] = None) -> bool:
+        try:
+            with open(self.chunks_path, encoding="utf-8") as f:
+                chunks = json.load(f)
+            matrix = np.load(self.vectors_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return False
+        if matrix.ndim != 2 or matrix.shape[0] != len(chunks["ids"]):
+            logger.warning(f"Vector export for {self.collection_name} is inconsistent, re-exporting")
+            return False
+        if chunks.get("source") != (fingerprint or self._fingerprint()):
+            logger.warning(f"Vector export for {self.collection_name} is stale, re-exporting")
+            return False
+        self.ids = chunks["ids"]
+        self.documents = chunks["documents"]
+        self.metadatas = chunks["metadatas"]
+        self.matrix = matrix
+        self.sq_norms = np.einsum("ij,ij->i", matrix, matrix)
+        logger.info(f"✅ Mapped {matrix.shape[0]}x{matrix.shape[1]} vectors for {self.collection_name}.")
+        return True
+
+    def export(self):
+        """Dump the Chroma collection to the .npy/.json pair and map it."""
+        fingerprint = self._fingerprint()
+        data = self.source.get_all(include=["documents", "embeddings", "metadatas"])
+        ids = data["ids"]
+        if ids:
+            matrix = np.asarray(data["embeddings"], dtype=np.float32).reshape(len(ids), -1)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        os.makedirs(self.persist_directory, exist_ok=True)
+
+        # unique temp names so workers exporting at the same time never clobber each other's files
+        suffix = f".{os.getpid()}.tmp"
+        with open(self.vectors_path + suffix, "wb") as f:
+            np.save(f, matrix)
+        with open(self.chunks_path + suffix, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "ids": ids,
+                    "documents": data["documents"],
+                    "metadatas": [m or {} for m in data["metadatas"]],
+                    "source": fingerprint,
+                },
+                f,
+            )
+        os.replace(self.chunks_path + suffix, self.chunks_path)
+        os.replace(self.vectors_path + suffix, self.vectors_path)
+        if not self._load(fingerprint):
+            # e.g. an empty collection, which cannot be memory-mapped
+            self.ids, self.documents, self.metadatas, self.matrix = [], [], [], None
+        logger.info(f"✅ Exported {len(ids)} vectors from {self.collection_name}.")
+
+    def query(self, query_embedding: list, top_k: int = 3):
+        if self.matrix is None or not self.ids:
+            return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+        try:
+            q = np.asarray(query_embedding, dtype=np.float32)
+            distances = self.sq_norms - 2.0 * (self.matrix @ q) + float(q @ q)
+            k = min(top_k, len(self.ids))
+            top = np.argpartition(distances, k - 1)[:k]
+            top = top[np.argsort(distances[top], kind="stable")]
+            return {
+                "ids": [[self.ids[i] for i in top]],
+                "documents": [[self.documents[i] for i in top]],
+                "metadatas": [[self.metadatas[i] for i in top]],
+                "distances": [[float(distances[i]) for i in top]],
+            }
+        except Exception as e:
+            logger.error(f"❌ Query failed: {e}")
+            return None
+
+    @property
+    def lexical(self) -> BM25Index:
+        return self.source.lexical
+
+    def rebuild_indexes(self):
+        self.source.rebuild_indexes()
+        self.export()
+
+    def add_documents(self, *args, **kwargs):
+        self.source.add_documents(*args, **kwargs)
+
+    def delete_source(self, source: str):
+        self.source.delete_source(source)
+
+    def get_source(self, source: str) -> Dict[str, Any]:
+        return self.source.get_source(source)
+
+    def copy_source_from(self, other, source: str) -> int:
+        return self.source.copy_source_from(other, source)
+
+    def drop(self):
+        self.matrix = None
+        for path in (self.vectors_path, self.chunks_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.source.drop()
@@ -0,0 +1,296 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging_config import log_event
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class ProviderHealth:
+    """
+    Rolling health of one LLM provider plus its circuit breaker.
+
+    Keeps the outcomes of the last `window_seconds` (at most `max_samples` calls).
+    The breaker opens when the window's error rate reaches `failure_threshold` over
+    at least `min_requests` calls, or after `consecutive_failures` failures in a row.
+    While open, `allow_request` is False so the router goes straight to another
+    provider. After `open_seconds` one probe request is let through (half-open); its
+    outcome closes the breaker or re-opens it.
+
+    Calls cut off before they answered (the losing side of a hedge) are kept as
+    latency-only samples: their elapsed time is a lower bound on the real latency, so
+    including them stops the percentiles from drifting towards the fast calls only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60.0,
+        max_samples: int = 200,
+        failure_threshold: float = 0.5,
+        min_requests: int = 5,
+        consecutive_failures: int = 3,
+        open_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.failure_threshold = failure_threshold
+        self.min_requests = min_requests
+        self.consecutive_failures = consecutive_failures
+        self.open_seconds = open_seconds
+        self._samples: Deque[Tuple[float, float, bool]] = deque(maxlen=max_samples)
+        self._cutoffs: Deque[Tuple[float, float]] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._failure_streak = 0
+        self._counters = {"successes": 0, "failures": 0, "short_circuited": 0, "opened": 0}
+
+    def _prune(self, now: float):
+        while self._samples and now - self._samples[0][0] > self.window_seconds:
+            self._samples.popleft()
+        while self._cutoffs and now - self._cutoffs[0][0] > self.window_seconds:
+            self._cutoffs.popleft()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            now = time.monotonic()
+            if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            # a probe that never reported back (e.g. cancelled) must not wedge the breaker
+            probe_stale = now - self._probe_started >= self.open_seconds
+            if self._state == HALF_OPEN and (not self._probe_in_flight or probe_stale):
+                self._probe_in_flight = True
+                self._probe_started = now
+                return True
+            self._counters["short_circuited"] += 1
+            return False
+
+    def release_probe(self):
+        """Hand back a half-open probe slot whose call ended without an outcome (e.g. a closed stream)."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            now = time.monotonic()
+            self._samples.append((now, latency, ok))
+            self._prune(now)
+            if ok:
+                self._counters["successes"] += 1
+                self._failure_streak = 0
+                if self._state != CLOSED:
+                    # start the closed period from a clean window so old errors cannot re-trip it
+                    self._samples.clear()
+                    self._samples.append((now, latency, ok))
+                    self._state = CLOSED
+                    log_event("CIRCUIT_CLOSED", f"✅ {self.name} recovered, circuit closed")
+                return
+
+            self._counters["failures"] += 1
+            self._failure_streak += 1
+            if self._state == HALF_OPEN or self._should_open():
+                self._open(now)
+
+    def record_cutoff(self, latency: float):
+        """A call abandoned after `latency` seconds without an outcome; counts towards latency only."""
+        with self._lock:
+            now = time.monotonic()
+            self._cutoffs.append((now, latency))
+            self._prune(now)
+
+    def _latencies(self) -> List[float]:
+        return [latency for _, latency, ok in self._samples if ok] + [latency for _, latency in self._cutoffs]
+
+    def _should_open(self) -> bool:
+        if self._state != CLOSED:
+            return False
+        if self._failure_streak >= self.consecutive_failures:
+            return True
+        if len(self._samples) < self.min_requests:
+            return False
+        failures = sum(1 for _, _, ok in self._samples if not ok)
+        return failures / len(self._samples) >= self.failure_threshold
+
+    def _open(self, now: float):
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+        self._counters["opened"] += 1
+        log_event(
+            "CIRCUIT_OPEN",
+            f"🚫 {self.name} circuit opened for {self.open_seconds:.0f}s (failure streak={self._failure_streak})",
+            level="warning",
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def latency_percentile(self, pct: float, min_samples: int = 1) -> Optional[float]:
+        """Latency percentile (seconds) of successful and cut-off calls in the window, if there are enough of them."""
+        with self._lock:
+            self._prune(time.monotonic())
+            latencies = self._latencies()
+        if len(latencies) < min_samples:
+            return None
+        return _percentile(latencies, pct)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune(time.monotonic())
+            samples = list(self._samples)
+            latencies = self._latencies()
+            cutoffs = len(self._cutoffs)
+            counters = dict(self._counters)
+        failures = sum(1 for _, _, ok in samples if not ok)
+        return {
+            "state": self.state,
+            "window_requests": len(samples),
+            "window_error_rate": round(failures / len(samples), 4) if samples else 0.0,
+            "window_cutoffs": cutoffs,
+            "latency_p50_s": _round(_percentile(latencies, 50)),
+            "latency_p90_s": _round(_percentile(latencies, 90)),
+            "latency_p99_s": _round(_percentile(latencies, 99)),
+            **counters,
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 4) if value is not None else None
+
+
+class RetryBudget:
+    """
+    Process-wide cap on retries (including provider fallbacks).
+
+    Over the last `window_seconds`, retries may not exceed `ratio` of first attempts,
+    plus a small `min_retries` allowance so a quiet process can still retry. During an
+    outage retries therefore add at most ~`ratio` extra load instead of multiplying it.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 3, window_seconds: float = 10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "retries": 0, "denied": 0}
+
+    def _prune(self, now: float):
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window_seconds:
+                events.popleft()
+
+    def record_request(self):
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            self._requests.append(now)
+            self._counters["requests"] += 1
+
+    def try_retry(self) -> bool:
+        """Spend one retry if the budget allows it."""
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+                self._counters["denied"] += 1
+                return False
+            self._retries.append(now)
+            self._counters["retries"] += 1
+            return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune(time.monotonic())
+            return {
+                "ratio": self.ratio,
+                "window_requests": len(self._requests),
+                "window_retries": len(self._retries),
+                **self._counters,
+            }
+
+
+class ProviderHealthRegistry:
+    """Health and breakers per provider, the retry budget they all share, and hedging counters."""
+
+    def __init__(self):
+        self._providers: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+        self._hedges: Dict[str, Any] = {
+            "fired": 0, "won_by_primary": 0, "won_by_hedge": 0, "fired_for": {}, "winners": {}
+        }
+        self.retry_budget = RetryBudget(
+            ratio=settings.retry_budget_ratio,
+            min_retries=settings.retry_budget_min_retries,
+            window_seconds=settings.retry_budget_window_seconds,
+        )
+
+    def record_hedge_fired(self, provider: str):
+        with self._lock:
+            self._hedges["fired"] += 1
+            self._hedges["fired_for"][provider] = self._hedges["fired_for"].get(provider, 0) + 1
+
+    def record_hedge_winner(self, provider: str, hedged: bool):
+        with self._lock:
+            self._hedges["won_by_hedge" if hedged else "won_by_primary"] += 1
+            self._hedges["winners"][provider] = self._hedges["winners"].get(provider, 0) + 1
+
+    def get(self, provider: str) -> ProviderHealth:
+        health = self._providers.get(provider)
+        if health is None:
+            with self._lock:
+                health = self._providers.setdefault(
+                    provider,
+                    ProviderHealth(
+                        provider,
+                        window_seconds=settings.provider_health_window_seconds,
+                        failure_threshold=settings.circuit_failure_threshold,
+                        min_requests=settings.circuit_min_requests,
+                        consecutive_failures=settings.circuit_consecutive_failures,
+                        open_seconds=settings.circuit_open_seconds,
+                    ),
+                )
+        return health
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "providers": {name: health.snapshot() for name, health in list(self._providers.items())},
+            "retry_budget": self.retry_budget.snapshot(),
+            "hedging": self.hedge_stats(),
+        }
+
+    def hedge_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._hedges,
+                "fired_for": dict(self._hedges["fired_for"]),
+                "winners": dict(self._hedges["winners"]),
+            }
+
+
+provider_health = ProviderHealthRegistry()
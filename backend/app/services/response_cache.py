@@ -0,0 +1,223 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticResponseCache:
+    """
+    Semantic cache of LLM responses, keyed by a bucket plus the prompt embedding.
+    ModelRouter's buckets combine the caller namespace, task type and a hash of the
+    prompt around the user's message.
+
+    Entries live in SQLite so they survive restarts; lookups run against an in-memory
+    normalized embedding matrix per bucket, so a hit is one matrix-vector product.
+    A lookup hits when the best cosine similarity reaches `threshold` and the entry is
+    younger than `ttl_seconds`. The least recently used entries are evicted past
+    `max_entries`.
+
+    Several worker processes can share the SQLite file: a miss first picks up rows other
+    workers added since the last sync (one MAX(id) query when there are none), and rows
+    they evicted are dropped from the matrix when a lookup finds them gone.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.95, ttl_seconds: int = 86400, max_entries: int = 5000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS response_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                bucket TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_bucket ON response_cache(bucket)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_access ON response_cache(last_access)")
+        self._conn.commit()
+        # bucket -> (ids, created_at array, normalized embedding matrix)
+        self._index: Dict[str, Any] = {}
+        self._known_ids: Set[int] = set()
+        # highest row id seen in SQLite; rows above it were added by another worker
+        self._synced_id = 0
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0, "synced": 0}
+        self._sync()
+
+    def _migrate(self):
+        """Caches created before buckets kept them in a column named `task_type`."""
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(response_cache)").fetchall()]
+        if "task_type" in columns:
+            self._conn.execute("DROP INDEX IF EXISTS idx_cache_task")
+            self._conn.execute("ALTER TABLE response_cache RENAME COLUMN task_type TO bucket")
+            self._conn.commit()
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _sync(self) -> int:
+        """Add the rows written since the last sync (by this or another worker); returns how many were new."""
+        latest = self._conn.execute("SELECT MAX(id) FROM response_cache").fetchone()[0] or 0
+        if latest <= self._synced_id:
+            return 0
+        rows = self._conn.execute(
+            "SELECT id, bucket, embedding, created_at FROM response_cache WHERE id > ? ORDER BY id",
+            (self._synced_id,),
+        ).fetchall()
+        self._synced_id = latest
+        added = 0
+        for row_id, bucket, blob, created_at in rows:
+            if row_id in self._known_ids:
+                continue
+            self._append(bucket, row_id, created_at, np.frombuffer(blob, dtype=np.float32))
+            added += 1
+        return added
+
+    def _append(self, bucket: str, row_id: int, created_at: float, vec: np.ndarray):
+        self._known_ids.add(row_id)
+        if bucket in self._index:
+            row_ids, created, matrix = self._index[bucket]
+            self._index[bucket] = (row_ids + [row_id], np.append(created, created_at), np.vstack([matrix, vec]))
+        else:
+            self._index[bucket] = ([row_id], np.array([created_at], dtype=np.float64), vec[np.newaxis, :])
+
+    def _forget_ids(self, ids: List[int]):
+        """Drop rows from the in-memory index only (e.g. already deleted by another worker)."""
+        drop = set(ids)
+        self._known_ids -= drop
+        for bucket, (row_ids, created, matrix) in list(self._index.items()):
+            keep = [i for i, row_id in enumerate(row_ids) if row_id not in drop]
+            if len(keep) == len(row_ids):
+                continue
+            if not keep:
+                del self._index[bucket]
+            else:
+                self._index[bucket] = ([row_ids[i] for i in keep], created[keep], matrix[keep])
+
+    def _remove_ids(self, ids: List[int]):
+        if not ids:
+            return
+        self._conn.executemany("DELETE FROM response_cache WHERE id = ?", [(i,) for i in ids])
+        self._conn.commit()
+        self._forget_ids(ids)
+
+    def lookup(self, bucket: str, embedding) -> Optional[str]:
+        query = self._normalize(embedding)
+        with self._lock:
+            response = self._lookup(bucket, query)
+            if response is None and self._sync():
+                # another worker may have stored a matching entry since the last sync
+                self._counters["synced"] += 1
+                response = self._lookup(bucket, query)
+            self._counters["hits" if response is not None else "misses"] += 1
+            return response
+
+    def _lookup(self, bucket: str, query: np.ndarray) -> Optional[str]:
+        entry = self._index.get(bucket)
+        if entry is None:
+            return None
+        row_ids, created, matrix = entry
+
+        now = time.time()
+        expired = [row_ids[i] for i in np.nonzero(created < now - self.ttl_seconds)[0]]
+        if expired:
+            self._counters["expired"] += len(expired)
+            self._remove_ids(expired)
+            entry = self._index.get(bucket)
+            if entry is None:
+                return None
+            row_ids, created, matrix = entry
+
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        if float(scores[best]) < self.threshold:
+            return None
+
+        row_id = row_ids[best]
+        row = self._conn.execute(
+            "SELECT response FROM response_cache WHERE id = ?", (row_id,)
+        ).fetchone()
+        if row is None:
+            # evicted by another worker
+            self._forget_ids([row_id])
+            return None
+        self._conn.execute("UPDATE response_cache SET last_access = ? WHERE id = ?", (now, row_id))
+        self._conn.commit()
+        return row[0]
+
+    def store(self, bucket: str, prompt: str, embedding, response: str):
+        vec = self._normalize(embedding)
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO response_cache (bucket, prompt, embedding, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (bucket, prompt, vec.tobytes(), response, now, now),
+            )
+            self._conn.commit()
+            self._append(bucket, cur.lastrowid, now, vec)
+            self._counters["stores"] += 1
+
+            overflow = sum(len(e[0]) for e in self._index.values()) - self.max_entries
+            if overflow > 0:
+                victims = [
+                    r[0]
+                    for r in self._conn.execute(
+                        "SELECT id FROM response_cache ORDER BY last_access ASC LIMIT ?", (overflow,)
+                    ).fetchall()
+                ]
+                self._counters["evictions"] += len(victims)
+                self._remove_ids(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "entries": sum(len(e[0]) for e in self._index.values()),
+                "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+                **self._counters,
+            }
+
+
+_response_cache: Optional[SemanticResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[SemanticResponseCache]:
+    """Return the shared response cache, or None when RESPONSE_CACHE_ENABLED is off."""
+    global _response_cache
+    if not settings.response_cache_enabled:
+        return None
+    if _response_cache is None:
+        with _cache_lock:
+            if _response_cache is None:
+                _response_cache = SemanticResponseCache(
+                    settings.response_cache_path,
+                    threshold=settings.response_cache_threshold,
+                    ttl_seconds=settings.response_cache_ttl_seconds,
+                    max_entries=settings.response_cache_max_entries,
+                )
+    return _response_cache
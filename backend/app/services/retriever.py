@@ -1,20 +1,113 @@
 import logging
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional
+from app.core.config import settings
 from app.services.ai_clients import EmbeddingClient
-from app.services.vector_store import ChromaDBClient
+from app.services.embedding_registry import embedding_registry
+from app.services.lexical_index import reciprocal_rank_fusion
+from app.services.vector_store import ChromaDBClient, get_knowledge_store
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class RetrievalResult:
+    """
+    Outcome of one retrieval: the ranked documents plus the query embedding used to
+    find them (None when the query was answered lexically without embedding it).
+    """
+    query: str
+    documents: List[str] = field(default_factory=list)
+    embedding: Optional[List[float]] = None
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.documents)
+
+
 class ContextRetriever:
-    """Retrieves contextually relevant data from Chroma for RAG reasoning."""
+    """
+    Retrieves contextually relevant data from the knowledge index for RAG reasoning.
 
-    def __init__(self):
-        self.db = ChromaDBClient()
+    In "hybrid" mode (RETRIEVAL_MODE) the query runs against both the dense Chroma
+    collection and its BM25 index, and the two rankings are merged with reciprocal-rank
+    fusion. While the embedding model is still loading, or when too many query
+    embeddings are already in flight, hybrid retrieval answers from BM25 alone.
+    """
+
+    _dense_inflight = 0
+    _inflight_lock = threading.Lock()
+
+    def __init__(self, db: Optional[ChromaDBClient] = None, mode: Optional[str] = None):
+        self._db = db
+        self.mode = (mode or settings.retrieval_mode).lower()
         self.embedder = EmbeddingClient()
 
+    @property
+    def db(self) -> ChromaDBClient:
+        """A pinned store if one was given, else the live (hot-swappable) knowledge index."""
+        return self._db or get_knowledge_store()
+
+    @classmethod
+    def _reserve_dense(cls) -> bool:
+        if not embedding_registry.is_loaded():
+            embedding_registry.warm_up()
+            return False
+        with cls._inflight_lock:
+            if cls._dense_inflight >= settings.retrieval_dense_max_inflight:
+                return False
+            cls._dense_inflight += 1
+            return True
+
+    @classmethod
+    def _release_dense(cls):
+        with cls._inflight_lock:
+            cls._dense_inflight -= 1
+
+    def search(self, query: str, top_k: int = 3, embedding: Optional[List[float]] = None) -> RetrievalResult:
+        """Rank the knowledge chunks for `query`, reusing `embedding` if the caller already has it."""
+        db = self.db
+        if self.mode == "lexical":
+            return self._lexical_result(db, query, top_k)
+
+        if embedding is None:
+            if self.mode == "hybrid":
+                if not self._reserve_dense():
+                    logger.debug("Dense retrieval unavailable, answering lexically")
+                    return self._lexical_result(db, query, top_k)
+                try:
+                    embedding = self.embedder.embed(query)
+                finally:
+                    self._release_dense()
+            else:
+                embedding = self.embedder.embed(query)
+
+        candidates = top_k if self.mode == "dense" else max(top_k, settings.retrieval_candidates)
+        results = db.query(embedding, candidates)
+        dense_ids = list(results["ids"][0]) if results and results.get("ids") else []
+        texts = dict(zip(dense_ids, results["documents"][0])) if dense_ids else {}
+        if self.mode == "dense":
+            return RetrievalResult(query=query, documents=[texts[i] for i in dense_ids], embedding=embedding)
+
+        lexical_hits = self._lexical_hits(db, query, candidates)
+        texts.update((doc_id, text) for doc_id, text, _ in lexical_hits)
+        fused = reciprocal_rank_fusion(
+            [dense_ids, [doc_id for doc_id, _, _ in lexical_hits]], k=settings.retrieval_rrf_k
+        )
+        return RetrievalResult(query=query, documents=[texts[i] for i in fused[:top_k]], embedding=embedding)
+
+    @staticmethod
+    def _lexical_hits(db: ChromaDBClient, query: str, top_k: int):
+        try:
+            return db.lexical.search(query, top_k)
+        except Exception as e:
+            logger.warning(f"Lexical search failed: {e}")
+            return []
+
+    def _lexical_result(self, db: ChromaDBClient, query: str, top_k: int) -> RetrievalResult:
+        hits = self._lexical_hits(db, query, top_k)
+        return RetrievalResult(query=query, documents=[text for _, text, _ in hits])
+
     def retrieve(self, query: str, top_k: int = 3):
-        query_emb = self.embedder.embed(query)
-        results = self.db.query(query_emb, top_k)
-        if not results or not results.get("documents"):
-            return ""
-        documents = [doc for sublist in results["documents"] for doc in sublist]
-        return "\n".join(documents)
\ No newline at end of file
+        return self.search(query, top_k).text
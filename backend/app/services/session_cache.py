@@ -0,0 +1,93 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_live_caches: "weakref.WeakValueDictionary[str, SessionCache]" = weakref.WeakValueDictionary()
+
+
+class SessionCache:
+    """
+    LRU cache of hot per-session objects, bounded by size and idle time.
+
+    On a miss the value is rehydrated lazily with `loader(session_id)` (e.g. from the
+    persistent conversation store); callers write through to that store themselves,
+    so evicting an entry never loses data.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Any],
+        max_sessions: int = 1000,
+        idle_seconds: float = 1800.0,
+        name: str = "sessions",
+    ):
+        self.loader = loader
+        self.max_sessions = max(1, max_sessions)
+        self.idle_seconds = idle_seconds
+        self.name = name
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evicted_idle": 0, "evicted_capacity": 0}
+        _live_caches[name] = self
+
+    def get(self, session_id: str) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and now - entry[1] <= self.idle_seconds:
+                self._entries[session_id] = (entry[0], now)
+                self._entries.move_to_end(session_id)
+                self._counters["hits"] += 1
+                return entry[0]
+            self._counters["misses"] += 1
+
+        value = self.loader(session_id)
+
+        with self._lock:
+            # another caller may have rehydrated the same session meanwhile; keep theirs
+            entry = self._entries.get(session_id)
+            if entry is not None and now - entry[1] <= self.idle_seconds:
+                value = entry[0]
+            self._entries[session_id] = (value, now)
+            self._entries.move_to_end(session_id)
+            self._evict(now)
+        return value
+
+    def peek(self, session_id: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            return entry[0] if entry else None
+
+    def discard(self, session_id: str):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def _evict(self, now: float):
+        while self._entries:
+            oldest_id, (_, last_access) = next(iter(self._entries.items()))
+            if now - last_access > self.idle_seconds:
+                self._entries.popitem(last=False)
+                self._counters["evicted_idle"] += 1
+            elif len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+                self._counters["evicted_capacity"] += 1
+            else:
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._evict(time.monotonic())
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "resident_sessions": len(self._entries),
+                "max_sessions": self.max_sessions,
+                "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+                **self._counters,
+            }
+
+
+def session_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every live SessionCache, keyed by name."""
+    return {name: cache.stats() for name, cache in list(_live_caches.items())}
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight async calls.
+
+    The first caller for a key starts the work as a task; callers arriving with the
+    same key while it is running await that same task and get the same result (or
+    exception). Each caller awaits through `asyncio.shield`, so one client going
+    away does not cancel the run the others are still waiting on. The key is
+    forgotten as soon as the run finishes, so nothing is cached beyond it.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._counters = {"leaders": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._finished(k, t))
+            self._counters["leaders"] += 1
+        else:
+            self._counters["coalesced"] += 1
+            logger.info(f"[{self.name}] Joined in-flight run for key={key!r}")
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # mark the outcome as retrieved even if every caller went away meanwhile
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"inflight": len(self._inflight), **self._counters}
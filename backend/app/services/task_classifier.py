@@ -0,0 +1,148 @@
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.ai_clients import EmbeddingClient
+from app.services.embedding_registry import embedding_registry
+
+logger = logging.getLogger(__name__)
+
+# Labelled examples per task type; each class is represented by the centroid of its examples.
+TASK_EXAMPLES: Dict[str, List[str]] = {
+    "emotional_reflection": [
+        "I feel anxious and I don't know why",
+        "Why do I feel so drained after work every day?",
+        "I want to journal about how today went",
+        "I'm overwhelmed and a bit sad lately",
+        "Help me understand my emotions about this breakup",
+        "I keep feeling guilty when I rest",
+    ],
+    "cognitive_reasoning": [
+        "Help me plan the steps to launch my side project",
+        "What is a good strategy to reach my fitness goal by June?",
+        "Break this goal down into a weekly plan",
+        "How do I prioritise three big projects at once?",
+        "Give me a step by step plan to learn Python in three months",
+        "How can I achieve my savings target this year?",
+    ],
+    "rag_query": [
+        "What does the Ikigai framework say?",
+        "Explain time blocking",
+        "Summarize the key ideas of Atomic Habits",
+        "What is Neuraline and how does it work?",
+        "Describe how dopamine affects productivity",
+        "What are the principles of mindfulness?",
+    ],
+    "behavioral_coaching": [
+        "I can't stick to my morning routine",
+        "Help me build a habit of reading every day",
+        "How do I stay consistent with going to the gym?",
+        "I keep breaking my streak, how do I track it better?",
+        "Give me a small daily habit to reduce phone use",
+        "How do I stop procrastinating every evening?",
+    ],
+    "purpose_alignment": [
+        "What is my purpose in life?",
+        "Help me write a personal mission statement",
+        "Does this job align with my values?",
+        "I want my work to feel more meaningful",
+        "What should my north star be for the next five years?",
+        "How do I connect my daily tasks to what I care about?",
+    ],
+    "general_chat": [
+        "Hi, how are you?",
+        "Tell me something interesting",
+        "Thanks, that was helpful",
+        "Good morning!",
+        "What can you do?",
+        "Let's just chat for a bit",
+    ],
+}
+
+# Ordered keyword rules, used when embeddings are unavailable or no class is close enough.
+KEYWORD_RULES: List[Tuple[str, List[str]]] = [
+    ("emotional_reflection", ["reflect", "feeling", "emotion", "why do i feel", "journal"]),
+    ("cognitive_reasoning", ["plan", "goal", "steps", "how to achieve", "strategy"]),
+    ("rag_query", ["summarize", "analyze", "context", "rag", "retrieve", "neuraline", "explain", "describe"]),
+    ("behavioral_coaching", ["habit", "track", "consistency", "routine"]),
+    ("purpose_alignment", ["purpose", "mission", "values", "north star"]),
+]
+
+
+def classify_keywords(text: str) -> str:
+    p = text.lower()
+    for label, words in KEYWORD_RULES:
+        if any(word in p for word in words):
+            return label
+    return "general_chat"
+
+
+class TaskClassifier:
+    """
+    Nearest-centroid task classifier over sentence embeddings.
+
+    Class centroids are built once from `TASK_EXAMPLES`; classifying a message is one
+    matrix-vector product against them. Pass the query embedding retrieval already
+    computed to classify without another forward pass. Falls back to the keyword rules
+    while the embedding model is not loaded, on errors, or when the best cosine
+    similarity is below TASK_CLASSIFIER_MIN_SCORE.
+    """
+
+    def __init__(self, examples: Optional[Dict[str, List[str]]] = None):
+        self.examples = examples or TASK_EXAMPLES
+        self.embedder = EmbeddingClient()
+        self.labels: List[str] = list(self.examples)
+        self._centroids: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def _get_centroids(self) -> np.ndarray:
+        if self._centroids is None:
+            with self._lock:
+                if self._centroids is None:
+                    rows = []
+                    for label in self.labels:
+                        vectors = np.asarray(self.embedder.embed_batch(self.examples[label]), dtype=np.float32)
+                        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                        centroid = vectors.mean(axis=0)
+                        rows.append(centroid / np.linalg.norm(centroid))
+                    self._centroids = np.stack(rows)
+        return self._centroids
+
+    def classify_with_embedding(self, text: str) -> Tuple[str, Optional[List[float]]]:
+        """Classify `text`, embedding it if the model is loaded; returns (task type, embedding or None)."""
+        if not embedding_registry.is_loaded():
+            return classify_keywords(text), None
+        try:
+            embedding = self.embedder.embed(text)
+        except Exception as e:
+            logger.warning(f"Task classifier could not embed the message: {e}")
+            return classify_keywords(text), None
+        return self.classify(text, embedding), embedding
+
+    def classify(self, text: str, embedding: Optional[List[float]] = None) -> str:
+        if embedding is None:
+            return self.classify_with_embedding(text)[0]
+        try:
+            query = np.asarray(embedding, dtype=np.float32)
+            scores = self._get_centroids() @ (query / np.linalg.norm(query))
+        except Exception as e:
+            logger.warning(f"Embedding task classification failed, using keywords: {e}")
+            return classify_keywords(text)
+        best = int(np.argmax(scores))
+        if scores[best] < settings.task_classifier_min_score:
+            return classify_keywords(text)
+        return self.labels[best]
+
+
+_classifier: Optional[TaskClassifier] = None
+
+
+def get_task_classifier() -> TaskClassifier:
+    """Process-wide classifier shared by the router, conversation manager, MCP engine and coordinator."""
+    global _classifier
+    if _classifier is None:
+        _classifier = TaskClassifier()
+    return _classifier
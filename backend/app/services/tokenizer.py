@@ -0,0 +1,129 @@
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+
+class TokenCounter:
+    """
+    Local token counting and token-exact truncation.
+
+    Uses the `tokenizers` fast tokenizer of `model_name` (by default the embedding
+    model, whose tokenizer.json is already in the Hugging Face cache). Provider
+    tokenizers differ somewhat, so counts are an estimate of provider input size;
+    they are stable, which is what budgeting needs. If the tokenizer cannot be
+    loaded, a ~4 characters per token estimate is used instead.
+
+    Loading may download tokenizer.json, so it runs in a background thread started by
+    `warm_up()` (called at startup). The first count waits up to `load_timeout_s` for
+    it and then pins the backend for the life of the counter: a tokenizer that finishes
+    loading after the estimate was chosen is not used, so identical prompts are always
+    trimmed the same way. With `load_timeout_s=0` the first count neither waits nor
+    starts a load: it uses the tokenizer only if `warm_up()` already finished.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, load_timeout_s: Optional[float] = None):
+        self.model_name = model_name or settings.prompt_tokenizer_name or settings.embedding_model_name
+        self.load_timeout = settings.prompt_tokenizer_load_timeout_seconds if load_timeout_s is None else load_timeout_s
+        self._tokenizer = None
+        self._loaded = False
+        self._loader: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # the backend used for every count, fixed by the first one (None = estimate)
+        self._pinned = False
+        self._active = None
+
+    def warm_up(self):
+        """Start loading the tokenizer in a background thread (no-op once started)."""
+        with self._lock:
+            if self._loaded or self._loader is not None:
+                return
+            self._loader = threading.Thread(target=self._load, name="tokenizer-warm-up", daemon=True)
+            self._loader.start()
+
+    def _load(self):
+        try:
+            from tokenizers import Tokenizer
+
+            tokenizer = Tokenizer.from_pretrained(self.model_name)
+            tokenizer.no_truncation()
+            tokenizer.no_padding()
+            self._tokenizer = tokenizer
+            logger.info(f"[TOKENIZER] Loaded {self.model_name}")
+        except Exception as e:
+            logger.warning(f"[TOKENIZER] Falling back to length estimate, could not load {self.model_name}: {e}")
+        self._loaded = True
+
+    def _get_tokenizer(self):
+        if self._pinned:
+            return self._active
+        if self.load_timeout > 0:
+            self.warm_up()
+        loader = self._loader
+        if loader is not None and not self._loaded:
+            loader.join(self.load_timeout)
+        with self._lock:
+            if not self._pinned:
+                self._active = self._tokenizer if self._loaded else None
+                self._pinned = True
+                if self._active is None:
+                    logger.warning(f"[TOKENIZER] Using the length estimate for this process ({self.model_name} not loaded)")
+        return self._active
+
+    @property
+    def backend(self) -> str:
+        if not self._pinned:
+            return "not chosen yet"
+        return "tokenizers" if self._active is not None else "estimate"
+
+    def _offsets(self, text: str) -> Optional[List[Tuple[int, int]]]:
+        tokenizer = self._get_tokenizer()
+        if tokenizer is None:
+            return None
+        return tokenizer.encode(text, add_special_tokens=False).offsets
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        offsets = self._offsets(text)
+        if offsets is None:
+            return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+        return len(offsets)
+
+    def keep_head(self, text: str, max_tokens: int) -> str:
+        """The longest prefix of `text` that fits in `max_tokens`."""
+        if max_tokens <= 0 or not text:
+            return ""
+        offsets = self._offsets(text)
+        if offsets is None:
+            return text[: max_tokens * CHARS_PER_TOKEN]
+        if len(offsets) <= max_tokens:
+            return text
+        return text[: offsets[max_tokens - 1][1]]
+
+    def keep_tail(self, text: str, max_tokens: int) -> str:
+        """The longest suffix of `text` that fits in `max_tokens`."""
+        if max_tokens <= 0 or not text:
+            return ""
+        offsets = self._offsets(text)
+        if offsets is None:
+            return text[-max_tokens * CHARS_PER_TOKEN:]
+        if len(offsets) <= max_tokens:
+            return text
+        return text[offsets[-max_tokens][0]:]
+
+
+_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Process-wide TokenCounter (the tokenizer is loaded once, in the background)."""
+    global _counter
+    if _counter is None:
+        _counter = TokenCounter()
+    return _counter
@@ -0,0 +1,83 @@
+import argparse
+import json
+import logging
+import statistics
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.services.numpy_store import NumpyVectorStore
+from app.services.vector_store import ChromaDBClient, _manifest_collection
+
+
+def _latencies(query: Callable, embeddings: np.ndarray, top_k: int, warmup: int) -> List[float]:
+    for q in embeddings[:warmup]:
+        query(q.tolist(), top_k)
+    timings = []
+    for q in embeddings:
+        vector = q.tolist()
+        start = time.perf_counter()
+        query(vector, top_k)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _summary(timings: List[float]) -> Dict[str, float]:
+    ordered = sorted(timings)
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def run_benchmark(collection: str, queries: int = 200, top_k: int = 3, warmup: int = 20, seed: int = 0) -> Dict:
+    """
+    Time top-k queries against the Chroma collection and its NumPy export. Queries
+    are stored chunk vectors plus small noise, so no embedding model is needed.
+    Also reports how often the two backends return the same top-k ids.
+    """
+    chroma = ChromaDBClient(collection)
+    numpy_store = NumpyVectorStore(chroma)
+    if numpy_store.matrix is None or not len(numpy_store.ids):
+        raise SystemExit(f"Collection {collection} is empty; run the ingestion first.")
+
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, numpy_store.matrix.shape[0], size=queries)
+    base = np.asarray(numpy_store.matrix[rows], dtype=np.float32)
+    embeddings = base + rng.normal(0, 0.05, size=base.shape).astype(np.float32)
+
+    agreement = []
+    for q in embeddings[: min(queries, 50)]:
+        expected = set(chroma.query(q.tolist(), top_k)["ids"][0])
+        got = set(numpy_store.query(q.tolist(), top_k)["ids"][0])
+        agreement.append(len(expected & got) / max(1, len(expected)))
+
+    return {
+        "collection": collection,
+        "vectors": int(numpy_store.matrix.shape[0]),
+        "dim": int(numpy_store.matrix.shape[1]),
+        "queries": queries,
+        "top_k": top_k,
+        "chroma": _summary(_latencies(chroma.query, embeddings, top_k, warmup)),
+        "numpy": _summary(_latencies(numpy_store.query, embeddings, top_k, warmup)),
+        "topk_agreement": round(statistics.fmean(agreement), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Chroma and NumPy mmap top-k query latency.")
+    parser.add_argument("--collection", default=None, help="Collection name (default: the one in the ingest manifest)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    result = run_benchmark(args.collection or _manifest_collection(), queries=args.queries, top_k=args.top_k)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
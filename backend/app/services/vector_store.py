@@ -1,27 +1,193 @@
+import json
 import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
 from chromadb import PersistentClient
 from app.core.config import settings
+from app.services.lexical_index import BM25Index
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_COLLECTION = "neuraline_knowledge"
+# rows per `collection.get` when reading a whole collection; one unbounded get exceeds
+# SQLite's bound-variable limit on large collections
+GET_PAGE_SIZE = 5000
+
 class ChromaDBClient:
     """Handles connection and operations with Chroma vector database."""
-    def __init__(self):
+    def __init__(self, collection_name: str = DEFAULT_COLLECTION):
         self.persist_directory = "./data/chroma"
+        self.collection_name = collection_name
         self.client = PersistentClient(path=self.persist_directory)
-        self.collection = self.client.get_or_create_collection(name="neuraline_knowledge")
+        self.collection = self.client.get_or_create_collection(name=collection_name)
+        self._lexical: Optional[BM25Index] = None
+        self._lexical_lock = threading.Lock()
+
+    @property
+    def lexical_index_path(self) -> str:
+        return os.path.join(self.persist_directory, f"{self.collection_name}.bm25.json")
+
+    @property
+    def lexical(self) -> BM25Index:
+        """BM25 index over this collection: loaded from disk, or built from the collection if missing."""
+        if self._lexical is None:
+            with self._lexical_lock:
+                if self._lexical is None:
+                    index = BM25Index.load(self.lexical_index_path)
+                    if index is None:
+                        index = self.rebuild_lexical_index()
+                    self._lexical = index
+        return self._lexical
+
+    def get_all(self, include: List[str], page_size: int = GET_PAGE_SIZE) -> Dict[str, List[Any]]:
+        """Every chunk in the collection, read in pages of `page_size` rows."""
+        data: Dict[str, List[Any]] = {"ids": [], **{field: [] for field in include}}
+        offset = 0
+        while True:
+            page = self.collection.get(include=include, limit=page_size, offset=offset)
+            ids = list(page.get("ids") or [])
+            data["ids"].extend(ids)
+            for field in include:
+                values = page.get(field)
+                data[field].extend(list(values) if values is not None else [None] * len(ids))
+            if len(ids) < page_size:
+                return data
+            offset += len(ids)
+
+    def rebuild_lexical_index(self) -> BM25Index:
+        """Rebuild and persist the BM25 index from every chunk currently in the collection."""
+        chunks = self.get_all(include=["documents"])
+        index = BM25Index.build(list(chunks.get("ids") or []), list(chunks.get("documents") or []))
+        try:
+            index.save(self.lexical_index_path)
+        except OSError as e:
+            logger.error(f"❌ Failed to persist lexical index for {self.collection_name}: {e}")
+        self._lexical = index
+        logger.info(f"✅ Lexical index for {self.collection_name} built over {len(index)} chunks.")
+        return index
+
+    def rebuild_indexes(self):
+        """Refresh every index derived from the collection (run after each ingestion)."""
+        self.rebuild_lexical_index()
 
     def add_document(self, doc_id: str, text: str, embedding: list):
         try:
-            self.collection.add(documents=[text], ids=[doc_id], embeddings=[embedding])
+            self.collection.upsert(documents=[text], ids=[doc_id], embeddings=[embedding])
             logger.info(f"✅ Document {doc_id} added to ChromaDB.")
         except Exception as e:
             logger.error(f"❌ Failed to add document {doc_id}: {e}")
 
+    def add_documents(
+        self,
+        ids: List[str],
+        texts: List[str],
+        embeddings: List[list],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        batch_size: int = 0,
+    ):
+        """
+        Bulk write, one `collection.upsert` per batch of `batch_size` (default INGEST_BATCH_SIZE).
+        Chunk ids are deterministic, so re-ingesting a file replaces its chunks in place even
+        when the collection predates (or outlived) the ingest manifest.
+        """
+        batch_size = batch_size or settings.ingest_batch_size
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            self.collection.upsert(
+                ids=ids[start:end],
+                documents=texts[start:end],
+                embeddings=embeddings[start:end],
+                metadatas=metadatas[start:end] if metadatas else None,
+            )
+        logger.info(f"✅ {len(ids)} documents written to ChromaDB collection {self.collection_name}.")
+
+    def delete_source(self, source: str):
+        """Remove every chunk that was ingested from `source`."""
+        try:
+            self.collection.delete(where={"source": source})
+        except Exception as e:
+            logger.error(f"❌ Failed to delete chunks for {source}: {e}")
+            raise
+
+    def get_source(self, source: str) -> Dict[str, Any]:
+        """All stored chunks (ids, documents, embeddings, metadatas) ingested from `source`."""
+        return self.collection.get(where={"source": source}, include=["documents", "embeddings", "metadatas"])
+
+    def copy_source_from(self, other: "ChromaDBClient", source: str) -> int:
+        """Copy `source`'s chunks from another collection without re-embedding them."""
+        chunks = other.get_source(source)
+        ids = list(chunks.get("ids") or [])
+        if not ids:
+            return 0
+        self.add_documents(
+            ids=ids,
+            texts=list(chunks["documents"]),
+            embeddings=[list(e) for e in chunks["embeddings"]],
+            metadatas=list(chunks["metadatas"]),
+        )
+        return len(ids)
+
+    def drop(self):
+        """Delete this collection from the database."""
+        try:
+            self.client.delete_collection(self.collection_name)
+            if os.path.exists(self.lexical_index_path):
+                os.remove(self.lexical_index_path)
+            logger.info(f"🗑️ Dropped ChromaDB collection {self.collection_name}.")
+        except Exception as e:
+            logger.error(f"❌ Failed to drop collection {self.collection_name}: {e}")
+
     def query(self, query_embedding: list, top_k: int = 3):
         try:
             results = self.collection.query(query_embeddings=[query_embedding], n_results=top_k)
             return results
         except Exception as e:
             logger.error(f"❌ Query failed: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+_active_store: Optional[ChromaDBClient] = None
+_active_lock = threading.Lock()
+
+
+def _manifest_collection() -> str:
+    """Collection the last ingestion run published, falling back to the default name."""
+    try:
+        with open(settings.ingest_manifest_path, encoding="utf-8") as f:
+            return json.load(f).get("collection") or DEFAULT_COLLECTION
+    except (OSError, ValueError):
+        return DEFAULT_COLLECTION
+
+
+def get_knowledge_store() -> ChromaDBClient:
+    """The knowledge index currently serving queries (shared by every ContextRetriever)."""
+    global _active_store
+    if _active_store is None:
+        with _active_lock:
+            if _active_store is None:
+                _active_store = serving_store(ChromaDBClient(_manifest_collection()))
+    return _active_store
+
+
+def serving_store(store: ChromaDBClient):
+    """
+    Wrap a Chroma collection in the query backend selected by KNOWLEDGE_BACKEND:
+    "chroma" queries the collection directly, "numpy" serves it from a memory-mapped
+    export (see NumpyVectorStore). Both expose the same ChromaDBClient interface.
+    """
+    if settings.knowledge_backend.lower() == "numpy":
+        from app.services.numpy_store import NumpyVectorStore
+        return NumpyVectorStore(store)
+    return store
+
+
+def swap_knowledge_store(store: ChromaDBClient) -> Optional[ChromaDBClient]:
+    """
+    Atomically point all retrievers at `store` and return the previous index.
+    Queries already running keep the reference they started with.
+    """
+    global _active_store
+    with _active_lock:
+        previous, _active_store = _active_store, store
+    return previous
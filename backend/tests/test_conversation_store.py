@@ -0,0 +1,121 @@
+"""
+Ordered conversation stores: per-session seq allocation and `tail` reads
+(app/services/memory/sqlite_store.py and chroma_memory.py).
+
+Run from backend/: `python -m pytest tests`.
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test")
+
+from app.services.memory.base import ConversationMessage  # noqa: E402
+from app.services.memory.sqlite_store import SQLiteConversationStore  # noqa: E402
+
+
+def _messages(session_id, *contents):
+    return [ConversationMessage(session_id=session_id, role="user", content=c) for c in contents]
+
+
+def _contents(rows):
+    return [row["content"] for row in rows]
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "memory" / "conversations.sqlite3")
+
+
+def test_sqlite_seqs_are_contiguous_per_session(sqlite_path):
+    store = SQLiteConversationStore(sqlite_path)
+    batch = _messages("a", "a1", "a2") + _messages("b", "b1") + _messages("a", "a3")
+    store.append_many(batch)
+    store.append_many(_messages("b", "b2"))
+    assert [m.seq for m in batch] == [1, 2, 1, 3]
+    assert [row["seq"] for row in store.load_session_history("a")] == [1, 2, 3]
+    assert _contents(store.load_session_history("b")) == ["b1", "b2"]
+
+
+def test_sqlite_tail_returns_the_last_messages_oldest_first(sqlite_path):
+    store = SQLiteConversationStore(sqlite_path)
+    store.append_many(_messages("a", *[f"m{i}" for i in range(10)]))
+    assert _contents(store.tail("a", 3)) == ["m7", "m8", "m9"]
+    assert _contents(store.tail("a", 50)) == [f"m{i}" for i in range(10)]
+    assert store.tail("a", 0) == []
+    assert store.tail("missing", 3) == []
+
+
+def test_sqlite_stores_sharing_a_file_never_reuse_a_seq(sqlite_path):
+    # two connections to the same file stand in for two worker processes
+    first, second = SQLiteConversationStore(sqlite_path), SQLiteConversationStore(sqlite_path)
+    for i in range(3):
+        first.append_many(_messages("a", f"first{i}"))
+        second.append_many(_messages("a", f"second{i}"))
+    assert [row["seq"] for row in first.load_session_history("a")] == [1, 2, 3, 4, 5, 6]
+    assert _contents(second.tail("a", 2)) == ["first2", "second2"]
+
+
+def test_sqlite_clear_session_drops_messages_and_summary(sqlite_path):
+    store = SQLiteConversationStore(sqlite_path)
+    store.append_many(_messages("a", "a1") + _messages("b", "b1"))
+    store.save_summary("a", "summary", 1)
+    store.clear_session("a")
+    assert store.load_session_history("a") == [] and store.load_summary("a") is None
+    assert _contents(store.tail("b", 5)) == ["b1"]
+    store.append_many(_messages("a", "again"))
+    assert store.tail("a", 1)[0]["seq"] == 1
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+@pytest.fixture
+def chroma_store(tmp_path, monkeypatch):
+    pytest.importorskip("chromadb")
+    pytest.importorskip("langchain_community")
+    pytest.importorskip("pydantic_settings")
+    from app.services.memory import chroma_memory
+
+    monkeypatch.setattr(chroma_memory, "get_embedding_model", FakeEmbeddings)
+    return chroma_memory.ChromaConversationMemory(str(tmp_path / "chroma_memory"))
+
+
+def test_chroma_tail_matches_the_end_of_the_history(chroma_store):
+    chroma_store.append_many(_messages("a", *[f"m{i}" for i in range(6)]) + _messages("b", "b1"))
+    assert [row["seq"] for row in chroma_store.load_session_history("a")] == [1, 2, 3, 4, 5, 6]
+    assert _contents(chroma_store.tail("a", 4)) == ["m2", "m3", "m4", "m5"]
+    assert _contents(chroma_store.tail("b", 4)) == ["b1"]
+
+
+def test_chroma_retrying_a_failed_write_leaves_no_gap(chroma_store, monkeypatch):
+    chroma_store.append_many(_messages("a", "m0", "m1"))
+    batch = _messages("a", "m2", "m3")
+    add_texts = chroma_store.client.add_texts
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(chroma_store.client, "add_texts", fail)
+    with pytest.raises(RuntimeError):
+        chroma_store.append_many(batch)
+    monkeypatch.setattr(chroma_store.client, "add_texts", add_texts)
+    # write-behind retries the same message objects, which keep their reserved seqs
+    chroma_store.append_many(batch)
+    chroma_store.append_many(_messages("a", "m4"))
+
+    assert [row["seq"] for row in chroma_store.load_session_history("a")] == [1, 2, 3, 4, 5]
+    assert _contents(chroma_store.tail("a", 3)) == ["m2", "m3", "m4"]
+
+
+def test_chroma_tail_falls_back_when_reserved_seqs_were_never_written(chroma_store):
+    chroma_store.append_many(_messages("a", "m0", "m1", "m2"))
+    # a batch reserved its seqs and then was dropped (or is still in flight elsewhere)
+    chroma_store._reserve_seqs({"a": 2})
+    chroma_store.append_many(_messages("a", "m3"))
+    assert _contents(chroma_store.tail("a", 3)) == ["m1", "m2", "m3"]
@@ -0,0 +1,130 @@
+"""
+Micro-batching of single-text embedding calls (app/services/embedding_batcher.py):
+result routing, error propagation and timeouts.
+
+Run from backend/: `python -m pytest tests`.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from app.services.embedding_batcher import EmbeddingBatcher  # noqa: E402
+
+
+class RecordingModel:
+    """Embeds text as [len, first char]; `error` makes batches fail, `gate` holds them."""
+
+    def __init__(self, error=None, gate=None):
+        self.batches = []
+        self.error = error
+        self.gate = gate
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        return [[float(len(t)), float(ord(t[0]))] for t in texts]
+
+
+def _queue_up(batcher, *texts):
+    """Queue texts before the worker starts, so they are collected deterministically."""
+    futures = []
+    for text in texts:
+        future = Future()
+        batcher._queue.put((text, future))
+        futures.append(future)
+    batcher._ensure_started()
+    return futures
+
+
+def test_each_caller_gets_its_own_vector_from_a_shared_batch():
+    model = RecordingModel()
+    batcher = EmbeddingBatcher(model, max_batch=8)
+    futures = _queue_up(batcher, "a", "bb", "ccc")
+    assert [f.result(5) for f in futures] == [[1.0, 97.0], [2.0, 98.0], [3.0, 99.0]]
+    assert model.batches == [["a", "bb", "ccc"]]
+    stats = batcher.stats()
+    assert (stats["batches"], stats["texts"], stats["batch_size_histogram"]["<=4"]) == (1, 3, 1)
+
+
+def test_batches_are_capped_at_max_batch():
+    model = RecordingModel()
+    batcher = EmbeddingBatcher(model, max_batch=2)
+    futures = _queue_up(batcher, "a", "b", "c", "d", "e")
+    for f in futures:
+        f.result(5)
+    assert model.batches == [["a", "b"], ["c", "d"], ["e"]]
+    assert batcher.stats()["mean_batch_size"] == round(5 / 3, 2)
+
+
+def test_concurrent_embed_query_calls_are_answered_correctly():
+    batcher = EmbeddingBatcher(RecordingModel(), max_batch=4, max_wait_ms=20)
+    texts = [chr(ord("a") + i) * (i + 1) for i in range(12)]
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        vectors = list(pool.map(batcher.embed_query, texts))
+    assert vectors == [[float(len(t)), float(ord(t[0]))] for t in texts]
+    assert batcher.stats()["texts"] == 12
+
+
+def test_a_model_error_fails_every_caller_in_the_batch_and_the_worker_continues():
+    model = RecordingModel(error=ValueError("model exploded"))
+    batcher = EmbeddingBatcher(model, max_batch=8)
+    futures = _queue_up(batcher, "a", "b")
+    for f in futures:
+        with pytest.raises(ValueError, match="model exploded"):
+            f.result(5)
+
+    model.error = None
+    assert batcher.embed_query("c") == [1.0, 99.0]
+    assert batcher.stats()["batches"] == 1
+
+
+def test_a_wrong_number_of_vectors_fails_the_batch():
+    model = RecordingModel()
+    model.embed_documents = lambda texts: [[0.0]]
+    batcher = EmbeddingBatcher(model, max_batch=8)
+    futures = _queue_up(batcher, "a", "b")
+    for f in futures:
+        with pytest.raises(RuntimeError, match="1 vectors for 2 texts"):
+            f.result(5)
+
+
+def test_a_caller_that_times_out_is_skipped_by_later_batches():
+    gate = threading.Event()
+    model = RecordingModel(gate=gate)
+    batcher = EmbeddingBatcher(model, max_batch=1, result_timeout_s=0.05)
+    blocked = _queue_up(batcher, "first")[0]
+    # the worker is stuck on "first", so this caller gives up
+    with pytest.raises(TimeoutError):
+        batcher.embed_query("late")
+    gate.set()
+    assert blocked.result(5) == [5.0, 102.0]
+    batcher.result_timeout = 5
+    assert batcher.embed_query("next") == [4.0, 110.0]
+    assert ["late"] not in model.batches
+
+
+# the dying worker re-raises, which pytest reports from the thread
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_a_dead_worker_fails_queued_callers_and_is_replaced():
+    gate = threading.Event()
+    model = RecordingModel(error=SystemExit("worker killed"), gate=gate)
+    batcher = EmbeddingBatcher(model, max_batch=1)
+    in_batch = _queue_up(batcher, "a")[0]
+    worker = batcher._thread
+    queued = Future()
+    batcher._queue.put(("b", queued))
+    gate.set()
+    for f in (in_batch, queued):
+        with pytest.raises(RuntimeError, match="worker stopped"):
+            f.result(5)
+    worker.join(5)
+
+    model.error = None
+    assert batcher.embed_query("c") == [1.0, 99.0]
+    assert batcher._thread is not worker
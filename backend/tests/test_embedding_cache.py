@@ -0,0 +1,97 @@
+"""
+LRU cache in front of the embedding model (app/services/embedding_cache.py).
+
+Run from backend/: `python -m pytest tests`.
+"""
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from app.services.embedding_cache import CachedEmbeddings  # noqa: E402
+
+
+class CountingModel:
+    def __init__(self):
+        self.queries = []
+        self.batches = []
+
+    @staticmethod
+    def _vector(text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97)]
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return self._vector(text)
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        return [self._vector(t) for t in texts]
+
+
+def test_whitespace_and_case_variants_share_an_entry():
+    model = CountingModel()
+    cache = CachedEmbeddings(model)
+    first = cache.embed_query("How do I  focus?")
+    assert cache.embed_query("  how do i\nfocus? ") == first
+    assert model.queries == ["How do I  focus?"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_without_casefold_case_matters():
+    model = CountingModel()
+    cache = CachedEmbeddings(model, casefold=False)
+    cache.embed_query("Focus")
+    cache.embed_query("focus")
+    cache.embed_query(" Focus ")
+    assert model.queries == ["Focus", "focus"]
+
+
+def test_queries_and_documents_share_the_key_space():
+    model = CountingModel()
+    cache = CachedEmbeddings(model)
+    vector = cache.embed_query("stay calm")
+    assert cache.embed_documents(["Stay calm"]) == [vector]
+    assert model.batches == []
+
+
+def test_documents_embed_only_the_deduplicated_misses_in_one_batch():
+    model = CountingModel()
+    cache = CachedEmbeddings(model)
+    cache.embed_query("known")
+    vectors = cache.embed_documents(["a", "known", "b", "A", "a "])
+    assert model.batches == [["a", "b"]]
+    assert vectors == [model._vector("a"), model._vector("known"), model._vector("b"), model._vector("a"), model._vector("a")]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1 + 4, 3)
+
+
+def test_the_least_recently_used_entry_is_evicted():
+    model = CountingModel()
+    cache = CachedEmbeddings(model, max_entries=2)
+    cache.embed_query("one")
+    cache.embed_query("two")
+    cache.embed_query("one")
+    cache.embed_query("three")
+    assert cache.stats()["entries"] == 2
+    cache.embed_query("one")
+    cache.embed_query("two")
+    assert model.queries == ["one", "two", "three", "two"]
+
+
+def test_returned_vectors_do_not_alias_the_cache():
+    cache = CachedEmbeddings(CountingModel())
+    vector = cache.embed_query("focus")
+    vector[0] = -1.0
+    assert cache.embed_query("focus")[0] == len("focus")
+    cache.embed_documents(["focus"])[0].append(0.0)
+    assert len(cache.embed_query("focus")) == 2
+
+
+def test_clear_empties_the_cache_but_keeps_counters():
+    model = CountingModel()
+    cache = CachedEmbeddings(model)
+    cache.embed_query("focus")
+    cache.clear()
+    cache.embed_query("focus")
+    assert model.queries == ["focus", "focus"]
+    assert cache.stats()["misses"] == 2
@@ -0,0 +1,63 @@
+"""
+Parity of the ONNX Runtime embedding backend with the sentence-transformers (torch) one.
+
+Run from backend/: `python -m pytest tests`. Skipped when onnxruntime, torch or
+sentence-transformers is not installed, or when the model cannot be downloaded.
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test")
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+from app.core.config import settings  # noqa: E402
+from app.services.embedding_benchmark import (  # noqa: E402
+    DEFAULT_ONNX_FILES,
+    load_sample_texts,
+    parity,
+    tolerance_for,
+)
+from app.services.embedding_registry import load_embedding_backend  # noqa: E402
+
+SOURCES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "data", "sources")
+
+
+def _load(backend: str, onnx_file=None):
+    try:
+        return load_embedding_backend(settings.embedding_model_name, backend=backend, onnx_file=onnx_file)
+    except Exception as e:  # offline, or the export is missing from the model repo
+        pytest.skip(f"could not load {settings.embedding_model_name} ({backend}): {e}")
+
+
+@pytest.fixture(scope="module")
+def texts():
+    texts = load_sample_texts(SOURCES_DIR, 64)
+    if not texts:
+        pytest.skip("no sample texts in data/sources")
+    return texts
+
+
+@pytest.fixture(scope="module")
+def reference(texts):
+    return np.asarray(_load("huggingface").embed_documents(texts), dtype=np.float32)
+
+
+@pytest.mark.parametrize("onnx_file", DEFAULT_ONNX_FILES)
+def test_onnx_embeddings_match_torch(onnx_file, texts, reference):
+    model = _load("onnx", onnx_file)
+    vectors = np.asarray(model.embed_documents(texts), dtype=np.float32)
+    assert vectors.shape == reference.shape
+    check = parity(reference, vectors)
+    assert 1 - check["min_cosine"] <= tolerance_for(onnx_file), check
+
+
+def test_onnx_query_matches_documents(texts):
+    model = _load("onnx", DEFAULT_ONNX_FILES[0])
+    query = np.asarray(model.embed_query(texts[0]), dtype=np.float32)
+    document = np.asarray(model.embed_documents(texts[:1])[0], dtype=np.float32)
+    assert np.allclose(query, document, atol=1e-5)
@@ -0,0 +1,173 @@
+"""
+Hedged provider calls in ModelRouter (app/services/model_router.py): which side wins,
+and how the losing or cancelled calls are recorded in provider health.
+
+Run from backend/: `python -m pytest tests`.
+"""
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test")
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("langsmith")
+pytest.importorskip("chromadb")
+
+from app.core.config import settings  # noqa: E402
+from app.services import model_router as router_module  # noqa: E402
+from app.services.model_router import LOCAL_FALLBACK_PREFIX, ModelRouter, _HedgeExhausted  # noqa: E402
+from app.services.provider_health import ProviderHealthRegistry, RetryBudget  # noqa: E402
+
+HEDGE_DELAY = 0.05
+
+
+class FakeModel:
+    def __init__(self, provider, delay, error=None):
+        self.provider = provider
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate(self, prompt, timeout=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return f"{self.provider}: {prompt}"
+
+
+@pytest.fixture
+def health(monkeypatch):
+    registry = ProviderHealthRegistry()
+    registry.retry_budget = RetryBudget(ratio=0.0, min_retries=1, window_seconds=60)
+    monkeypatch.setattr(router_module, "provider_health", registry)
+    monkeypatch.setattr(settings, "hedge_delay_seconds", HEDGE_DELAY)
+    return registry
+
+
+@pytest.fixture
+def router():
+    # _hedged_call only needs the provider clients it is given
+    return ModelRouter.__new__(ModelRouter)
+
+
+def _hedge(router, primary, secondary):
+    return asyncio.run(router._hedged_call(primary, secondary, "hi"))
+
+
+def _provider(health, model):
+    return health.get(model.provider).snapshot()
+
+
+def test_a_fast_primary_never_fires_the_hedge(router, health):
+    primary, secondary = FakeModel("groq", 0.0), FakeModel("gemini", 0.0)
+    assert _hedge(router, primary, secondary) == "groq: hi"
+    assert secondary.calls == 0
+    assert health.hedge_stats()["fired"] == 0
+    assert health.retry_budget.snapshot()["retries"] == 0
+
+
+def test_the_hedge_wins_and_the_primary_is_cut_off(router, health):
+    primary, secondary = FakeModel("groq", 1.0), FakeModel("gemini", 0.0)
+    assert _hedge(router, primary, secondary) == "gemini: hi"
+    assert primary.cancelled == 1
+
+    stats = health.hedge_stats()
+    assert (stats["fired"], stats["won_by_hedge"], stats["won_by_primary"]) == (1, 1, 0)
+    assert stats["fired_for"] == {"groq": 1} and stats["winners"] == {"gemini": 1}
+    assert health.retry_budget.snapshot()["retries"] == 1
+    # the cut-off primary is a latency sample, not a failure
+    groq = _provider(health, primary)
+    assert (groq["failures"], groq["window_requests"], groq["window_cutoffs"]) == (0, 0, 1)
+    assert groq["latency_p50_s"] >= HEDGE_DELAY
+    assert _provider(health, secondary)["successes"] == 1
+
+
+def test_a_slow_primary_can_still_beat_the_hedge(router, health):
+    primary, secondary = FakeModel("groq", 2 * HEDGE_DELAY), FakeModel("gemini", 1.0)
+    assert _hedge(router, primary, secondary) == "groq: hi"
+    assert secondary.calls == 1 and secondary.cancelled == 1
+    stats = health.hedge_stats()
+    assert (stats["fired"], stats["won_by_primary"], stats["winners"]) == (1, 1, {"groq": 1})
+    gemini = _provider(health, secondary)
+    assert (gemini["failures"], gemini["window_cutoffs"]) == (0, 1)
+
+
+def test_the_hedge_is_skipped_when_the_secondary_circuit_is_open(router, health):
+    gemini = health.get("gemini")
+    for _ in range(gemini.consecutive_failures):
+        gemini.record(1.0, ok=False)
+    primary, secondary = FakeModel("groq", 2 * HEDGE_DELAY), FakeModel("gemini", 0.0)
+
+    assert _hedge(router, primary, secondary) == "groq: hi"
+    assert secondary.calls == 0
+    assert health.hedge_stats()["fired"] == 0
+    # no budget is spent on a hedge that could not be sent
+    assert health.retry_budget.snapshot()["retries"] == 0
+    assert gemini.snapshot()["short_circuited"] == 0
+
+
+def test_the_hedge_is_skipped_when_the_retry_budget_is_spent(router, health):
+    assert health.retry_budget.try_retry()
+    primary, secondary = FakeModel("groq", 2 * HEDGE_DELAY), FakeModel("gemini", 0.0)
+    assert _hedge(router, primary, secondary) == "groq: hi"
+    assert secondary.calls == 0
+    assert health.retry_budget.snapshot()["denied"] == 1
+
+
+def test_a_primary_failure_before_the_hedge_delay_is_raised_for_normal_fallback(router, health):
+    primary = FakeModel("groq", 0.0, error=ValueError("bad request"))
+    secondary = FakeModel("gemini", 0.0)
+    with pytest.raises(ValueError, match="bad request"):
+        _hedge(router, primary, secondary)
+    assert secondary.calls == 0
+    assert _provider(health, primary)["failures"] == 1
+
+
+def test_both_sides_failing_exhausts_the_hedge(router, health):
+    primary = FakeModel("groq", 2 * HEDGE_DELAY, error=RuntimeError("groq down"))
+    secondary = FakeModel("gemini", 0.0, error=RuntimeError("gemini down"))
+    with pytest.raises(_HedgeExhausted):
+        _hedge(router, primary, secondary)
+    assert _provider(health, primary)["failures"] == 1
+    assert _provider(health, secondary)["failures"] == 1
+    stats = health.hedge_stats()
+    assert (stats["fired"], stats["won_by_primary"], stats["won_by_hedge"]) == (1, 0, 0)
+
+
+def test_a_caller_timeout_cancels_both_sides_and_counts_as_failures(router, health):
+    primary, secondary = FakeModel("groq", 1.0), FakeModel("gemini", 1.0)
+
+    async def call_with_timeout():
+        await asyncio.wait_for(router._hedged_call(primary, secondary, "hi"), 3 * HEDGE_DELAY)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(call_with_timeout())
+    assert (primary.cancelled, secondary.cancelled) == (1, 1)
+    # nobody won, so neither call was a hedge loser
+    assert _provider(health, primary)["failures"] == 1
+    assert _provider(health, secondary)["failures"] == 1
+    assert _provider(health, primary)["window_cutoffs"] == 0
+
+
+def test_generate_does_not_fall_back_again_after_an_exhausted_hedge(router, health, monkeypatch):
+    primary = FakeModel("groq", 2 * HEDGE_DELAY, error=RuntimeError("groq down"))
+    secondary = FakeModel("gemini", 0.0, error=RuntimeError("gemini down"))
+    monkeypatch.setattr(router, "_candidates", lambda task_type: [primary, secondary], raising=False)
+
+    response, ok = asyncio.run(router._generate("hi", "general_chat", hedge=True))
+    assert not ok and response.startswith(LOCAL_FALLBACK_PREFIX)
+    assert (primary.calls, secondary.calls) == (1, 1)
+
+
+def test_generate_returns_the_hedge_winner(router, health, monkeypatch):
+    primary, secondary = FakeModel("groq", 1.0), FakeModel("gemini", 0.0)
+    monkeypatch.setattr(router, "_candidates", lambda task_type: [primary, secondary], raising=False)
+    assert asyncio.run(router._generate("hi", "general_chat", hedge=True)) == ("gemini: hi", True)
@@ -0,0 +1,171 @@
+"""
+BM25 index, reciprocal-rank fusion (app/services/lexical_index.py) and hybrid
+retrieval (app/services/retriever.py).
+
+Run from backend/: `python -m pytest tests`.
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test")
+
+from app.services.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize  # noqa: E402
+
+CORPUS = {
+    "sleep": "Sleep hygiene: keep a fixed sleep schedule and a dark bedroom.",
+    "focus": "Deep focus needs blocks of time without notifications.",
+    "habits": "Small habits compound; focus on one habit at a time.",
+    "stoic": "Stoic journaling: write what is in your control each evening.",
+}
+
+
+@pytest.fixture
+def index():
+    return BM25Index.build(list(CORPUS), list(CORPUS.values()))
+
+
+def _ids(hits):
+    return [doc_id for doc_id, _, _ in hits]
+
+
+def test_tokenize_lowercases_and_drops_stopwords_and_punctuation():
+    assert tokenize("How do I keep MY focus, at work?") == ["keep", "focus", "work"]
+
+
+def test_rare_and_repeated_terms_rank_higher(index):
+    assert _ids(index.search("sleep", top_k=5)) == ["sleep"]
+    # "focus" appears in two chunks; "notifications" only in one of them
+    assert _ids(index.search("focus notifications", top_k=5)) == ["focus", "habits"]
+    scores = [score for _, _, score in index.search("focus habit")]
+    assert scores == sorted(scores, reverse=True) and all(s > 0 for s in scores)
+
+
+def test_search_returns_ids_texts_and_respects_top_k(index):
+    hits = index.search("focus", top_k=1)
+    assert len(hits) == 1
+    doc_id, text, _ = hits[0]
+    assert CORPUS[doc_id] == text
+
+
+def test_longer_chunks_are_penalised_for_the_same_term_frequency():
+    index = BM25Index.build(["short", "long"], ["focus now", "focus " + "filler " * 20])
+    assert _ids(index.search("focus")) == ["short", "long"]
+
+
+def test_queries_without_known_terms_and_empty_indexes_find_nothing(index):
+    assert index.search("the and of") == []
+    assert index.search("quantum chromodynamics") == []
+    assert BM25Index.build([], []).search("focus") == []
+
+
+def test_a_saved_index_loads_with_identical_results(index, tmp_path):
+    path = str(tmp_path / "lexical" / "knowledge.bm25.json")
+    index.save(path)
+    loaded = BM25Index.load(path)
+    assert len(loaded) == len(index)
+    assert loaded.search("focus habit", top_k=5) == index.search("focus habit", top_k=5)
+
+
+def test_missing_or_corrupt_index_files_load_as_none(tmp_path):
+    assert BM25Index.load(str(tmp_path / "missing.json")) is None
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{not json")
+    assert BM25Index.load(str(corrupt)) is None
+
+
+def test_rrf_prefers_documents_ranked_by_both_lists():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["d", "c", "a"]], k=60)
+    # a: 1/61 + 1/63, c: 1/63 + 1/62, d: 1/61, b: 1/62
+    assert fused == ["a", "c", "d", "b"]
+
+
+def test_rrf_with_a_single_or_empty_ranking():
+    assert reciprocal_rank_fusion([["x", "y"]]) == ["x", "y"]
+    assert reciprocal_rank_fusion([["x", "y"], []]) == ["x", "y"]
+    assert reciprocal_rank_fusion([]) == []
+
+
+class FakeKnowledgeStore:
+    def __init__(self, dense_ids, fail_lexical=False):
+        self.dense_ids = dense_ids
+        self.fail_lexical = fail_lexical
+        self.queries = []
+        self._index = BM25Index.build(list(CORPUS), list(CORPUS.values()))
+
+    @property
+    def lexical(self):
+        if self.fail_lexical:
+            raise RuntimeError("index missing")
+        return self._index
+
+    def query(self, embedding, top_k):
+        self.queries.append(top_k)
+        ids = self.dense_ids[:top_k]
+        return {"ids": [ids], "documents": [[CORPUS[i] for i in ids]]}
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, text):
+        self.calls += 1
+        return [0.1, 0.2]
+
+
+@pytest.fixture
+def retriever_class():
+    pytest.importorskip("pydantic_settings")
+    pytest.importorskip("langsmith")
+    pytest.importorskip("chromadb")
+    from app.services.retriever import ContextRetriever
+
+    return ContextRetriever
+
+
+def _retriever(retriever_class, store, mode, monkeypatch, dense_available=True):
+    retriever = retriever_class(db=store, mode=mode)
+    retriever.embedder = FakeEmbedder()
+    monkeypatch.setattr(retriever_class, "_reserve_dense", classmethod(lambda cls: dense_available))
+    monkeypatch.setattr(retriever_class, "_release_dense", classmethod(lambda cls: None))
+    return retriever
+
+
+def test_hybrid_search_fuses_dense_and_lexical_rankings(retriever_class, monkeypatch):
+    store = FakeKnowledgeStore(dense_ids=["stoic", "habits", "sleep"])
+    retriever = _retriever(retriever_class, store, "hybrid", monkeypatch)
+    result = retriever.search("focus notifications", top_k=2)
+    # habits is ranked by both; stoic (dense #1) ties focus (lexical #1) and came first
+    assert result.documents == [CORPUS["habits"], CORPUS["stoic"]]
+    assert result.embedding == [0.1, 0.2]
+    assert store.queries == [10]
+
+
+def test_hybrid_search_answers_lexically_without_dense_capacity(retriever_class, monkeypatch):
+    store = FakeKnowledgeStore(dense_ids=["stoic"])
+    retriever = _retriever(retriever_class, store, "hybrid", monkeypatch, dense_available=False)
+    result = retriever.search("focus notifications", top_k=2)
+    assert result.documents == [CORPUS["focus"], CORPUS["habits"]]
+    assert result.embedding is None
+    assert retriever.embedder.calls == 0 and store.queries == []
+
+
+def test_a_failing_lexical_index_leaves_the_dense_ranking(retriever_class, monkeypatch):
+    store = FakeKnowledgeStore(dense_ids=["stoic", "sleep"], fail_lexical=True)
+    retriever = _retriever(retriever_class, store, "hybrid", monkeypatch)
+    assert retriever.search("focus", top_k=2).documents == [CORPUS["stoic"], CORPUS["sleep"]]
+
+
+def test_dense_and_lexical_modes_use_one_ranking(retriever_class, monkeypatch):
+    store = FakeKnowledgeStore(dense_ids=["stoic", "sleep", "focus"])
+    dense = _retriever(retriever_class, store, "dense", monkeypatch)
+    assert dense.search("focus", top_k=2).documents == [CORPUS["stoic"], CORPUS["sleep"]]
+    assert store.queries == [2]
+
+    lexical = _retriever(retriever_class, store, "lexical", monkeypatch)
+    assert lexical.search("focus", top_k=5).documents == [CORPUS["focus"], CORPUS["habits"]]
+    assert lexical.embedder.calls == 0
+    # a caller-supplied embedding skips the embedder
+    assert dense.search("focus", top_k=1, embedding=[1.0]).embedding == [1.0]
+    assert dense.embedder.calls == 1
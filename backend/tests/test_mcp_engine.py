@@ -0,0 +1,228 @@
+"""
+MCPEngine orchestration with fake retrieval, router and session store.
+
+Run from backend/: `python -m pytest tests`. Skipped when the engine's dependencies
+(chromadb, numpy, ...) are not installed.
+"""
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test")
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("langsmith")
+pytest.importorskip("chromadb")
+
+from app.mcp.mcp_engine import MCPEngine  # noqa: E402
+from app.mcp.prompt_assembler import PromptAssembler  # noqa: E402
+from app.services.retriever import RetrievalResult  # noqa: E402
+from app.services.tokenizer import TokenCounter  # noqa: E402
+
+ROLES = ["reflector", "strategist", "coach", "purpose"]
+
+
+class FakeRetriever:
+    def search(self, query, *args, **kwargs):
+        return RetrievalResult(query=query, documents=["some context"])
+
+
+class FakeClassifier:
+    def classify(self, text, embedding=None):
+        return "general_chat"
+
+
+class FakeStore:
+    def __init__(self):
+        self.messages = []
+
+    def tail(self, session_id, k):
+        return []
+
+    def load_summary(self, session_id):
+        return None
+
+    def save_message(self, session_id, role, content):
+        self.messages.append((session_id, role, content))
+
+
+class FakeRouter:
+    """
+    Answers per role (from the `mcp:<role>` cache namespace): `tokens[role]` are streamed,
+    and a role listed in `gates` waits on its event after its first token.
+    """
+
+    def __init__(self, tokens, gates=None):
+        self.tokens = tokens
+        self.gates = gates or {}
+        self.calls = []
+
+    async def stream(self, prompt, cache_namespace="", **kwargs):
+        role = cache_namespace.split(":", 1)[1]
+        self.calls.append(role)
+        for index, token in enumerate(self.tokens[role]):
+            if index == 1 and role in self.gates:
+                await self.gates[role].wait()
+            yield token
+
+    async def run(self, prompt, cache_namespace="", **kwargs):
+        role = cache_namespace.split(":", 1)[1]
+        self.calls.append(role)
+        if role in self.gates:
+            await self.gates[role].wait()
+        return "".join(self.tokens[role])
+
+
+def _engine(router, store=None) -> MCPEngine:
+    engine = MCPEngine(retriever=FakeRetriever(), model_router=router, memory_store=store or FakeStore())
+    engine.classifier = FakeClassifier()
+    # the length estimate: no tokenizer download from inside a test
+    engine.prompt_assembler = PromptAssembler(counter=TokenCounter("unused", load_timeout_s=0))
+    return engine
+
+
+async def _collect(stream):
+    return [event async for event in stream]
+
+
+def test_stream_quorum_detaches_roles_it_stops_waiting_for():
+    async def scenario():
+        gates = {"coach": asyncio.Event(), "purpose": asyncio.Event()}
+        router = FakeRouter(
+            {
+                "reflector": ["I hear ", "you."],
+                "strategist": ["Step ", "one."],
+                "coach": ["Start ", "small."],
+                "purpose": ["It ", "matters."],
+            },
+            gates,
+        )
+        store = FakeStore()
+        engine = _engine(router, store)
+        events = await _collect(
+            engine.run_stream("help", "s1", mode="quorum", roles=ROLES, quorum="reflector+1")
+        )
+        for gate in gates.values():
+            gate.set()
+        await engine.aclose(timeout=1.0)
+        return events, store
+
+    events, store = asyncio.run(scenario())
+
+    final = events[-1]
+    assert final["event"] == "final"
+    assert final["pending_roles"] == ["coach", "purpose"]
+    assert set(final["snapshot"]) == {"reflector", "strategist"}
+
+    for role in ("coach", "purpose"):
+        role_events = [e for e in events if e.get("role") == role]
+        # whatever the role streamed before the quorum was met is followed by a detach, and nothing after it
+        assert role_events[-1] == {"event": "agent_detached", "role": role}
+        assert all(e["event"] == "token" for e in role_events[:-1])
+        assert not any(e["event"] == "agent" for e in role_events)
+    assert any(e == {"event": "token", "role": "coach", "delta": "Start "} for e in events)
+
+    # the detached roles still finished and were saved for the next turn
+    assert sorted(role for _, role, _ in store.messages) == ["coach_agent", "purpose_agent"]
+    assert ("s1", "coach_agent", "Start small.") in store.messages
+
+
+def test_stream_quorum_without_detached_roles_has_no_detach_events():
+    async def scenario():
+        router = FakeRouter({role: [role, "!"] for role in ROLES})
+        return await _collect(_engine(router).run_stream("help", "s1", mode="quorum", roles=ROLES, quorum="4"))
+
+    events = asyncio.run(scenario())
+    assert not any(e["event"] == "agent_detached" for e in events)
+    assert events[-1]["pending_roles"] == []
+    assert {e["role"] for e in events if e["event"] == "agent"} == set(ROLES)
+
+
+def test_aclose_waits_for_background_agents_to_save():
+    async def scenario():
+        gates = {"coach": asyncio.Event(), "purpose": asyncio.Event()}
+        store = FakeStore()
+        engine = _engine(FakeRouter({role: [role] for role in ROLES}, gates), store)
+        result = await engine.run("help", "s1", mode="quorum", roles=ROLES, quorum="reflector+1")
+        assert result["pending_roles"] == ["coach", "purpose"]
+        assert len(engine._background) == 2
+
+        async def release():
+            await asyncio.sleep(0.05)
+            for gate in gates.values():
+                gate.set()
+
+        asyncio.create_task(release())
+        await engine.aclose(timeout=2.0)
+        return engine, store
+
+    engine, store = asyncio.run(scenario())
+    assert not engine._background
+    assert sorted(role for _, role, _ in store.messages) == ["coach_agent", "purpose_agent"]
+
+
+def test_aclose_cancels_background_agents_after_the_timeout():
+    async def scenario():
+        gates = {"coach": asyncio.Event(), "purpose": asyncio.Event()}
+        store = FakeStore()
+        engine = _engine(FakeRouter({role: [role] for role in ROLES}, gates), store)
+        await engine.run("help", "s1", mode="quorum", roles=ROLES, quorum="reflector+1")
+        tasks = list(engine._background)
+        await engine.aclose(timeout=0.05)
+        return engine, store, tasks
+
+    engine, store, tasks = asyncio.run(scenario())
+    assert not engine._background
+    assert all(task.cancelled() for task in tasks)
+    assert store.messages == []
+
+
+def test_background_agent_errors_are_logged(caplog):
+    class FailingStore(FakeStore):
+        def save_message(self, session_id, role, content):
+            raise RuntimeError("disk full")
+
+    async def scenario():
+        gates = {"coach": asyncio.Event(), "purpose": asyncio.Event()}
+        engine = _engine(FakeRouter({role: [role] for role in ROLES}, gates), FailingStore())
+        await engine.run("help", "s1", mode="quorum", roles=ROLES, quorum="reflector+1")
+        for gate in gates.values():
+            gate.set()
+        await engine.aclose(timeout=1.0)
+
+    with caplog.at_level("WARNING", logger="app.mcp.mcp_engine"):
+        asyncio.run(scenario())
+    assert "disk full" in caplog.text
+
+
+def _concurrent_runs(engine, gates, *requests):
+    async def scenario():
+        runs = [asyncio.create_task(engine.run("help", "s1", mode="parallel", **kwargs)) for kwargs in requests]
+        await asyncio.sleep(0.01)
+        for gate in gates.values():
+            gate.set()
+        return await asyncio.gather(*runs)
+
+    return asyncio.run(scenario())
+
+
+def test_identical_concurrent_runs_are_coalesced():
+    gates = {"reflector": asyncio.Event()}
+    router = FakeRouter({role: [role] for role in ROLES}, gates)
+    engine = _engine(router)
+    first, second = _concurrent_runs(engine, gates, {}, {})
+    assert first == second
+    assert sorted(router.calls) == sorted(ROLES)
+    assert engine.single_flight.stats()["coalesced"] == 1
+    assert engine.single_flight.stats()["inflight"] == 0
+
+
+@pytest.mark.parametrize("joiner", [{"use_cache": False}, {"timeout": 5}, {"quorum": "2"}])
+def test_runs_differing_in_cache_timeout_or_quorum_are_not_coalesced(joiner):
+    gates = {"reflector": asyncio.Event()}
+    router = FakeRouter({role: [role] for role in ROLES}, gates)
+    engine = _engine(router)
+    _concurrent_runs(engine, gates, {}, joiner)
+    assert sorted(router.calls) == sorted(ROLES * 2)
+    assert engine.single_flight.stats()["coalesced"] == 0
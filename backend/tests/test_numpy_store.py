@@ -0,0 +1,156 @@
+"""
+Memory-mapped NumPy view of the knowledge collection (app/services/numpy_store.py):
+rankings against Chroma and re-export of stale exports.
+
+Run from backend/: `python -m pytest tests`.
+"""
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test")
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("chromadb")
+
+from chromadb.api.client import SharedSystemClient  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.numpy_store import NumpyVectorStore  # noqa: E402
+from app.services.vector_store import ChromaDBClient  # noqa: E402
+
+DIM = 8
+
+
+@pytest.fixture
+def manifest_path(tmp_path, monkeypatch):
+    # ChromaDBClient persists to ./data/chroma, and Chroma caches clients by that path
+    monkeypatch.chdir(tmp_path)
+    SharedSystemClient.clear_system_cache()
+    path = str(tmp_path / "ingest_manifest.json")
+    monkeypatch.setattr(settings, "ingest_manifest_path", path)
+    yield path
+    SharedSystemClient.clear_system_cache()
+
+
+def _add(chroma: ChromaDBClient, rng, start: int, count: int):
+    ids = [f"chunk-{i}" for i in range(start, start + count)]
+    chroma.add_documents(
+        ids=ids,
+        texts=[f"text of {doc_id}" for doc_id in ids],
+        embeddings=rng.normal(size=(count, DIM)).astype(np.float32).tolist(),
+        metadatas=[{"source": f"file-{i % 3}.md"} for i in range(start, start + count)],
+    )
+
+
+def _write_manifest(path, files):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"collection": "test_knowledge", "files": files}, f)
+
+
+@pytest.fixture
+def chroma(manifest_path):
+    client = ChromaDBClient("test_knowledge")
+    _add(client, np.random.default_rng(0), 0, 40)
+    return client
+
+
+def test_rankings_match_chroma(chroma):
+    store = NumpyVectorStore(chroma)
+    assert store.matrix.shape == (40, DIM)
+    rng = np.random.default_rng(1)
+    for _ in range(5):
+        q = rng.normal(size=DIM).astype(np.float32).tolist()
+        expected = chroma.query(q, 5)
+        got = store.query(q, 5)
+        assert got["ids"][0] == expected["ids"][0]
+        assert got["documents"][0] == expected["documents"][0]
+        assert got["metadatas"][0] == expected["metadatas"][0]
+        np.testing.assert_allclose(got["distances"][0], expected["distances"][0], rtol=1e-4, atol=1e-4)
+
+
+def test_top_k_larger_than_the_collection_returns_every_chunk(chroma):
+    store = NumpyVectorStore(chroma)
+    got = store.query([0.0] * DIM, 100)
+    assert sorted(got["ids"][0]) == sorted(f"chunk-{i}" for i in range(40))
+    assert got["distances"][0] == sorted(got["distances"][0])
+
+
+def test_a_fresh_export_is_mapped_instead_of_rebuilt(chroma, monkeypatch):
+    NumpyVectorStore(chroma)
+
+    def fail():
+        raise AssertionError("re-exported a fresh export")
+
+    monkeypatch.setattr(NumpyVectorStore, "export", lambda self: fail())
+    store = NumpyVectorStore(chroma)
+    assert isinstance(store.matrix, np.memmap)
+    assert len(store.ids) == 40
+
+
+def test_the_export_is_redone_when_the_collection_grew(chroma):
+    NumpyVectorStore(chroma)
+    # e.g. a CLI ingest that wrote straight to Chroma
+    _add(chroma, np.random.default_rng(2), 40, 5)
+    store = NumpyVectorStore(chroma)
+    assert store.matrix.shape == (45, DIM)
+    assert "chunk-44" in store.ids
+
+
+def _recorded_source(store):
+    with open(store.chunks_path, encoding="utf-8") as f:
+        return json.load(f)["source"]
+
+
+def test_the_export_is_redone_when_the_manifest_files_changed(chroma, manifest_path):
+    _write_manifest(manifest_path, {"a.md": "hash-1"})
+    first = _recorded_source(NumpyVectorStore(chroma))
+    assert first["manifest"] is not None and first["count"] == 40
+
+    # same row count, different files (e.g. a file was re-ingested in place)
+    _write_manifest(manifest_path, {"a.md": "hash-2"})
+    second = _recorded_source(NumpyVectorStore(chroma))
+    assert second["manifest"] != first["manifest"]
+
+
+def test_an_inconsistent_export_is_redone(chroma):
+    store = NumpyVectorStore(chroma)
+    with open(store.chunks_path, encoding="utf-8") as f:
+        chunks = json.load(f)
+    chunks["ids"] = chunks["ids"][:-1]
+    with open(store.chunks_path, "w", encoding="utf-8") as f:
+        json.dump(chunks, f)
+    assert len(NumpyVectorStore(chroma).ids) == 40
+
+
+def test_writes_go_to_chroma_and_rebuild_indexes_re_exports(chroma):
+    store = NumpyVectorStore(chroma)
+    store.delete_source("file-0.md")
+    assert len(store.ids) == 40
+    store.rebuild_indexes()
+    assert len(store.ids) == chroma.collection.count() == 26
+    assert all(m["source"] != "file-0.md" for m in store.metadatas)
+    assert all(doc_id in store.lexical.ids for doc_id in store.ids)
+
+
+def test_an_empty_collection_queries_as_empty(manifest_path):
+    store = NumpyVectorStore(ChromaDBClient("test_knowledge"))
+    assert store.ids == []
+    assert store.query([0.0] * DIM, 3) == {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+
+def test_get_all_reads_the_collection_in_pages(chroma, monkeypatch):
+    pages = []
+    get = chroma.collection.get
+
+    def counting_get(**kwargs):
+        pages.append(kwargs["limit"])
+        return get(**kwargs)
+
+    monkeypatch.setattr(chroma.collection, "get", counting_get)
+    data = chroma.get_all(include=["documents"], page_size=16)
+    assert len(data["ids"]) == len(set(data["ids"])) == 40
+    assert len(data["documents"]) == 40
+    assert pages == [16, 16, 16]
@@ -0,0 +1,125 @@
+"""
+Token-budgeted MCP prompt assembly (app/mcp/prompt_assembler.py) and the token counter.
+
+Run from backend/: `python -m pytest tests`.
+"""
+import os
+import threading
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test")
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("langsmith")
+
+from app.mcp.prompt_assembler import PromptAssembler, TRIM_MARKER, allocate  # noqa: E402
+from app.services.tokenizer import TokenCounter  # noqa: E402
+
+
+def _estimate_counter() -> TokenCounter:
+    return TokenCounter("unused", load_timeout_s=0)
+
+
+def test_allocate_gives_small_sections_their_demand_and_passes_on_the_rest():
+    weights = {"snapshot": 3, "context": 2, "memory": 1}
+    alloc = allocate({"snapshot": 10, "context": 1000, "memory": 1000}, weights, 610)
+    assert alloc["snapshot"] == 10
+    # the 600 left over are split 2:1
+    assert alloc == {"snapshot": 10, "context": 400, "memory": 200}
+
+
+def test_allocate_passes_surplus_on_in_rounds():
+    weights = {"snapshot": 3, "context": 2, "memory": 1}
+    # memory fits its 1/6 share; then context fits its share of what is left
+    alloc = allocate({"snapshot": 1000, "context": 150, "memory": 50}, weights, 600)
+    assert alloc == {"snapshot": 400, "context": 150, "memory": 50}
+
+
+def test_allocate_returns_the_demands_when_everything_fits():
+    demands = {"snapshot": 5, "context": 7, "memory": 0}
+    assert allocate(demands, {"snapshot": 3, "context": 2, "memory": 1}, 1000) == demands
+
+
+@pytest.mark.parametrize("budget", [0, -5, 1, 99, 1000])
+def test_allocate_never_exceeds_budget_or_demand(budget):
+    demands = {"a": 40, "b": 70, "c": 0, "d": 300}
+    alloc = allocate(demands, {"a": 1, "b": 2, "d": 3}, budget)
+    assert sum(alloc.values()) <= max(0, budget)
+    assert all(alloc[name] <= demands[name] for name in demands)
+    assert alloc["c"] == 0
+
+
+def test_build_keeps_the_head_of_context_and_the_tail_of_memory():
+    assembler = PromptAssembler(counter=_estimate_counter(), base_budget=300)
+    context = " ".join(f"doc{i:03d}" for i in range(400))
+    memory = "\n".join(f"user: turn{i:03d}" for i in range(200))
+    prompt = assembler.build("reflector", "profile", "what now?", context=context, memory=memory)
+
+    assert "doc000" in prompt and "doc399" not in prompt
+    assert context.split(" ", 1)[0] + " " in prompt
+    assert "turn199" in prompt and "turn000" not in prompt
+    assert prompt.count(TRIM_MARKER.strip()) == 2
+    assert "what now?" in prompt
+    assert assembler.counter.count(prompt) <= assembler.budget_for("reflector")
+
+
+def test_build_is_deterministic_and_leaves_short_sections_whole():
+    assembler = PromptAssembler(counter=_estimate_counter(), base_budget=300)
+    snapshot = {"reflector": "short reflection"}
+    first = assembler.build("strategist", "profile", "q", context="ctx", memory="mem", snapshot=snapshot)
+    second = assembler.build("strategist", "profile", "q", context="ctx", memory="mem", snapshot=snapshot)
+    assert first == second
+    assert TRIM_MARKER.strip() not in first
+    assert "[reflector] short reflection" in first
+
+
+class _WordTokenizer:
+    """Stands in for a `tokenizers.Tokenizer`: one token per whitespace-separated word."""
+
+    class _Encoding:
+        def __init__(self, text):
+            self.offsets = []
+            start = None
+            for i, ch in enumerate(text + " "):
+                if ch.isspace() and start is not None:
+                    self.offsets.append((start, i))
+                    start = None
+                elif not ch.isspace() and start is None:
+                    start = i
+
+    def encode(self, text, add_special_tokens=False):
+        return self._Encoding(text)
+
+
+def _counter_with_loader(monkeypatch, release: threading.Event, load_timeout_s: float) -> TokenCounter:
+    counter = TokenCounter("unused", load_timeout_s=load_timeout_s)
+
+    def load():
+        release.wait(5)
+        counter._tokenizer = _WordTokenizer()
+        counter._loaded = True
+
+    monkeypatch.setattr(counter, "_load", load)
+    return counter
+
+
+def test_first_count_waits_for_the_tokenizer_load(monkeypatch):
+    release = threading.Event()
+    release.set()
+    counter = _counter_with_loader(monkeypatch, release, load_timeout_s=5)
+    assert counter.count("a bb ccc dddd eeeee") == 5
+    assert counter.backend == "tokenizers"
+
+
+def test_the_estimate_stays_pinned_when_the_tokenizer_loads_late(monkeypatch):
+    release = threading.Event()
+    counter = _counter_with_loader(monkeypatch, release, load_timeout_s=0.05)
+    text = "a bb ccc dddd eeeee"
+    estimate = counter.count(text)
+    assert estimate == (len(text) + 3) // 4
+    release.set()
+    counter._loader.join(5)
+    assert counter._loaded
+    assert counter.count(text) == estimate
+    assert counter.backend == "estimate"
@@ -0,0 +1,192 @@
+"""
+Circuit breaker and retry budget behind ModelRouter's provider routing.
+
+Run from backend/: `python -m pytest tests`. The clock is replaced so state changes
+that wait on `open_seconds` or the rolling windows run instantly.
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test")
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("langsmith")
+
+from app.services import provider_health as health_module  # noqa: E402
+from app.services.provider_health import (  # noqa: E402
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    ProviderHealth,
+    RetryBudget,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(health_module, "time", fake)
+    return fake
+
+
+def _health(**kwargs) -> ProviderHealth:
+    options = dict(
+        window_seconds=60.0, failure_threshold=0.5, min_requests=4, consecutive_failures=3, open_seconds=30.0
+    )
+    options.update(kwargs)
+    return ProviderHealth("test", **options)
+
+
+def _open(health: ProviderHealth):
+    for _ in range(health.consecutive_failures):
+        health.record(1.0, ok=False)
+    assert health.state == OPEN
+
+
+def test_consecutive_failures_open_the_breaker(clock):
+    health = _health()
+    health.record(1.0, ok=False)
+    health.record(1.0, ok=False)
+    assert health.state == CLOSED
+    health.record(1.0, ok=False)
+    assert health.state == OPEN
+    assert not health.allow_request()
+    assert health.snapshot()["short_circuited"] == 1
+
+
+def test_error_rate_opens_the_breaker_once_min_requests_seen(clock):
+    health = _health(consecutive_failures=100)
+    for ok in (True, False, True):
+        health.record(1.0, ok=ok)
+    assert health.state == CLOSED
+    health.record(1.0, ok=False)
+    assert health.state == OPEN
+
+
+def test_failures_outside_the_window_do_not_count(clock):
+    health = _health(consecutive_failures=100)
+    health.record(1.0, ok=False)
+    health.record(1.0, ok=False)
+    clock.advance(61)
+    for ok in (True, True, True, False):
+        health.record(1.0, ok=ok)
+    assert health.state == CLOSED
+
+
+def test_open_breaker_lets_one_probe_through_after_open_seconds(clock):
+    health = _health()
+    _open(health)
+    clock.advance(29)
+    assert not health.allow_request()
+    clock.advance(1)
+    assert health.state == HALF_OPEN
+    assert health.allow_request()
+    assert not health.allow_request()
+
+
+def test_successful_probe_closes_the_breaker(clock):
+    health = _health()
+    _open(health)
+    clock.advance(30)
+    assert health.allow_request()
+    health.record(1.0, ok=True)
+    assert health.state == CLOSED
+    assert health.allow_request()
+    # the old failures were dropped with the recovery, so one more failure does not re-open it
+    health.record(1.0, ok=False)
+    assert health.state == CLOSED
+
+
+def test_failed_probe_reopens_the_breaker(clock):
+    health = _health()
+    _open(health)
+    clock.advance(30)
+    assert health.allow_request()
+    health.record(1.0, ok=False)
+    assert health.state == OPEN
+    assert not health.allow_request()
+    clock.advance(30)
+    assert health.allow_request()
+
+
+def test_stale_probe_does_not_wedge_the_breaker(clock):
+    health = _health()
+    _open(health)
+    clock.advance(30)
+    assert health.allow_request()
+    # the probe never reports back (e.g. it was cancelled)
+    clock.advance(29)
+    assert not health.allow_request()
+    clock.advance(1)
+    assert health.allow_request()
+
+
+def test_released_probe_slot_is_free_immediately(clock):
+    health = _health()
+    _open(health)
+    clock.advance(30)
+    assert health.allow_request()
+    health.release_probe()
+    assert health.allow_request()
+
+
+def test_release_probe_leaves_closed_and_open_breakers_alone(clock):
+    health = _health()
+    health.release_probe()
+    assert health.state == CLOSED
+    _open(health)
+    health.release_probe()
+    assert not health.allow_request()
+
+
+def test_latency_percentile_uses_successes_and_cutoffs(clock):
+    health = _health(consecutive_failures=100, min_requests=100)
+    for latency in (1.0, 2.0, 3.0):
+        health.record(latency, ok=True)
+    health.record(50.0, ok=False)
+    assert health.latency_percentile(90, min_samples=4) is None
+    health.record_cutoff(10.0)
+    assert health.latency_percentile(90, min_samples=4) == 10.0
+    assert health.latency_percentile(50) == 2.0
+    clock.advance(61)
+    assert health.latency_percentile(50) is None
+
+
+def test_retry_budget_allows_min_retries_without_traffic(clock):
+    budget = RetryBudget(ratio=0.5, min_retries=1, window_seconds=10.0)
+    assert budget.try_retry()
+    assert not budget.try_retry()
+    assert budget.snapshot()["denied"] == 1
+
+
+def test_retry_budget_scales_with_recent_requests(clock):
+    budget = RetryBudget(ratio=0.5, min_retries=1, window_seconds=10.0)
+    for _ in range(4):
+        budget.record_request()
+    assert [budget.try_retry() for _ in range(4)] == [True, True, True, False]
+
+
+def test_retry_budget_refills_after_the_window(clock):
+    budget = RetryBudget(ratio=0.5, min_retries=1, window_seconds=10.0)
+    for _ in range(4):
+        budget.record_request()
+    while budget.try_retry():
+        pass
+    clock.advance(11)
+    assert budget.try_retry()
+    assert not budget.try_retry()
+    snapshot = budget.snapshot()
+    assert snapshot["window_requests"] == 0
+    assert snapshot["retries"] == 4
@@ -0,0 +1,75 @@
+"""
+Quorum specs for mode="quorum" MCP runs (app/mcp/quorum.py).
+
+Run from backend/: `python -m pytest tests`.
+"""
+import pytest
+
+from app.mcp.quorum import Quorum
+
+ROLES = ["reflector", "strategist", "coach", "purpose"]
+
+
+@pytest.mark.parametrize(
+    "spec, required, extra",
+    [
+        ("reflector+1", {"reflector"}, 1),
+        ("reflector,strategist", {"reflector", "strategist"}, 0),
+        ("reflector, strategist+1", {"reflector", "strategist"}, 1),
+        ("2", set(), 2),
+        ("2/4", set(), 2),
+        ("", set(), 1),
+        ("0", set(), 1),
+    ],
+)
+def test_parse(spec, required, extra):
+    quorum = Quorum.parse(spec, ROLES)
+    assert quorum.required == required
+    assert quorum.extra == extra
+
+
+def test_parse_caps_the_count_at_the_roles_in_the_run():
+    assert Quorum.parse("reflector+5", ["reflector", "coach"]).extra == 1
+    assert Quorum.parse("9/9", ROLES).extra == 4
+
+
+def test_parse_drops_known_roles_that_are_not_in_the_run():
+    quorum = Quorum.parse("purpose+1", ["reflector", "coach"], known_roles=ROLES)
+    assert quorum.required == set()
+    assert quorum.extra == 1
+
+
+@pytest.mark.parametrize("spec", ["reflectr+1", "reflector+x", "reflector+-1", "-1", "two"])
+def test_parse_rejects_malformed_specs(spec):
+    with pytest.raises(ValueError):
+        Quorum.parse(spec, ROLES, known_roles=ROLES)
+
+
+def test_met_needs_every_required_role_and_the_extra_count():
+    quorum = Quorum.parse("reflector+1", ROLES)
+    assert not quorum.met([])
+    assert not quorum.met(["reflector"])
+    assert not quorum.met(["strategist", "coach"])
+    assert quorum.met(["reflector", "coach"])
+
+
+def test_met_any_n():
+    quorum = Quorum.parse("2/4", ROLES)
+    assert not quorum.met(["coach"])
+    assert quorum.met(["coach", "purpose"])
+
+
+def test_reachable_counts_the_roles_still_running():
+    quorum = Quorum.parse("reflector+1", ROLES)
+    assert quorum.reachable([], ROLES)
+    assert quorum.reachable(["strategist"], ["reflector"])
+    # reflector finished without answering
+    assert not quorum.reachable(["strategist", "coach"], ["purpose"])
+    # reflector answered, but nothing else can
+    assert not quorum.reachable(["reflector"], [])
+
+
+def test_str_round_trips():
+    for spec in ("reflector+1", "coach,reflector", "2"):
+        assert str(Quorum.parse(spec, ROLES)) == spec
+        assert Quorum.parse(str(Quorum.parse(spec, ROLES)), ROLES) == Quorum.parse(spec, ROLES)
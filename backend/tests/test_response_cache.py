@@ -0,0 +1,158 @@
+"""
+Semantic response cache (app/services/response_cache.py) and the router's cache buckets.
+
+Run from backend/: `python -m pytest tests`.
+"""
+import os
+import sqlite3
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test")
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pydantic_settings")
+
+from app.services import response_cache as cache_module  # noqa: E402
+from app.services.response_cache import SemanticResponseCache  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "responses.sqlite3")
+
+
+def _cache(path, **kwargs) -> SemanticResponseCache:
+    return SemanticResponseCache(path, **{"threshold": 0.95, "ttl_seconds": 100, "max_entries": 10, **kwargs})
+
+
+def _vec(*values):
+    return np.asarray(values, dtype=np.float32)
+
+
+def test_hit_needs_the_similarity_threshold(path, clock):
+    cache = _cache(path)
+    cache.store("b", "how do I focus?", _vec(1, 0, 0), "answer")
+    # scale does not matter, only direction
+    assert cache.lookup("b", _vec(10, 0.5, 0)) == "answer"
+    assert cache.lookup("b", _vec(1, 1, 0)) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_buckets_never_share_entries(path, clock):
+    cache = _cache(path)
+    cache.store("chat:general_chat:aaaa", "hi", _vec(1, 0), "answer for session a")
+    assert cache.lookup("chat:general_chat:bbbb", _vec(1, 0)) is None
+    assert cache.lookup("mcp:coach:general_chat:aaaa", _vec(1, 0)) is None
+    assert cache.lookup("chat:general_chat:aaaa", _vec(1, 0)) == "answer for session a"
+
+
+def test_entries_expire_after_the_ttl(path, clock):
+    cache = _cache(path)
+    cache.store("b", "q", _vec(1, 0), "answer")
+    clock.now += 99
+    assert cache.lookup("b", _vec(1, 0)) == "answer"
+    clock.now += 2
+    assert cache.lookup("b", _vec(1, 0)) is None
+    assert cache.stats()["expired"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(path, clock):
+    cache = _cache(path, max_entries=2)
+    cache.store("b", "first", _vec(1, 0, 0), "first")
+    clock.now += 1
+    cache.store("b", "second", _vec(0, 1, 0), "second")
+    clock.now += 1
+    assert cache.lookup("b", _vec(1, 0, 0)) == "first"
+    clock.now += 1
+    cache.store("b", "third", _vec(0, 0, 1), "third")
+    assert cache.stats()["evictions"] == 1
+    assert cache.lookup("b", _vec(0, 1, 0)) is None
+    assert cache.lookup("b", _vec(1, 0, 0)) == "first"
+    assert cache.lookup("b", _vec(0, 0, 1)) == "third"
+
+
+def test_entries_survive_a_restart(path, clock):
+    _cache(path).store("b", "q", _vec(1, 0), "answer")
+    assert _cache(path).lookup("b", _vec(1, 0)) == "answer"
+
+
+def test_a_miss_picks_up_entries_from_another_worker(path, clock):
+    mine, other = _cache(path), _cache(path)
+    mine.store("b", "mine", _vec(1, 0), "my answer")
+    other.store("b", "theirs", _vec(0, 1), "their answer")
+    assert mine.lookup("b", _vec(0, 1)) == "their answer"
+    assert mine.stats()["synced"] == 1
+    assert mine.stats()["entries"] == 2
+    # already synced: a plain miss does not re-read anything
+    assert mine.lookup("b", _vec(-1, 0)) is None
+    assert mine.stats()["synced"] == 1
+
+
+def test_rows_evicted_by_another_worker_are_forgotten(path, clock):
+    mine = _cache(path, max_entries=1)
+    mine.store("b", "old", _vec(1, 0), "old answer")
+    clock.now += 1
+    other = _cache(path, max_entries=1)
+    other.store("b", "new", _vec(0, 1), "new answer")
+    assert other.stats()["evictions"] == 1
+    assert mine.lookup("b", _vec(1, 0)) is None
+    assert mine.lookup("b", _vec(0, 1)) == "new answer"
+    assert mine.stats()["entries"] == 1
+
+
+def test_caches_with_a_task_type_column_are_migrated(path, clock):
+    os.makedirs(os.path.dirname(path))
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE response_cache (id INTEGER PRIMARY KEY AUTOINCREMENT, task_type TEXT NOT NULL, "
+        "prompt TEXT NOT NULL, embedding BLOB NOT NULL, response TEXT NOT NULL, created_at REAL NOT NULL, "
+        "last_access REAL NOT NULL)"
+    )
+    conn.execute("CREATE INDEX idx_cache_task ON response_cache(task_type)")
+    conn.execute(
+        "INSERT INTO response_cache (task_type, prompt, embedding, response, created_at, last_access) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        ("b", "q", _vec(1, 0).tobytes(), "answer", clock.now, clock.now),
+    )
+    conn.commit()
+    conn.close()
+
+    cache = _cache(path)
+    assert cache.lookup("b", _vec(1, 0)) == "answer"
+    columns = [row[1] for row in sqlite3.connect(path).execute("PRAGMA table_info(response_cache)")]
+    assert "bucket" in columns and "task_type" not in columns
+
+
+def test_router_buckets_separate_namespaces_and_surrounding_prompts():
+    pytest.importorskip("chromadb")
+    from app.services.model_router import ModelRouter
+
+    prompt_a = "Memory: session A history\nUser: how do I focus?"
+    prompt_b = "Memory: session B history\nUser: how do I focus?"
+    key = "how do I focus?"
+    bucket = ModelRouter._cache_bucket("chat", "general_chat", prompt_a, key)
+    assert bucket.startswith("chat:general_chat:")
+    assert ModelRouter._cache_bucket("chat", "general_chat", prompt_b, key) != bucket
+    assert ModelRouter._cache_bucket("mcp:coach", "general_chat", prompt_a, key) != bucket
+    assert ModelRouter._cache_bucket("chat", "rag_query", prompt_a, key) != bucket
+    # only the key itself is matched semantically: a rephrased key keeps the bucket
+    rephrased = prompt_a.replace(key, "how can I focus better?")
+    assert ModelRouter._cache_bucket("chat", "general_chat", rephrased, "how can I focus better?") == bucket
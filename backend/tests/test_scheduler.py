@@ -0,0 +1,81 @@
+"""
+Dependency-graph scheduling of agents (app/agents/scheduler.py).
+
+Run from backend/: `python -m pytest tests`.
+"""
+import asyncio
+
+import pytest
+
+from app.agents.scheduler import ancestors, run_dag, select_dependencies, topological_order
+
+# the agents' declared `depends_on` (AGENT_DEPENDENCIES)
+GRAPH = {
+    "reflector": [],
+    "strategist": ["reflector"],
+    "coach": ["strategist"],
+    "purpose": ["reflector", "strategist"],
+}
+
+
+def test_ancestors_are_transitive():
+    assert ancestors(GRAPH, "reflector") == set()
+    assert ancestors(GRAPH, "coach") == {"strategist", "reflector"}
+    assert ancestors(GRAPH, "purpose") == {"strategist", "reflector"}
+
+
+def test_select_dependencies_keeps_edges_through_unselected_roles():
+    # coach depends on reflector only through strategist, which is not selected
+    assert select_dependencies(GRAPH, ["reflector", "coach"]) == {"reflector": [], "coach": ["reflector"]}
+
+
+def test_select_dependencies_without_a_path_between_roles():
+    assert select_dependencies(GRAPH, ["coach", "purpose"]) == {"coach": [], "purpose": []}
+    # the full selection keeps every transitive edge, which orders the same as GRAPH
+    assert select_dependencies(GRAPH, list(GRAPH))["coach"] == ["reflector", "strategist"]
+
+
+def test_topological_order_keeps_input_order_among_independent_nodes():
+    assert topological_order({"b": [], "a": [], "c": ["a"]}) == ["b", "a", "c"]
+    with pytest.raises(ValueError):
+        topological_order({"a": ["b"], "b": ["a"]})
+
+
+def _record_runs(graph, fail=()):
+    events = []
+
+    async def run_node(node):
+        events.append(("start", node))
+        await asyncio.sleep(0.01)
+        events.append(("end", node))
+        if node in fail:
+            raise RuntimeError(f"{node} failed")
+        return node.upper()
+
+    return events, run_node
+
+
+def test_run_dag_waits_for_transitive_dependencies_of_a_subset():
+    graph = select_dependencies(GRAPH, ["reflector", "coach"])
+    events, run_node = _record_runs(graph)
+    assert asyncio.run(run_dag(graph, run_node)) == {"reflector": "REFLECTOR", "coach": "COACH"}
+    assert events.index(("end", "reflector")) < events.index(("start", "coach"))
+
+
+def test_run_dag_runs_independent_branches_concurrently():
+    events, run_node = _record_runs(GRAPH)
+    results = asyncio.run(run_dag(GRAPH, run_node))
+    assert list(results) == ["reflector", "strategist", "coach", "purpose"]
+    # coach and purpose both start once strategist is done, before either finishes
+    starts = [events.index(("start", n)) for n in ("coach", "purpose")]
+    ends = [events.index(("end", n)) for n in ("coach", "purpose")]
+    assert max(starts) < min(ends)
+    assert events.index(("end", "strategist")) < min(starts)
+
+
+def test_run_dag_still_runs_dependents_of_a_failed_node():
+    graph = {"a": [], "b": ["a"]}
+    events, run_node = _record_runs(graph, fail={"a"})
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_dag(graph, run_node))
+    assert events == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")]
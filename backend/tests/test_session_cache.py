@@ -0,0 +1,113 @@
+"""
+Per-session LRU cache bounded by size and idle time (app/services/session_cache.py).
+
+Run from backend/: `python -m pytest tests`.
+"""
+import gc
+
+import pytest
+
+from app.services import session_cache as session_cache_module
+from app.services.session_cache import SessionCache, session_cache_stats
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(session_cache_module, "time", fake)
+    return fake
+
+
+class Loader:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, session_id):
+        self.calls.append(session_id)
+        return {"session": session_id, "load": len(self.calls)}
+
+
+def test_a_miss_loads_and_a_hit_reuses(clock):
+    loader = Loader()
+    cache = SessionCache(loader, name="test-hit")
+    first = cache.get("a")
+    assert cache.get("a") is first
+    assert loader.calls == ["a"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_the_least_recently_used_session_is_evicted_over_capacity(clock):
+    loader = Loader()
+    cache = SessionCache(loader, max_sessions=2, name="test-capacity")
+    cache.get("a")
+    clock.now += 1
+    cache.get("b")
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.get("c")
+
+    assert cache.peek("b") is None
+    assert cache.peek("a") is not None and cache.peek("c") is not None
+    assert cache.stats()["evicted_capacity"] == 1
+    cache.get("b")
+    assert loader.calls == ["a", "b", "c", "b"]
+
+
+def test_idle_sessions_are_reloaded_and_evicted(clock):
+    loader = Loader()
+    cache = SessionCache(loader, idle_seconds=60, name="test-idle")
+    cache.get("a")
+    cache.get("b")
+    clock.now += 30
+    cache.get("b")
+    clock.now += 31
+
+    # a has been idle for 61s: the next get rehydrates it
+    assert cache.get("a")["load"] == 3
+    assert cache.stats()["resident_sessions"] == 2
+    clock.now += 61
+    # the stale entry of a was replaced by its reload, so only a and b count as evicted
+    stats = cache.stats()
+    assert (stats["resident_sessions"], stats["evicted_idle"]) == (0, 2)
+
+
+def test_discard_forces_a_reload(clock):
+    loader = Loader()
+    cache = SessionCache(loader, name="test-discard")
+    cache.get("a")
+    cache.discard("a")
+    cache.discard("missing")
+    assert cache.peek("a") is None
+    assert cache.get("a")["load"] == 2
+
+
+def test_a_concurrent_rehydration_keeps_the_value_already_cached(clock):
+    cache = SessionCache(lambda session_id: "mine", name="test-race")
+
+    def loader(session_id):
+        # another caller finished rehydrating the same session while this load ran
+        cache._entries[session_id] = ("theirs", clock.now)
+        return "mine"
+
+    cache.loader = loader
+    assert cache.get("a") == "theirs"
+    assert cache.get("a") == "theirs"
+
+
+def test_stats_are_listed_per_live_cache(clock):
+    cache = SessionCache(Loader(), max_sessions=7, name="test-registry")
+    cache.get("a")
+    assert session_cache_stats()["test-registry"]["max_sessions"] == 7
+    del cache
+    gc.collect()
+    assert "test-registry" not in session_cache_stats()
@@ -0,0 +1,119 @@
+"""
+Coalescing of identical in-flight calls (app/services/single_flight.py).
+
+Run from backend/: `python -m pytest tests`.
+"""
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_joiners_share_the_leaders_run():
+    calls = []
+
+    async def scenario():
+        flight = SingleFlight()
+        gate = asyncio.Event()
+
+        async def work():
+            calls.append(1)
+            await gate.wait()
+            return "answer"
+
+        callers = [asyncio.create_task(flight.do("k", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert flight.stats()["inflight"] == 1
+        gate.set()
+        return await asyncio.gather(*callers), flight.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == ["answer"] * 3
+    assert calls == [1]
+    assert stats == {"inflight": 0, "leaders": 1, "coalesced": 2}
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work(value):
+            await asyncio.sleep(0)
+            return value
+
+        return await asyncio.gather(flight.do("a", lambda: work(1)), flight.do("b", lambda: work(2)))
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+def test_the_leaders_exception_reaches_every_caller():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0)
+            raise RuntimeError("provider down")
+
+        return await asyncio.gather(flight.do("k", work), flight.do("k", work), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) and str(r) == "provider down" for r in results)
+
+
+def test_a_cancelled_caller_does_not_cancel_the_shared_run():
+    async def scenario():
+        flight = SingleFlight()
+        gate = asyncio.Event()
+
+        async def work():
+            await gate.wait()
+            return "answer"
+
+        leader = asyncio.create_task(flight.do("k", work))
+        joiner = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await joiner
+
+    assert asyncio.run(scenario()) == "answer"
+
+
+def test_the_key_is_forgotten_once_the_run_finishes():
+    calls = []
+
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work():
+            calls.append(1)
+            return len(calls)
+
+        first = await flight.do("k", work)
+        second = await flight.do("k", work)
+        return first, second, flight.stats()
+
+    first, second, stats = asyncio.run(scenario())
+    assert (first, second) == (1, 2)
+    assert stats == {"inflight": 0, "leaders": 2, "coalesced": 0}
+
+
+def test_the_key_is_forgotten_when_every_caller_went_away():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("nobody listening")
+
+        caller = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.05)
+        return flight.stats()
+
+    assert asyncio.run(scenario())["inflight"] == 0
@@ -0,0 +1,128 @@
+"""
+Rolling summary memory: folding, failed-fold retry and rehydration from stored history.
+
+Run from backend/: `python -m pytest tests`.
+"""
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test")
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("langsmith")
+pytest.importorskip("chromadb")
+
+from app.services.memory.summary_memory import ConversationSummarizer, RollingSummaryMemory  # noqa: E402
+from app.services.model_router import LOCAL_FALLBACK_PREFIX  # noqa: E402
+
+
+class FakeRouter:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    async def run(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class FakeStore:
+    def __init__(self):
+        self.summaries = {}
+
+    def save_summary(self, session_id, summary, folded_turns):
+        self.summaries[session_id] = (summary, folded_turns)
+
+
+def _memory(turns: int, keep_turns: int = 2) -> RollingSummaryMemory:
+    memory = RollingSummaryMemory(keep_turns=keep_turns)
+    for i in range(turns):
+        memory.save_context({"input": f"q{i}"}, {"output": f"a{i}"})
+    return memory
+
+
+def test_overflow_is_everything_older_than_the_verbatim_window():
+    memory = _memory(5)
+    assert memory.overflow() == [("q0", "a0"), ("q1", "a1"), ("q2", "a2")]
+    assert _memory(2).overflow() == []
+
+
+def test_fold_replaces_the_overflow_with_a_summary():
+    memory = _memory(5)
+    store = FakeStore()
+    summarizer = ConversationSummarizer(FakeRouter("they asked q0-q2"), store)
+
+    assert asyncio.run(summarizer.fold("s1", memory))
+    assert memory.summary == "they asked q0-q2"
+    assert memory.folded_turns == 3
+    assert memory.turns == [("q3", "a3"), ("q4", "a4")]
+    assert store.summaries["s1"] == ("they asked q0-q2", 3)
+    assert memory.buffer.startswith("Summary of earlier conversation:\nthey asked q0-q2")
+    assert "Human: q4\nAI: a4" in memory.buffer
+
+
+@pytest.mark.parametrize("failure", [RuntimeError("provider down"), f"{LOCAL_FALLBACK_PREFIX} no model", "  "])
+def test_failed_fold_keeps_the_turns_and_the_next_fold_retries_them(failure):
+    memory = _memory(3)
+    store = FakeStore()
+    router = FakeRouter(failure, "summary of q0 and q1")
+    summarizer = ConversationSummarizer(router, store)
+
+    assert not asyncio.run(summarizer.fold("s1", memory))
+    assert memory.summary == ""
+    assert memory.folded_turns == 0
+    assert len(memory.turns) == 3
+    assert store.summaries == {}
+
+    memory.save_context({"input": "q3"}, {"output": "a3"})
+    assert asyncio.run(summarizer.fold("s1", memory))
+    assert "Human: q0" in router.prompts[1]
+    assert memory.folded_turns == 2
+    assert store.summaries["s1"] == ("summary of q0 and q1", 2)
+
+
+def test_fold_without_overflow_does_not_call_the_model():
+    router = FakeRouter()
+    assert not asyncio.run(ConversationSummarizer(router, FakeStore()).fold("s1", _memory(2)))
+    assert router.prompts == []
+
+
+def test_load_history_skips_folded_pairs():
+    history = []
+    for i in range(4):
+        history += [{"role": "user", "content": f"q{i}"}, {"role": "assistant", "content": f"a{i}"}]
+    memory = RollingSummaryMemory(keep_turns=2, summary="s", folded_turns=2)
+    memory.load_history(history)
+    assert memory.turns == [("q2", "a2"), ("q3", "a3")]
+
+
+def test_load_history_ignores_orphan_user_messages_and_other_roles():
+    history = [
+        {"role": "user", "content": "q0"},
+        {"role": "assistant", "content": "a0"},
+        # saved without its reply
+        {"role": "user", "content": "lost"},
+        {"role": "user", "content": "q1"},
+        {"role": "coach_agent", "content": "late coach answer"},
+        {"role": "assistant", "content": "a1"},
+        {"role": "user", "content": "q2"},
+        {"role": "assistant", "content": "a2"},
+        {"role": "user", "content": "unanswered"},
+    ]
+    memory = RollingSummaryMemory(keep_turns=4, folded_turns=1)
+    memory.load_history(history)
+    assert memory.turns == [("q1", "a1"), ("q2", "a2")]
+
+
+def test_rehydrated_turns_beyond_the_window_are_folded_next():
+    history = []
+    for i in range(5):
+        history += [{"role": "user", "content": f"q{i}"}, {"role": "assistant", "content": f"a{i}"}]
+    memory = RollingSummaryMemory(keep_turns=2, summary="old", folded_turns=1)
+    memory.load_history(history)
+    assert memory.overflow() == [("q1", "a1"), ("q2", "a2")]
@@ -0,0 +1,156 @@
+"""
+Write-behind conversation buffer (app/services/memory/write_behind.py): read-your-writes,
+batching and retry backoff.
+
+Run from backend/: `python -m pytest tests`.
+"""
+import time
+
+from app.services.memory.base import ConversationMessage, ConversationStore
+from app.services.memory.write_behind import MAX_RETRY_BACKOFF_SECONDS, WriteBehindConversationStore
+
+
+class ListStore(ConversationStore):
+    """In-memory ConversationStore; `failures` makes the next N batch writes raise."""
+
+    def __init__(self):
+        self.messages = []
+        self.batches = []
+        self.failures = 0
+
+    def append_many(self, messages):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("store unavailable")
+        self.batches.append(len(messages))
+        for m in messages:
+            m.seq = sum(1 for stored in self.messages if stored.session_id == m.session_id) + 1
+            self.messages.append(m)
+
+    def load_session_history(self, session_id):
+        return [m.as_dict() for m in self.messages if m.session_id == session_id]
+
+    def tail(self, session_id, n):
+        return self.load_session_history(session_id)[-n:]
+
+    def clear_session(self, session_id):
+        self.messages = [m for m in self.messages if m.session_id != session_id]
+
+
+def _buffer(store, monkeypatch=None, **kwargs) -> WriteBehindConversationStore:
+    buffer = WriteBehindConversationStore(store, **{"max_batch": 64, "flush_interval": 60, **kwargs})
+    if monkeypatch is not None:
+        # drive flushes by hand instead of from the background thread
+        monkeypatch.setattr(buffer, "_ensure_started", lambda: None)
+    return buffer
+
+
+def _contents(rows):
+    return [row["content"] for row in rows]
+
+
+def test_reads_see_buffered_messages_before_they_are_written(monkeypatch):
+    store = ListStore()
+    buffer = _buffer(store, monkeypatch)
+    buffer.save_message("a", "user", "q1")
+    buffer.save_message("b", "user", "other session")
+    buffer.save_message("a", "assistant", "a1")
+
+    assert store.messages == []
+    assert _contents(buffer.load_session_history("a")) == ["q1", "a1"]
+    assert _contents(buffer.tail("a", 1)) == ["a1"]
+    assert buffer.stats()["pending"] == 3
+
+
+def test_reads_merge_written_and_buffered_messages_without_duplicates(monkeypatch):
+    store = ListStore()
+    buffer = _buffer(store, monkeypatch)
+    buffer.save_message("a", "user", "q1")
+    buffer.flush()
+    buffer.save_message("a", "assistant", "a1")
+    # a message that was written while the read ran is seen in both places
+    buffer._inflight = [store.messages[0]]
+
+    assert _contents(buffer.load_session_history("a")) == ["q1", "a1"]
+    assert _contents(buffer.tail("a", 5)) == ["q1", "a1"]
+
+
+def test_flush_writes_in_batches_of_max_batch(monkeypatch):
+    store = ListStore()
+    buffer = _buffer(store, monkeypatch, max_batch=2)
+    buffer.append_many([ConversationMessage("a", "user", f"m{i}") for i in range(5)])
+    buffer.flush()
+    assert store.batches == [2, 2, 1]
+    assert [m.seq for m in store.messages] == [1, 2, 3, 4, 5]
+    assert buffer.stats()["written"] == 5
+
+
+def test_a_full_batch_wakes_the_writer_thread():
+    store = ListStore()
+    buffer = _buffer(store, max_batch=2)
+    buffer.save_message("a", "user", "q1")
+    buffer.save_message("a", "assistant", "a1")
+    deadline = time.monotonic() + 5
+    while len(store.messages) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _contents(store.load_session_history("a")) == ["q1", "a1"]
+    buffer.close()
+
+
+def test_failed_batches_are_kept_and_back_off_exponentially(monkeypatch):
+    store = ListStore()
+    buffer = _buffer(store, monkeypatch, flush_interval=4)
+    buffer.save_message("a", "user", "q1")
+    buffer.save_message("a", "assistant", "a1")
+
+    store.failures = 5
+    backoffs = []
+    for _ in range(5):
+        assert buffer._flush_once() == 0
+        backoffs.append(buffer.stats()["retry_backoff_s"])
+    assert backoffs == [4, 8, 16, MAX_RETRY_BACKOFF_SECONDS, MAX_RETRY_BACKOFF_SECONDS]
+    assert buffer._retry_at > time.monotonic()
+    # nothing is lost or reordered while the store is down
+    assert _contents(buffer.load_session_history("a")) == ["q1", "a1"]
+
+    assert buffer._flush_once() == 2
+    stats = buffer.stats()
+    assert (stats["retry_backoff_s"], stats["failed_batches"], stats["pending"]) == (0.0, 5, 0)
+    assert buffer._retry_at == 0.0
+    assert _contents(store.load_session_history("a")) == ["q1", "a1"]
+
+
+def test_flush_gives_up_after_one_failed_attempt(monkeypatch, caplog):
+    store = ListStore()
+    buffer = _buffer(store, monkeypatch)
+    buffer.save_message("a", "user", "q1")
+    store.failures = 1
+    buffer.flush()
+    assert buffer.stats()["pending"] == 1
+    assert "gave up" in caplog.text
+
+
+def test_a_full_buffer_drops_the_oldest_messages(monkeypatch):
+    buffer = _buffer(ListStore(), monkeypatch, max_pending=3)
+    buffer.append_many([ConversationMessage("a", "user", f"m{i}") for i in range(5)])
+    assert _contents(buffer.load_session_history("a")) == ["m2", "m3", "m4"]
+    assert buffer.stats()["dropped"] == 2
+
+
+def test_clear_session_discards_its_buffered_messages(monkeypatch):
+    store = ListStore()
+    buffer = _buffer(store, monkeypatch)
+    buffer.save_message("a", "user", "q1")
+    buffer.save_message("b", "user", "keep")
+    buffer.clear_session("a")
+    buffer.flush()
+    assert buffer.load_session_history("a") == []
+    assert _contents(store.load_session_history("b")) == ["keep"]
+
+
+def test_close_flushes_what_is_still_buffered():
+    store = ListStore()
+    buffer = _buffer(store)
+    buffer.save_message("a", "user", "q1")
+    buffer.close()
+    assert _contents(store.load_session_history("a")) == ["q1"]